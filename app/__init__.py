@@ -1,11 +1,35 @@
-﻿from flask import Flask, render_template, g
+﻿import os
+import time
+from typing import Callable, Dict
+
+from flask import Flask, render_template, g
+from flask_login import current_user
 from loguru import logger
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from config import config
-from app.extensions import csrf, cors, db, login_manager, migrate
-from app.utils.bootstrap import ensure_seed_data
+from app.extensions import (
+    async_db,
+    cors,
+    csrf,
+    db,
+    log_control,
+    log_pipeline,
+    login_manager,
+    migrate,
+    password_hasher,
+    principal_cache,
+    query_tracker,
+    rate_limiter,
+    read_router,
+    request_metrics,
+    response_cache,
+    sqlite_tuning,
+)
+from app.utils.bootstrap import database_is_current, prepare_database
 from app.utils.logging import configure_logging
-from app.utils.request_logger import log_request_info
+from app.utils.permissions import effective_permissions, permission_matrix
+from app.utils.request_logger import log_request_complete, log_request_info
 
 
 def create_app(config_name: str = 'default') -> Flask:
@@ -17,24 +41,47 @@ def create_app(config_name: str = 'default') -> Flask:
     Returns:
         Flask: 配置完成的 Flask 应用实例
     """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    if app.config.get('TRUSTED_PROXY_COUNT'):
+        # 只信任可信代理追加的 X-Forwarded-For 项，request.remote_addr 即为客户端IP
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'])
 
-    configure_logging(app)
-    register_extensions(app)
-    register_blueprints(app)
-    register_error_handlers(app)
-    register_cli(app)
-    register_request_hooks(app)
+    _timed(timings, configure_logging, app)
+    _timed(timings, register_extensions, app)
+    _timed(timings, register_blueprints, app)
+    _timed(timings, register_error_handlers, app)
+    _timed(timings, register_cli, app)
+    _timed(timings, register_request_hooks, app)
 
     with app.app_context():
-        db.create_all()
-        ensure_seed_data()
-
-    logger.info('应用已启动，配置: {}', config_name)
+        # 建表与默认数据只在版本标记落后时执行；正常启动只查询版本标记与 alembic_version 两次，
+        # 另外编译模型 DDL 计算指纹并读取迁移脚本的最新修订（合计数毫秒）
+        if not _timed(timings, database_is_current):
+            logger.warning('数据库结构或默认数据版本落后，开始初始化')
+            _timed(timings, prepare_database)
+        _timed(timings, read_router.ensure_replica)
+        _timed(timings, permission_matrix.compile)
+
+    logger.info(
+        '应用已启动，配置: {}，耗时 {:.1f}ms（{}）',
+        config_name, (time.perf_counter() - started) * 1000,
+        ', '.join(f'{name} {elapsed:.1f}ms' for name, elapsed in timings.items()),
+    )
     return app
 
 
+def _timed(timings: Dict[str, float], func: Callable, *args):
+    """执行启动阶段并记录耗时（毫秒）"""
+    started = time.perf_counter()
+    try:
+        return func(*args)
+    finally:
+        timings[func.__name__] = (time.perf_counter() - started) * 1000
+
+
 def register_extensions(app: Flask) -> None:
     """注册 Flask 扩展
     
@@ -44,9 +91,22 @@ def register_extensions(app: Flask) -> None:
     app.config['CORS_HEADERS'] = 'Content-Type'
 
     db.init_app(app)
+    sqlite_tuning.init_app(app, db)
+    read_router.init_app(app, db)
+    async_db.init_app(app, db)
     login_manager.init_app(app)
-    migrate.init_app(app, db)
+    # 迁移目录按项目根目录定位，应用启动时执行迁移不依赖当前工作目录
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(app.root_path), 'migrations'),
+                     render_as_batch=True)
     csrf.init_app(app)
+    principal_cache.init_app(app)
+    password_hasher.init_app(app)
+    rate_limiter.init_app(app)
+    response_cache.init_app(app)
+    log_pipeline.init_app(app)
+    log_control.init_app(app)
+    request_metrics.init_app(app)
+    query_tracker.init_app(app)
     cors.init_app(app, resources={r"/*": {"origins": "*"}})
 
     login_manager.login_view = 'auth.login'
@@ -59,6 +119,7 @@ def register_blueprints(app: Flask) -> None:
     Args:
         app: Flask 应用实例
     """
+    from .controllers.admin import admin_bp
     from .controllers.auth import auth_bp
     from .controllers.group import group_bp
     from .controllers.main import main_bp
@@ -67,6 +128,7 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(user_bp, url_prefix='/users')
     app.register_blueprint(group_bp, url_prefix='/groups')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(main_bp)
 
 
@@ -76,9 +138,23 @@ def register_cli(app: Flask) -> None:
     Args:
         app: Flask 应用实例
     """
-    from .commands import init_db_command
+    from .commands import (
+        import_users_command,
+        init_db_command,
+        rebuild_search_index_command,
+        repair_member_counts_command,
+        seed_synthetic_command,
+        sqlite_maintenance_command,
+        sync_replica_command,
+    )
 
     app.cli.add_command(init_db_command)
+    app.cli.add_command(repair_member_counts_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(import_users_command)
+    app.cli.add_command(seed_synthetic_command)
+    app.cli.add_command(sqlite_maintenance_command)
+    app.cli.add_command(sync_replica_command)
 
 
 def register_error_handlers(app: Flask) -> None:
@@ -111,3 +187,11 @@ def register_request_hooks(app: Flask) -> None:
     @app.before_request
     def before_request():
         log_request_info()
+
+    @app.after_request
+    def after_request(response):
+        return log_request_complete(response)
+
+    @app.context_processor
+    def inject_permissions():
+        return {'perms': effective_permissions(current_user)}
@@ -0,0 +1,169 @@
+import asyncio
+import contextvars
+import io
+import sys
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask, request
+from loguru import logger
+from werkzeug.exceptions import HTTPException
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+from app import create_app
+from app.controllers.async_views import ASYNC_VIEWS
+from app.extensions import async_db
+
+# 只有安全方法的读接口走异步路径
+_ASYNC_METHODS = ('GET', 'HEAD')
+
+
+def wsgi_environ(scope: dict) -> dict:
+    """按 PEP 3333 由 ASGI HTTP scope 构造 WSGI environ，请求体为空（仅用于 GET/HEAD）"""
+    root_path = scope.get('root_path', '')
+    path = scope['path']
+    if root_path and path.startswith(root_path):
+        path = path[len(root_path):]
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': root_path.encode('utf-8').decode('latin-1'),
+        'PATH_INFO': path.encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = client[0], str(client[1])
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1')
+        if name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        elif name == 'content-type':
+            key = 'CONTENT_TYPE'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        # 重复的请求头按 RFC 9110 以逗号合并
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class AsyncReadApp:
+    """ASGI 入口
+
+    读接口（见 app.controllers.async_views.ASYNC_VIEWS）在事件循环中用异步引擎处理，
+    等待数据库时不占用线程；其他请求通过 asgiref 在线程池中交给同步的 Flask 应用。
+    异步路径同样经过 Flask 的请求上下文、before/after_request 钩子与错误处理，
+    会话、日志、指标与 SQL 统计的行为与同步模式一致。
+    """
+
+    def __init__(self, app: Flask):
+        self.app = app
+        self.wsgi = WsgiToAsgi(app)
+        self.proxy_fix = _environ_proxy_fix(app)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] == 'http' and scope['method'] in _ASYNC_METHODS:
+            environ = wsgi_environ(scope)
+            if self.proxy_fix is not None:
+                # 异步路径不经过 app.wsgi_app，按同步模式的 ProxyFix 配置改写 environ
+                self.proxy_fix(environ, None)
+            view = ASYNC_VIEWS.get(self._match_endpoint(environ))
+            if view is not None:
+                await self._dispatch(view, environ, send)
+                return
+        # asgiref 会把线程池中的上下文变量（单线程执行器的状态等）写回调用方，
+        # 而 uvicorn 在同一连接上处理下一个请求时会继承上一个请求任务的上下文，
+        # 因此同步请求在空白上下文的子任务中执行，避免状态泄漏到后续请求
+        await asyncio.get_running_loop().create_task(
+            self.wsgi(scope, receive, send), context=contextvars.Context(),
+        )
+
+    def _match_endpoint(self, environ: dict):
+        try:
+            endpoint, _ = self.app.url_map.bind_to_environ(
+                environ, server_name=self.app.config.get('SERVER_NAME'),
+            ).match()
+        except HTTPException:
+            # 404、405 与补全斜杠的重定向都交给同步应用处理
+            return None
+        return endpoint
+
+    async def _dispatch(self, view, environ: dict, send) -> None:
+        """与 Flask.wsgi_app / full_dispatch_request 相同的流程，只是视图以协程执行"""
+        app = self.app
+        ctx = app.request_context(environ)
+        error = None
+        try:
+            try:
+                ctx.push()
+                try:
+                    rv = app.preprocess_request()
+                    if rv is None:
+                        rv = await view(**request.view_args)
+                except Exception as exc:
+                    rv = app.handle_user_exception(exc)
+                response = app.finalize_request(rv)
+            except Exception as exc:
+                error = exc
+                response = app.handle_exception(exc)
+            body = b''.join(response.get_app_iter(environ))
+            headers = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in response.get_wsgi_headers(environ).to_wsgi_list()
+            ]
+            response.close()
+        finally:
+            if error is not None and app.should_ignore_error(error):
+                error = None
+            ctx.pop(error)
+
+        await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose()
+                logger.info('ASGI 应用已关闭')
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def _environ_proxy_fix(app: Flask):
+    """复制应用上配置的 ProxyFix，只改写 environ（原地修改），不调用下游应用"""
+    configured = app.wsgi_app
+    if not isinstance(configured, ProxyFix):
+        return None
+    return ProxyFix(
+        lambda environ, start_response: [],
+        x_for=configured.x_for, x_proto=configured.x_proto, x_host=configured.x_host,
+        x_port=configured.x_port, x_prefix=configured.x_prefix,
+    )
+
+
+def create_asgi_app(config_name: str = 'default') -> AsyncReadApp:
+    """创建 ASGI 应用，需要安装 requirements-asgi.txt 中的可选依赖
+
+    Args:
+        config_name: 配置环境名称，默认为 'default'
+
+    Returns:
+        AsyncReadApp: 可交给 uvicorn 或 gunicorn 的 UvicornWorker 运行的 ASGI 应用
+    """
+    return AsyncReadApp(create_app(config_name))
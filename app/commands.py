@@ -1,9 +1,19 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import click
 from flask.cli import with_appcontext
 from loguru import logger
 
-from app.extensions import db
-from app.utils.bootstrap import ensure_seed_data
+from app.extensions import db, read_router, sqlite_tuning
+from app.models.group import Group
+from app.services.import_service import SUPPORTED_FORMATS, detect_format, import_users
+from app.services.seed_service import generate_synthetic_users
+from app.services.user_search import ensure_search_index, rebuild_search_index
+from app.utils.bootstrap import prepare_database
+from app.utils.db_routing import sync_sqlite_replica
+from app.utils.permissions import permission_matrix
 
 
 @click.command('init-db')
@@ -11,11 +21,125 @@ from app.utils.bootstrap import ensure_seed_data
 def init_db_command():
     """初始化数据库并准备演示账号"""
     logger.info('开始执行 init-db 命令')
-    db.create_all()
-
-    created_groups, created_users = ensure_seed_data(commit=True)
+    created_groups, created_users = prepare_database(force=True)
+    permission_matrix.compile()
     if not created_groups and not created_users:
         logger.debug('默认数据已存在，无需变更')
 
     logger.success('init-db 执行完成')
     click.echo('数据库初始化完成，默认账号已准备就绪。')
+
+
+@click.command('repair-member-counts')
+@with_appcontext
+def repair_member_counts_command():
+    """按 users 表重新统计各用户组的成员数"""
+    logger.info('开始执行 repair-member-counts 命令')
+    Group.recount_members()
+    db.session.commit()
+
+    for group in Group.query.order_by(Group.id).all():
+        click.echo(f'{group.name}: {group.member_count}')
+    logger.success('repair-member-counts 执行完成')
+
+
+@click.command('import-users')
+@click.argument('source', type=click.File('r', encoding='utf-8-sig'))
+@click.option('--format', 'fmt', type=click.Choice(SUPPORTED_FORMATS), help='文件格式，默认按扩展名判断')
+@click.option('--batch-size', default=1000, show_default=True, help='每批写入的记录数')
+@click.option('--default-group', default=None, help='未指定用户组时使用的用户组名称')
+@click.option('--hash-workers', default=os.cpu_count() or 1, show_default=True, help='并行哈希的进程数')
+@with_appcontext
+def import_users_command(source, fmt, batch_size, default_group, hash_workers):
+    """从 CSV 或 JSON Lines 文件流式批量导入用户（SOURCE 为 - 时读取标准输入）"""
+    fmt = fmt or detect_format(source.name)
+    logger.info('开始执行 import-users 命令: {} ({})', source.name, fmt)
+
+    try:
+        with ProcessPoolExecutor(max_workers=hash_workers) as executor:
+            report = import_users(source, fmt, batch_size, default_group, executor)
+    except ValueError as exc:
+        raise click.BadParameter(str(exc))
+
+    for line_no, reason in sorted(report.errors):
+        click.echo(f'第 {line_no} 行: {reason}', err=True)
+    if report.failed > len(report.errors):
+        click.echo(f'... 另有 {report.failed - len(report.errors)} 条错误未显示', err=True)
+    click.echo(
+        f'导入完成: 共 {report.total} 条，成功 {report.inserted} 条，失败 {report.failed} 条，'
+        f'耗时 {report.elapsed:.2f}s（{report.rows_per_second:.0f} 条/秒）'
+    )
+
+
+@click.command('seed-synthetic')
+@click.option('--users', 'user_count', type=click.IntRange(min=1), required=True, help='生成的用户数')
+@click.option('--groups', 'group_count', type=click.IntRange(min=1), default=3, show_default=True,
+              help='用户组总数，不足时补齐')
+@click.option('--seed', default=0, show_default=True, help='随机种子，相同参数生成相同数据')
+@click.option('--password', default='password123', show_default=True, help='所有合成用户的密码')
+@click.option('--prefix', default='user', show_default=True, help='用户名前缀')
+@click.option('--batch-size', default=10000, show_default=True, help='每次批量写入的行数')
+@with_appcontext
+def seed_synthetic_command(user_count, group_count, seed, password, prefix, batch_size):
+    """生成确定性的合成用户数据，用于性能测试与演示"""
+    logger.info('开始执行 seed-synthetic 命令: {} 位用户，{} 个用户组，种子 {}', user_count, group_count, seed)
+    report = generate_synthetic_users(
+        user_count, groups=group_count, seed=seed, password=password,
+        prefix=prefix, batch_size=batch_size,
+    )
+    click.echo(
+        f'生成完成: {report.users} 位用户（停用 {report.inactive}，无邮箱 {report.without_email}），'
+        f'{report.groups} 个用户组，耗时 {report.elapsed:.2f}s（{report.rows_per_second:.0f} 条/秒）'
+    )
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """按 users 表重建用户搜索的全文索引"""
+    logger.info('开始执行 rebuild-search-index 命令')
+    if not ensure_search_index():
+        raise click.ClickException('当前数据库不支持 FTS5 trigram 索引，搜索使用 LIKE 查询')
+    started = time.perf_counter()
+    rebuild_search_index()
+    click.echo(f'用户搜索索引重建完成，耗时 {time.perf_counter() - started:.2f}s')
+    logger.success('rebuild-search-index 执行完成')
+
+
+@click.command('sqlite-maintenance')
+@click.option('--full', is_flag=True, help='执行完整 VACUUM（会锁库，可将已有数据库切换为增量 auto_vacuum）')
+@with_appcontext
+def sqlite_maintenance_command(full):
+    """立即执行 SQLite 维护：PRAGMA optimize、增量 VACUUM 与 WAL 检查点"""
+    logger.info('开始执行 sqlite-maintenance 命令')
+    engines = sqlite_tuning.engines()
+    if not engines:
+        click.echo('未配置文件型 SQLite 数据库，无需维护。')
+        return
+
+    for engine in engines:
+        result = sqlite_tuning.maintain(engine, full=full)
+        click.echo(f"{engine.url.database}: 空闲页 {result['freelist_before']} -> {result['freelist_after']}")
+    logger.success('sqlite-maintenance 执行完成')
+
+
+@click.command('sync-replica')
+@click.option('--interval', type=float, default=0, help='大于 0 时按该间隔（秒）持续同步，直到中断')
+@with_appcontext
+def sync_replica_command(interval):
+    """用 SQLite 在线备份把主库复制到只读副本（DATABASE_REPLICA_URL）"""
+    replica = read_router.replica_engine()
+    if replica is None:
+        raise click.ClickException('未配置只读副本，请设置 DATABASE_REPLICA_URL')
+
+    primary = read_router.primary_engine()
+    logger.info('开始执行 sync-replica 命令')
+    while True:
+        try:
+            elapsed = sync_sqlite_replica(primary, replica)
+        except ValueError as exc:
+            raise click.ClickException(str(exc))
+        click.echo(f'副本同步完成，耗时 {elapsed * 1000:.1f}ms')
+        if interval <= 0:
+            break
+        time.sleep(interval)
@@ -0,0 +1,65 @@
+from flask import Blueprint, jsonify, request
+from flask_login import current_user, login_required
+
+from app.extensions import log_control, log_pipeline
+from app.utils.decorators import permission_required
+from app.utils.request_logger import log_user_action
+
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+@admin_bp.route('/log-levels/', methods=['GET'])
+@login_required
+@permission_required('manage_logs')
+def get_log_levels():
+    """查看当前日志配置
+
+    Returns:
+        JSON: 模块级别（空字符串键为默认级别）、请求日志采样配置与日志管道统计
+    """
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'levels': log_control.levels(),
+            'sampling': {
+                'default_rate': log_control.sample_rate,
+                'endpoints': log_control.sampling,
+                'excluded': sorted(log_control.excluded),
+            },
+            'pipeline': log_pipeline.stats(),
+        },
+    })
+
+
+@admin_bp.route('/log-levels/', methods=['POST'])
+@login_required
+@permission_required('manage_logs')
+def set_log_level():
+    """运行时调整模块日志级别，所有工作进程在数秒内生效
+
+    请求方法: POST
+    请求参数: module - 模块名前缀，例如 app.services
+              level - 级别名称（DEBUG/INFO/WARNING/...），为空时恢复默认级别
+
+    Returns:
+        JSON: 操作结果与更新后的模块级别
+    """
+    data = request.get_json(silent=True) or request.form
+    module = data.get('module')
+    level = data.get('level')
+
+    try:
+        levels = log_control.set_level(module, level)
+    except ValueError as exc:
+        return jsonify({'status': 'error', 'message': str(exc)})
+
+    log_user_action(
+        "调整日志级别",
+        user=current_user,
+        extra_data={
+            "模块": module,
+            "级别": level or '默认'
+        }
+    )
+    return jsonify({'status': 'success', 'message': '日志级别已更新', 'data': {'levels': levels}})
@@ -0,0 +1,151 @@
+from functools import wraps
+
+from flask import abort, current_app, jsonify, session
+from flask_login import current_user
+
+from app.extensions import principal_cache
+from app.services import async_reads
+from app.utils.conditional import apply_validator, is_conditional, is_not_modified, not_modified_response
+from app.utils.decorators import permission_required
+from app.utils.request_logger import log_user_action
+
+# ASGI 模式（asgi.py）下读接口的异步版本。URL 匹配仍由蓝图完成，
+# 匹配到下表中的端点时改为在事件循环中执行异步视图，其余请求交给同步应用处理。
+
+
+def async_login_required(view):
+    """login_required 的异步版本
+
+    先用异步查询预热登录用户快照，Flask-Login 随后加载 current_user 时直接命中缓存，
+    不会在事件循环中执行同步查询。
+    """
+    @wraps(view)
+    async def decorated_view(*args, **kwargs):
+        user_id = session.get('_user_id')
+        if user_id is not None:
+            principal, version = principal_cache.lookup(int(user_id))
+            if principal is None:
+                principal = await async_reads.load_principal(int(user_id))
+                if principal is not None:
+                    principal_cache.store(int(user_id), principal, version)
+        if not current_user.is_authenticated:
+            return current_app.login_manager.unauthorized()
+        return await view(*args, **kwargs)
+    return decorated_view
+
+
+@async_login_required
+async def get_user(user_id):
+    """获取指定用户信息（异步版本，行为同 user.get_user）"""
+    if is_conditional():
+        validator = await async_reads.find_user_validator(user_id)
+        if validator is None:
+            abort(404)
+        if is_not_modified(validator):
+            log_user_action(
+                "查看用户信息（未修改）",
+                user=current_user,
+                extra_data={"查看用户ID": user_id}
+            )
+            return not_modified_response(validator)
+
+    detail = await async_reads.get_user_detail(user_id)
+    if detail is None:
+        abort(404)
+    user, validator = detail
+    log_user_action(
+        "查看用户信息",
+        user=current_user,
+        extra_data={
+            "查看用户ID": user_id,
+            "查看用户名": user['username']
+        }
+    )
+    return apply_validator(jsonify(user), validator)
+
+
+@async_login_required
+async def get_group(group_id):
+    """获取指定用户组信息（异步版本，行为同 group.get_group）"""
+    if is_conditional():
+        validator = await async_reads.find_group_validator(group_id)
+        if validator is None:
+            abort(404)
+        if is_not_modified(validator):
+            log_user_action(
+                "查看用户组信息（未修改）",
+                user=current_user,
+                extra_data={"用户组ID": group_id}
+            )
+            return not_modified_response(validator)
+
+    detail = await async_reads.get_group_detail(group_id)
+    if detail is None:
+        abort(404)
+    group, validator = detail
+    log_user_action(
+        "查看用户组信息",
+        user=current_user,
+        extra_data={
+            "用户组ID": group_id,
+            "用户组名称": group['name']
+        }
+    )
+    return apply_validator(jsonify(group), validator)
+
+
+@async_login_required
+async def get_group_members(group_id):
+    """获取指定用户组的所有成员（异步版本，行为同 group.get_group_members）"""
+    if is_conditional():
+        validator = await async_reads.find_group_validator(group_id, members=True)
+        if validator is None:
+            abort(404)
+        if is_not_modified(validator):
+            log_user_action(
+                "查看用户组成员（未修改）",
+                user=current_user,
+                extra_data={"用户组ID": group_id}
+            )
+            return not_modified_response(validator)
+
+    members = await async_reads.get_group_member_list(group_id)
+    if members is None:
+        abort(404)
+    payload, validator = members
+    log_user_action(
+        "查看用户组成员",
+        user=current_user,
+        extra_data={
+            "用户组ID": group_id,
+            "用户组名称": payload['group_name']
+        }
+    )
+    return apply_validator(jsonify(payload), validator)
+
+
+@async_login_required
+@permission_required('edit_user')
+async def get_available_users(group_id):
+    """获取未分配用户组的用户（异步版本，行为同 group.get_available_users）"""
+    available_users = await async_reads.list_available_users()
+    log_user_action(
+        "查看可用用户（未分配组）",
+        user=current_user,
+        extra_data={
+            "用户组ID": group_id,
+            "可用用户数": len(available_users)
+        }
+    )
+    return jsonify({
+        'users': available_users
+    })
+
+
+# 同步端点名称 -> 异步视图
+ASYNC_VIEWS = {
+    'user.get_user': get_user,
+    'group.get_group': get_group,
+    'group.get_group_members': get_group_members,
+    'group.get_available_users': get_available_users,
+}
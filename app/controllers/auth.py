@@ -24,7 +24,8 @@ def login():
 
     form = LoginForm()
     if form.validate_on_submit():
-        result = authenticate_user(form.username.data, form.password.data)
+        # 限流按 remote_addr 计数：只有配置了 TRUSTED_PROXY_COUNT 时才采用 X-Forwarded-For
+        result = authenticate_user(form.username.data, form.password.data, ip=request.remote_addr)
         if result.success and result.user:
             login_user(result.user, remember=form.remember_me.data)
             next_page = request.args.get('next')
@@ -61,7 +62,7 @@ def login():
             "登录失败",
             extra_data={
                 "用户名": form.username.data,
-                "原因": "用户名或密码错误"
+                "原因": "用户名或密码错误" if result.status == 'invalid' else result.message
             }
         )
     elif form.errors:
@@ -1,9 +1,14 @@
-from flask import Blueprint, jsonify, request, g
+from flask import Blueprint, abort, jsonify, request, g
 from flask_login import login_required, current_user
 from loguru import logger
 
-from app.models.group import Group
-from app.models.user import User
+from app.services.group_service import (
+    find_group_validator,
+    get_group_detail,
+    get_group_member_list,
+    list_available_users,
+)
+from app.utils.conditional import apply_validator, is_conditional, is_not_modified, not_modified_response
 from app.utils.decorators import permission_required
 from app.utils.request_logger import log_user_action
 
@@ -19,19 +24,34 @@ def get_group(group_id):
         group_id: 用户组ID
         
     Returns:
-        JSON: 用户组信息字典
+        JSON: 用户组信息字典；If-None-Match 命中时返回 304
     """
-    group = Group.query.get_or_404(group_id)
+    if is_conditional():
+        validator = find_group_validator(group_id)
+        if validator is None:
+            abort(404)
+        if is_not_modified(validator):
+            log_user_action(
+                "查看用户组信息（未修改）",
+                user=current_user,
+                extra_data={"用户组ID": group_id}
+            )
+            return not_modified_response(validator)
+
+    detail = get_group_detail(group_id)
+    if detail is None:
+        abort(404)
+    group, validator = detail
     # 记录查看用户组信息行为
     log_user_action(
         "查看用户组信息",
         user=current_user,
         extra_data={
             "用户组ID": group_id,
-            "用户组名称": group.name
+            "用户组名称": group['name']
         }
     )
-    return jsonify(group.to_dict())
+    return apply_validator(jsonify(group), validator)
 
 
 @group_bp.route('/<int:group_id>/members/')
@@ -43,22 +63,35 @@ def get_group_members(group_id):
         group_id: 用户组ID
         
     Returns:
-        JSON: 包含用户组名称和成员列表的字典
+        JSON: 包含用户组名称和成员列表的字典；If-None-Match 命中时返回 304
     """
-    group = Group.query.get_or_404(group_id)
+    if is_conditional():
+        # 成员列表按 members_version 判断，未修改时不加载任何成员
+        validator = find_group_validator(group_id, members=True)
+        if validator is None:
+            abort(404)
+        if is_not_modified(validator):
+            log_user_action(
+                "查看用户组成员（未修改）",
+                user=current_user,
+                extra_data={"用户组ID": group_id}
+            )
+            return not_modified_response(validator)
+
+    members = get_group_member_list(group_id)
+    if members is None:
+        abort(404)
+    payload, validator = members
     # 记录查看用户组成员行为
     log_user_action(
         "查看用户组成员",
         user=current_user,
         extra_data={
             "用户组ID": group_id,
-            "用户组名称": group.name
+            "用户组名称": payload['group_name']
         }
     )
-    return jsonify({
-        'group_name': group.name,
-        'members': [user.to_dict() for user in group.users]
-    })
+    return apply_validator(jsonify(payload), validator)
 
 
 @group_bp.route('/available-for-group/<int:group_id>')
@@ -75,7 +108,7 @@ def get_available_users(group_id):
         JSON: 可用用户列表
     """
     # 获取没有分配到任何组的用户
-    available_users = User.query.filter(User.group_id.is_(None)).all()
+    available_users = list_available_users()
     # 记录查看可用用户行为
     log_user_action(
         "查看可用用户（未分配组）",
@@ -86,7 +119,7 @@ def get_available_users(group_id):
         }
     )
     return jsonify({
-        'users': [user.to_dict() for user in available_users]
+        'users': available_users
     })
 
  
\ No newline at end of file
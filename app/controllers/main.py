@@ -2,8 +2,8 @@
 from flask_login import current_user, login_required
 from loguru import logger
 
-from app.models.group import Group
-from app.models.user import User
+from app.services.group_service import list_group_summaries
+from app.services.user_service import list_users_page
 from app.utils.request_logger import log_user_action
 
 
@@ -15,31 +15,28 @@ main_bp = Blueprint('main', __name__)
 def index():
     """首页路由，显示用户和用户组列表
     
-    需要用户登录才能访问
+    需要用户登录才能访问，仅渲染首屏用户，后续分页由前端通过 /users/ 按需加载
     Returns:
         HTML: 渲染后的首页模板
     """
-    users = User.query.all()
-    groups = Group.query.all()
-    users_data = [user.to_dict() for user in users]
-    groups_data = [group.to_dict() for group in groups]
+    users_page = list_users_page().data
+    groups_data = list_group_summaries()
 
     # 记录用户访问首页的行为
     log_user_action(
         "访问首页",
         user=current_user,
         extra_data={
-            "用户数": len(users),
-            "用户组数": len(groups)
+            "首屏用户数": len(users_page['users']),
+            "用户组数": len(groups_data)
         }
     )
 
     return render_template(
         'index.html',
         title='用户管理系统',
-        users=users,
-        groups=groups,
-        users_data=users_data,
+        groups=groups_data,
+        users_page=users_page,
         groups_data=groups_data,
         user=current_user,
     )
@@ -1,17 +1,26 @@
-﻿from flask import Blueprint, jsonify, request, g
+﻿import io
+
+from flask import Blueprint, abort, current_app, jsonify, request, g
 from flask_login import current_user, login_required
 from loguru import logger
 
 from app.models.user import User
+from app.services.import_service import SUPPORTED_FORMATS, detect_format, import_users
 from app.services.user_service import (
     ServiceResponse,
+    batch_update_users,
     change_password,
     create_user,
     delete_user,
+    list_users_page,
     update_user,
     update_user_group,
 )
+from app.services.user_search import search_users
+from app.utils.conditional import apply_validator, is_conditional, is_not_modified, not_modified_response
 from app.utils.decorators import permission_required
+from app.utils.passwords import HashingBusyError
+from app.utils.permissions import effective_permissions
 from app.utils.request_logger import log_user_action
 
 
@@ -36,6 +45,51 @@ def _build_response(result: ServiceResponse):
     return jsonify(payload)
 
 
+@user_bp.route('/')
+@login_required
+def list_users():
+    """分页获取用户列表
+    
+    请求方法: GET
+    查询参数: cursor - 上一页返回的 next_cursor（可选）
+              limit - 分页大小（可选，默认 USERS_PAGE_SIZE）
+    
+    Returns:
+        JSON: 包含 users、next_cursor 与 has_more 的字典
+    """
+    result = list_users_page(request.args.get('cursor'), request.args.get('limit'))
+    if not result.success:
+        return _build_response(result)
+    return jsonify(result.data)
+
+
+@user_bp.route('/search')
+@login_required
+def search_users_route():
+    """按用户名与邮箱搜索用户（前缀与子串匹配，按匹配程度排序）
+    
+    请求方法: GET
+    查询参数: q - 搜索关键字
+              limit - 返回条数（可选，默认 USER_SEARCH_LIMIT）
+              unassigned - 为 1 时只搜索未分配用户组的用户（可选，需要 edit_user 权限）
+    
+    Returns:
+        JSON: 包含 users 的字典
+    """
+    unassigned = request.args.get('unassigned') in ('1', 'true')
+    # 未分配用户的选择器与 group.get_available_users 一样需要 edit_user
+    if unassigned and 'edit_user' not in effective_permissions(current_user):
+        abort(403)
+    result = search_users(
+        request.args.get('q'),
+        request.args.get('limit'),
+        unassigned=unassigned,
+    )
+    if not result.success:
+        return _build_response(result)
+    return jsonify(result.data)
+
+
 @user_bp.route('/<int:user_id>/')
 @login_required
 def get_user(user_id):
@@ -45,8 +99,21 @@ def get_user(user_id):
         user_id: 用户ID
         
     Returns:
-        JSON: 用户信息字典
+        JSON: 用户信息字典；If-None-Match 命中时返回 304
     """
+    if is_conditional():
+        # 只查询版本列，未修改时不加载、不序列化用户
+        validator = User.find_validator(user_id)
+        if validator is None:
+            abort(404)
+        if is_not_modified(validator):
+            log_user_action(
+                "查看用户信息（未修改）",
+                user=current_user,
+                extra_data={"查看用户ID": user_id}
+            )
+            return not_modified_response(validator)
+
     user = User.query.get_or_404(user_id)
     # 记录查看用户信息行为
     log_user_action(
@@ -57,7 +124,7 @@ def get_user(user_id):
             "查看用户名": user.username
         }
     )
-    return jsonify(user.to_dict())
+    return apply_validator(jsonify(user.to_dict()), user.validator())
 
 
 @user_bp.route('/create/', methods=['POST'])
@@ -99,6 +166,101 @@ def create_user_route():
     return _build_response(result)
 
 
+@user_bp.route('/import/', methods=['POST'])
+@login_required
+@permission_required('add_user')
+def import_users_route():
+    """批量导入用户
+    
+    权限要求: add_user
+    请求方法: POST (multipart/form-data)
+    表单字段: file - CSV 或 JSON Lines 文件
+              format - 文件格式（可选，默认按扩展名判断）
+              default_group - 未指定用户组时使用的用户组名称（可选）
+    
+    大批量迁移建议使用 flask import-users 命令，避免请求超时。
+    
+    Returns:
+        JSON: 导入结果统计与逐行错误
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'status': 'error', 'message': '请上传导入文件'})
+
+    fmt = request.form.get('format') or detect_format(upload.filename)
+    if fmt not in SUPPORTED_FORMATS:
+        return jsonify({'status': 'error', 'message': f'不支持的导入格式: {fmt}'})
+
+    stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig')
+    try:
+        report = import_users(
+            stream,
+            fmt,
+            batch_size=current_app.config.get('USER_IMPORT_BATCH_SIZE', 1000),
+            default_group=request.form.get('default_group') or None,
+        )
+    except ValueError as exc:
+        return jsonify({'status': 'error', 'message': str(exc)})
+
+    log_user_action(
+        "批量导入用户",
+        user=current_user,
+        extra_data={
+            "文件名": upload.filename,
+            "总数": report.total,
+            "成功": report.inserted,
+            "失败": report.failed,
+            "耗时": round(report.elapsed, 3)
+        }
+    )
+    return _build_response(ServiceResponse(True, '导入完成', data=report.to_dict()))
+
+
+@user_bp.route('/batch/', methods=['POST'])
+@login_required
+def batch_users_route():
+    """批量操作用户
+    
+    权限要求: change_group / activate / deactivate 需要 edit_user，delete 需要 delete_user
+    请求方法: POST
+    请求体: JSON 格式，包含 ids、operation 以及 change_group 时的 group_id
+    
+    Returns:
+        JSON: 逐个用户ID的处理结果
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return _build_response(ServiceResponse(False, '请求体必须是 JSON 对象')), 400
+    operation = data.get('operation')
+    required = 'delete_user' if operation == 'delete' else 'edit_user'
+    if required not in effective_permissions(current_user):
+        abort(403)
+
+    result = batch_update_users(
+        data.get('ids'),
+        operation,
+        group_id=data.get('group_id'),
+        acting_user_id=current_user.id,
+    )
+
+    # 整批操作只记录一条汇总审计日志
+    log_user_action(
+        "批量操作用户" + ("成功" if result.success else "失败"),
+        user=current_user,
+        extra_data={
+            "操作": operation,
+            "用户数": result.data.get('requested', 0) if result.data else 0,
+            "新组ID": data.get('group_id', 'None') if operation == 'change_group' else '-',
+            "成功数": result.data.get('succeeded') if result.data else 0,
+            "失败明细": {
+                user_id: outcome for user_id, outcome in result.data['results'].items()
+                if outcome not in ('ok', 'unchanged')
+            } if result.data else result.message
+        }
+    )
+    return _build_response(result)
+
+
 @user_bp.route('/<int:user_id>/update/', methods=['POST'])
 @login_required
 @permission_required('edit_user')
@@ -210,7 +372,7 @@ def change_password_route(user_id):
     Returns:
         JSON: 修改结果
     """
-    if user_id != current_user.id and not current_user.has_permission('edit_user'):
+    if user_id != current_user.id and 'edit_user' not in effective_permissions(current_user):
         log_user_action(
             "尝试修改他人密码（无权限）",
             user=current_user,
@@ -235,7 +397,11 @@ def change_password_route(user_id):
         return jsonify({'status': 'error', 'message': '新密码不能为空'})
 
     if user_id == current_user.id:
-        if not user.verify_password(data.get('old_password', '')):
+        try:
+            old_password_valid = user.verify_password(data.get('old_password', ''))
+        except HashingBusyError:
+            return jsonify({'status': 'error', 'message': '服务繁忙，请稍后重试'})
+        if not old_password_valid:
             log_user_action(
                 "修改密码失败（旧密码错误）",
                 user=current_user,
@@ -4,10 +4,33 @@ from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from flask_cors import CORS
 
+from app.utils.async_db import AsyncDatabase
+from app.utils.db_routing import ReadRouter, RoutingSession
+from app.utils.log_control import LogControl
+from app.utils.log_pipeline import LogPipeline
+from app.utils.metrics import RequestMetrics
+from app.utils.passwords import PasswordHasher
+from app.utils.principal_cache import PrincipalCache
+from app.utils.rate_limit import RateLimiter
+from app.utils.response_cache import ResponseCache
+from app.utils.sql_stats import QueryTracker
+from app.utils.sqlite_tuning import SQLiteTuning
+
 # Centralised Flask extensions
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 migrate = Migrate()
 csrf = CSRFProtect()
 cors = CORS()
+principal_cache = PrincipalCache()
+password_hasher = PasswordHasher()
+rate_limiter = RateLimiter()
+log_pipeline = LogPipeline()
+log_control = LogControl()
+request_metrics = RequestMetrics()
+query_tracker = QueryTracker()
+sqlite_tuning = SQLiteTuning()
+read_router = ReadRouter()
+response_cache = ResponseCache()
+async_db = AsyncDatabase()
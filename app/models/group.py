@@ -1,31 +1,165 @@
-﻿from app.extensions import db
+﻿from datetime import datetime
 
+from sqlalchemy import event, func, select, update
 
+from app.extensions import db, response_cache
+from app.models.permission import group_permissions
+from app.utils.conditional import Validator, bump_version, latest
+from app.utils.permissions import permission_matrix
+from app.utils.response_cache import CACHE_KEYS_OPTION
+
+
+# 响应缓存键：全部用户组摘要、单个用户组详情、成员列表、未分配用户组的用户
+GROUPS_CACHE_KEY = 'groups:all'
+AVAILABLE_USERS_CACHE_KEY = 'groups:available'
+
+
+def group_cache_key(group_id):
+    return f'group:{group_id}'
+
+
+def members_cache_key(group_id):
+    return f'group_members:{group_id}'
+
+
+def membership_cache_keys(group_ids, counts=True):
+    """成员变化时失效的缓存键：各用户组的成员列表（None 对应未分配用户），
+    counts 为 True 时还包括用户组摘要与详情中的成员计数"""
+    keys = [AVAILABLE_USERS_CACHE_KEY if group_id is None else members_cache_key(group_id)
+            for group_id in group_ids]
+    if counts:
+        keys.append(GROUPS_CACHE_KEY)
+        keys.extend(group_cache_key(group_id) for group_id in group_ids if group_id is not None)
+    return keys
+
+
+@response_cache.cached_model
 class Group(db.Model):
     __tablename__ = 'groups'
+    # SQLite 不复用已删除的 id，新用户组不会得到与已删除用户组相同的 ETag
+    __table_args__ = {'sqlite_autoincrement': True}
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), unique=True, nullable=False)
     description = db.Column(db.String(256))
+    # 反范式的成员计数，由 user_service 的增删改维护，避免 len(self.users) 加载全部成员
+    member_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 行版本号，ORM 更新用户组自身字段时由 bump_version 递增
+    version_id = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    # 成员列表的聚合版本：成员增减或任一成员的展示字段变化时递增，用于成员列表的 ETag
+    members_version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    members_updated_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     users = db.relationship('User', back_populates='group')
+    permissions = db.relationship('Permission', secondary=group_permissions)
 
     SUPER_ADMIN = '超级管理员'
     ADMIN = '管理员'
     USER = '普通用户'
 
     def has_permission(self, permission):
-        """Basic permission check helper."""
-        if self.name == self.SUPER_ADMIN:
-            return True
-        if self.name == self.ADMIN:
-            return permission in ['edit_user', 'add_user']
-        return False
+        """Permission check against the compiled group bitmask."""
+        return permission_matrix.allows(self.id, permission)
+
+    @classmethod
+    def adjust_member_count(cls, group_id, delta):
+        """在当前事务中原子地增减成员计数，只失效该用户组的缓存键"""
+        if not group_id or not delta:
+            return
+        db.session.execute(
+            update(cls)
+            .where(cls.id == group_id)
+            .values(
+                member_count=cls.member_count + delta,
+                members_version=cls.members_version + 1,
+                members_updated_at=datetime.utcnow(),
+            ),
+            execution_options={CACHE_KEYS_OPTION: membership_cache_keys([group_id])},
+        )
+
+    @classmethod
+    def touch_members_statement(cls, group_ids):
+        """递增指定用户组 members_version 的 UPDATE 语句"""
+        return (
+            update(cls.__table__)
+            .where(cls.__table__.c.id.in_(group_ids))
+            .values(
+                members_version=cls.__table__.c.members_version + 1,
+                members_updated_at=datetime.utcnow(),
+            )
+        )
+
+    @classmethod
+    def touch_members(cls, group_ids):
+        """成员资料被 Core 批量修改后，在当前事务中使成员列表的 ETag 失效"""
+        group_ids = {group_id for group_id in group_ids if group_id}
+        if group_ids:
+            db.session.execute(
+                cls.touch_members_statement(group_ids),
+                execution_options={CACHE_KEYS_OPTION: membership_cache_keys(group_ids, counts=False)},
+            )
+
+    @classmethod
+    def recount_members(cls):
+        """用一条聚合语句按 users 表重算所有用户组的成员计数"""
+        from app.models.user import User
+
+        member_total = (
+            select(func.count(User.id))
+            .where(User.group_id == cls.id)
+            .scalar_subquery()
+        )
+        db.session.execute(
+            update(cls).values(
+                member_count=member_total,
+                members_version=cls.members_version + 1,
+                members_updated_at=datetime.utcnow(),
+            ),
+            execution_options={'synchronize_session': False},
+        )
+        db.session.expire_all()
+
+    def cache_keys(self, change):
+        """用户组自身变化时失效的缓存键（成员列表中包含用户组名称）"""
+        return [GROUPS_CACHE_KEY, group_cache_key(self.id), members_cache_key(self.id)]
+
+    def validator(self, members: bool = False) -> Validator:
+        return self.make_validator(
+            self.id, self.version_id, self.members_version, self.updated_at, self.members_updated_at, members,
+        )
+
+    @staticmethod
+    def make_validator(group_id, version_id, members_version, updated_at, members_updated_at,
+                       members: bool = False) -> Validator:
+        # 详情中的 user_count 随成员变化，因此详情与成员列表都包含 members_version
+        prefix = 'gm' if members else 'g'
+        return Validator(
+            f'{prefix}{group_id}.{version_id}.{members_version}',
+            latest(updated_at, members_updated_at),
+        )
+
+    @classmethod
+    def validator_statement(cls, group_id):
+        """只查询版本列的语句，结果行可直接传给 make_validator()"""
+        return (
+            select(cls.id, cls.version_id, cls.members_version, cls.updated_at, cls.members_updated_at)
+            .where(cls.id == group_id)
+        )
+
+    @classmethod
+    def find_validator(cls, group_id, members: bool = False):
+        """只查询版本列得到校验值，用户组不存在时返回 None"""
+        row = db.session.execute(cls.validator_statement(group_id)).first()
+        return cls.make_validator(*row, members=members) if row else None
 
     def to_dict(self):
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
-            'user_count': len(self.users)
+            'user_count': self.member_count or 0
         }
+
+
+event.listen(Group, 'before_update', bump_version)
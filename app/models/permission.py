@@ -0,0 +1,28 @@
+from app.extensions import db
+
+
+group_permissions = db.Table(
+    'group_permissions',
+    db.Column('group_id', db.Integer, db.ForeignKey('groups.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('permission_id', db.Integer, db.ForeignKey('permissions.id', ondelete='CASCADE'), primary_key=True),
+)
+
+
+class Permission(db.Model):
+    __tablename__ = 'permissions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(64), unique=True, nullable=False)
+    description = db.Column(db.String(256))
+
+    ADD_USER = 'add_user'
+    EDIT_USER = 'edit_user'
+    DELETE_USER = 'delete_user'
+    MANAGE_LOGS = 'manage_logs'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'code': self.code,
+            'description': self.description,
+        }
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+from app.extensions import db
+
+
+class SchemaState(db.Model):
+    """数据库结构与默认数据的版本标记（单行表）
+
+    记录最近一次初始化时模型结构与默认数据的指纹。启动时按主键读取这一行，
+    与当前模型、默认数据的指纹及 alembic_version 一起判断是否需要迁移与写入默认数据。
+    """
+    __tablename__ = 'schema_state'
+
+    SINGLETON_ID = 1
+
+    id = db.Column(db.Integer, primary_key=True)
+    schema_fingerprint = db.Column(db.String(64), nullable=False)
+    seed_fingerprint = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
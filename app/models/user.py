@@ -1,44 +1,114 @@
 ﻿from datetime import datetime
 
 from flask_login import UserMixin
-from werkzeug.security import check_password_hash, generate_password_hash
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import joinedload
 
-from app.extensions import db, login_manager
+from app.extensions import db, login_manager, password_hasher, principal_cache, read_router, response_cache
+from app.models.group import Group, membership_cache_keys
+from app.utils.conditional import Validator, bump_version, latest
+from app.utils.permissions import permission_matrix
+from app.utils.principal_cache import UserPrincipal
 
 
+@response_cache.cached_model
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
+    __table_args__ = (
+        # 列表分页使用 (created_at, id) 作为游标
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+        # SQLite 不复用已删除的 id，新用户不会得到与已删除用户相同的 ETag
+        {'sqlite_autoincrement': True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(64), unique=True, nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=True, index=True)
     password_hash = db.Column(db.String(128))
     is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # 分页游标的一部分，不允许为空
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 行版本号，ORM 更新时由 bump_version 递增；Core 批量更新需显式加一。用于生成 ETag
+    version_id = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'))
     group = db.relationship('Group', back_populates='users')
 
+    # 出现在成员列表中的字段，变化时需要递增所属用户组的 members_version
+    MEMBER_FIELDS = ('username', 'email', 'is_active', 'group_id')
+
     @property
     def password(self):
         raise AttributeError('密码不可读')
 
     @password.setter
     def password(self, value):
-        self.password_hash = generate_password_hash(value)
+        self.password_hash = password_hasher.hash(value)
 
     def verify_password(self, value):
-        return check_password_hash(self.password_hash, value)
+        return password_hasher.verify(self.password_hash, value)
+
+    @property
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
 
     def has_permission(self, permission):
-        if not self.group:
-            return False
-        return self.group.has_permission(permission)
+        return permission_matrix.allows(self.group_id, permission)
 
     @property
     def group_name(self):
         return self.group.name if self.group else None
 
+    def to_principal(self):
+        return UserPrincipal(
+            id=self.id,
+            username=self.username,
+            is_active=self.is_active,
+            group_name=self.group_name,
+            permissions=permission_matrix.for_group(self.group_id),
+        )
+
+    def cache_keys(self, change):
+        """用户变化时失效的缓存键：所在用户组的成员列表，成员增减时还包括计数"""
+        state = inspect(self)
+        if change == 'dirty' and not any(state.attrs[field].history.has_changes() for field in self.MEMBER_FIELDS):
+            return []
+        group_ids = {self.group_id, *state.attrs.group_id.history.deleted}
+        return membership_cache_keys(
+            group_ids, counts=change != 'dirty' or state.attrs.group_id.history.has_changes(),
+        )
+
+    @staticmethod
+    def make_validator(user_id, version_id, updated_at, group_version, group_updated_at) -> Validator:
+        # 详情中包含用户组名称，用户组的版本也参与 ETag
+        return Validator(
+            f'u{user_id}.{version_id}.{group_version or 0}',
+            latest(updated_at, group_updated_at),
+        )
+
+    def validator(self) -> Validator:
+        group = self.group
+        return self.make_validator(
+            self.id, self.version_id, self.updated_at,
+            group.version_id if group else None, group.updated_at if group else None,
+        )
+
+    @classmethod
+    def validator_statement(cls, user_id):
+        """只查询版本列的语句，结果行可直接传给 make_validator()"""
+        return (
+            select(cls.id, cls.version_id, cls.updated_at, Group.version_id, Group.updated_at)
+            .outerjoin(Group, cls.group_id == Group.id)
+            .where(cls.id == user_id)
+        )
+
+    @classmethod
+    def find_validator(cls, user_id):
+        """只查询版本列得到用户详情的校验值，用户不存在时返回 None"""
+        row = db.session.execute(cls.validator_statement(user_id)).first()
+        return cls.make_validator(*row) if row else None
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -50,6 +120,29 @@ class User(UserMixin, db.Model):
         }
 
 
+@principal_cache.principal_loader
+def load_principal(user_id):
+    # 快照按版本号在工作进程间缓存，必须读主库，避免把副本上的旧数据缓存到新版本号下
+    with read_router.primary_reads():
+        user = db.session.get(User, user_id, options=[joinedload(User.group)])
+    return user.to_principal() if user else None
+
+
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return principal_cache.get(int(user_id))
+
+
+event.listen(User, 'before_update', bump_version)
+
+
+@event.listens_for(User, 'after_update')
+def _touch_member_lists(mapper, connection, target):
+    """成员列表中的字段变化时递增新旧用户组的 members_version"""
+    state = inspect(target)
+    if not any(state.attrs[field].history.has_changes() for field in User.MEMBER_FIELDS):
+        return
+    group_ids = {target.group_id, *state.attrs.group_id.history.deleted}
+    group_ids.discard(None)
+    if group_ids:
+        connection.execute(Group.touch_members_statement(group_ids))
@@ -0,0 +1,141 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.extensions import async_db, response_cache
+from app.models.group import (
+    AVAILABLE_USERS_CACHE_KEY,
+    Group,
+    group_cache_key,
+    members_cache_key,
+)
+from app.models.user import User
+from app.services.group_service import pack_entry, unpack_entry
+from app.services.projections import USER_RECORD_FIELDS, UserRecord, select_user_records, user_dicts
+from app.utils.conditional import Validator
+from app.utils.permissions import permission_matrix
+from app.utils.principal_cache import UserPrincipal
+
+# ASGI 模式下读接口的异步实现，查询与缓存条目和同步的 group_service / 视图保持一致，
+# 两种模式可以共享同一个响应缓存；回填缓存的查询同样读主库
+
+
+async def load_principal(user_id: int) -> Optional[UserPrincipal]:
+    """异步加载登录用户快照，与同步的 app.models.user.load_principal 结果一致
+
+    快照会按版本号跨请求缓存，因此与回填共享缓存一样总是读主库。
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        Optional[UserPrincipal]: 用户快照，用户不存在时返回 None
+    """
+    async with async_db.session(primary=True) as session:
+        row = (await session.execute(select_user_records().where(User.id == user_id))).first()
+    if row is None:
+        return None
+    record = UserRecord._make(row)
+    return UserPrincipal(
+        id=record.id,
+        username=record.username,
+        is_active=record.is_active,
+        group_name=record.group_name,
+        permissions=permission_matrix.for_group(record.group_id),
+    )
+
+
+async def find_user_validator(user_id: int) -> Optional[Validator]:
+    """只查询版本列得到用户详情的校验值，用户不存在时返回 None"""
+    async with async_db.session() as session:
+        row = (await session.execute(User.validator_statement(user_id))).first()
+    return User.make_validator(*row) if row else None
+
+
+async def get_user_detail(user_id: int) -> Optional[Tuple[Dict[str, Any], Validator]]:
+    """用一条查询获取用户字典（与 User.to_dict() 相同）及其校验值
+
+    Args:
+        user_id: 用户ID
+
+    Returns:
+        Optional[Tuple[Dict[str, Any], Validator]]: 用户字典与校验值，用户不存在时返回 None
+    """
+    statement = select_user_records(
+        User.version_id, User.updated_at, Group.version_id, Group.updated_at,
+    ).where(User.id == user_id)
+    async with async_db.session() as session:
+        row = (await session.execute(statement)).first()
+    if row is None:
+        return None
+    width = len(USER_RECORD_FIELDS)
+    return dict(zip(USER_RECORD_FIELDS, row[:width])), User.make_validator(row[0], *row[width:])
+
+
+async def get_group_detail(group_id: int) -> Optional[Tuple[Dict[str, Any], Validator]]:
+    """异步获取用户组详情及其校验值，缓存条目与 group_service.get_group_detail 共用
+
+    Args:
+        group_id: 用户组ID
+
+    Returns:
+        Optional[Tuple[Dict[str, Any], Validator]]: 用户组字典与校验值，用户组不存在时返回 None
+    """
+    async def build():
+        async with async_db.session(primary=True) as session:
+            group = await session.get(Group, group_id)
+        return pack_entry(group.to_dict(), group.validator()) if group else None
+
+    return unpack_entry(await response_cache.get_or_set_async(group_cache_key(group_id), build))
+
+
+async def get_group_member_list(group_id: int) -> Optional[Tuple[Dict[str, Any], Validator]]:
+    """异步获取用户组成员列表及其校验值，缓存条目与 group_service.get_group_member_list 共用
+
+    Args:
+        group_id: 用户组ID
+
+    Returns:
+        Optional[Tuple[Dict[str, Any], Validator]]: 包含用户组名称与成员列表的字典和校验值，
+        用户组不存在时返回 None
+    """
+    async def build():
+        async with async_db.session(primary=True) as session:
+            group = await session.get(Group, group_id)
+            if group is None:
+                return None
+            result = await session.execute(
+                select_user_records().where(User.group_id == group_id).order_by(User.id)
+            )
+            members = user_dicts(result.tuples())
+        return pack_entry({'group_name': group.name, 'members': members}, group.validator(members=True))
+
+    return unpack_entry(await response_cache.get_or_set_async(members_cache_key(group_id), build))
+
+
+async def find_group_validator(group_id: int, members: bool = False) -> Optional[Validator]:
+    """获取用户组详情或成员列表的校验值，用于条件请求
+
+    缓存命中时直接取缓存条目中的校验值；未命中或未启用缓存时只查询版本列。
+    """
+    key = members_cache_key(group_id) if members else group_cache_key(group_id)
+    cached = unpack_entry(await response_cache.get_async(key))
+    if cached is not None:
+        return cached[1]
+    async with async_db.session() as session:
+        row = (await session.execute(Group.validator_statement(group_id))).first()
+    return Group.make_validator(*row, members=members) if row else None
+
+
+async def list_available_users() -> List[Dict[str, Any]]:
+    """异步获取未分配用户组的用户
+
+    Returns:
+        List[Dict[str, Any]]: 用户字典列表
+    """
+    async def build():
+        async with async_db.session(primary=True) as session:
+            result = await session.execute(
+                select_user_records().where(User.group_id.is_(None)).order_by(User.id)
+            )
+            return user_dicts(result.tuples())
+
+    return await response_cache.get_or_set_async(AVAILABLE_USERS_CACHE_KEY, build)
@@ -3,9 +3,10 @@ from typing import Optional
 
 from loguru import logger
 
-from app.extensions import db
+from app.extensions import db, rate_limiter
 from app.models.group import Group
 from app.models.user import User
+from app.utils.passwords import HashingBusyError
 
 
 @dataclass
@@ -16,7 +17,7 @@ class AuthResult:
         success: 认证是否成功
         user: 认证成功的用户对象（如果成功）
         message: 认证结果消息
-        status: 认证状态码 ('ok', 'invalid', 'disabled', 'error')
+        status: 认证状态码 ('ok', 'invalid', 'disabled', 'throttled', 'busy', 'error')
     """
     success: bool
     user: Optional[User] = None
@@ -24,18 +25,32 @@ class AuthResult:
     status: str = 'ok'
 
 
-def authenticate_user(username: str, password: str) -> AuthResult:
+def authenticate_user(username: str, password: str, ip: Optional[str] = None) -> AuthResult:
     """验证用户登录凭据
     
+    先按 IP 与用户名做登录限流，超限时不查询数据库也不计算哈希；登录成功不消耗限流额度。
+    
     Args:
         username: 用户名
         password: 密码
+        ip: 客户端IP，用于限流
         
     Returns:
         AuthResult: 认证结果对象
     """
+    attempt = rate_limiter.check_login(ip, username)
+    if attempt.retry_after is not None:
+        logger.warning('登录限流: 用户 {} / IP {}，{:.0f} 秒后可重试', username, ip, attempt.retry_after)
+        return AuthResult(success=False, message='登录尝试过于频繁，请稍后再试', status='throttled')
+
     user = User.query.filter_by(username=username).first()
-    if user is None or not user.verify_password(password):
+    try:
+        verified = user is not None and user.verify_password(password)
+    except HashingBusyError:
+        logger.warning('用户 {} 登录被拒绝: 密码哈希队列已满', username)
+        return AuthResult(success=False, message='登录请求过多，请稍后重试', status='busy')
+
+    if not verified:
         logger.warning('用户 {} 登录失败: 凭证无效', username)
         return AuthResult(success=False, message='用户名或密码错误', status='invalid')
 
@@ -43,10 +58,37 @@ def authenticate_user(username: str, password: str) -> AuthResult:
         logger.warning('禁用账号尝试登录: {}', username)
         return AuthResult(success=False, user=user, message='账号已被禁用', status='disabled')
 
+    if user.password_needs_rehash:
+        _rehash_password(user, password)
+
+    rate_limiter.login_succeeded(attempt)
     logger.info('用户 {} 登录成功', username)
     return AuthResult(success=True, user=user)
 
 
+def _rehash_password(user: User, password: str) -> None:
+    """登录成功后按当前配置的哈希算法与成本重新保存密码
+    
+    失败时仅记录日志，不影响本次登录。
+    
+    Args:
+        user: 已通过校验的用户对象
+        password: 明文密码
+    """
+    try:
+        user.password = password
+        db.session.commit()
+    except HashingBusyError:
+        db.session.rollback()
+        logger.debug('密码哈希队列已满，跳过用户 {} 的重新哈希', user.username)
+        return
+    except Exception:
+        db.session.rollback()
+        logger.exception('用户 {} 密码重新哈希失败', user.username)
+        return
+    logger.info('用户 {} 的密码已按新参数重新哈希', user.username)
+
+
 def register_user(username: str, email: Optional[str], password: str) -> AuthResult:
     """注册新用户
     
@@ -58,11 +100,15 @@ def register_user(username: str, email: Optional[str], password: str) -> AuthRes
     Returns:
         AuthResult: 注册结果对象
     """
-    user = User(
-        username=username,
-        email=(email or '').strip() or None,
-        password=password,
-    )
+    try:
+        user = User(
+            username=username,
+            email=(email or '').strip() or None,
+            password=password,
+        )
+    except HashingBusyError:
+        logger.warning('注册被拒绝: 密码哈希队列已满 ({})', username)
+        return AuthResult(success=False, user=None, message='服务繁忙，请稍后重试', status='busy')
 
     default_group = Group.query.filter_by(name=Group.USER).first()
     if default_group:
@@ -70,6 +116,8 @@ def register_user(username: str, email: Optional[str], password: str) -> AuthRes
 
     try:
         db.session.add(user)
+        if default_group:
+            Group.adjust_member_count(default_group.id, 1)
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
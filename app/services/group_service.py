@@ -0,0 +1,124 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.extensions import db, read_router, response_cache
+from app.models.group import (
+    AVAILABLE_USERS_CACHE_KEY,
+    GROUPS_CACHE_KEY,
+    Group,
+    group_cache_key,
+    members_cache_key,
+)
+from app.models.user import User
+from app.services.projections import fetch_user_dicts, select_user_records
+from app.utils.conditional import Validator
+
+# 缓存条目跨请求共享，回填时的查询都在 read_router.primary_reads() 中执行：
+# 副本可能落后于主库，从副本读到的旧数据写入缓存后会一直保留到下次失效或过期
+
+
+def pack_entry(data: Any, validator: Validator) -> Dict[str, Any]:
+    """组装可 JSON 序列化的缓存条目，校验值随数据一起缓存"""
+    modified = validator.last_modified
+    return {
+        'data': data,
+        'etag': validator.etag,
+        'modified': modified.replace(tzinfo=timezone.utc).timestamp() if modified else None,
+    }
+
+
+def unpack_entry(entry: Optional[Dict[str, Any]]) -> Optional[Tuple[Any, Validator]]:
+    if entry is None:
+        return None
+    modified = entry['modified']
+    last_modified = datetime.fromtimestamp(modified, timezone.utc).replace(tzinfo=None) if modified else None
+    return entry['data'], Validator(entry['etag'], last_modified)
+
+
+def list_group_summaries() -> List[Dict[str, Any]]:
+    """获取全部用户组摘要（首页使用）
+
+    Returns:
+        List[Dict[str, Any]]: 按ID排序的用户组字典列表
+    """
+    def build():
+        with read_router.primary_reads():
+            return [group.to_dict() for group in Group.query.order_by(Group.id).all()]
+
+    return response_cache.get_or_set(GROUPS_CACHE_KEY, build)
+
+
+def get_group_detail(group_id: int) -> Optional[Tuple[Dict[str, Any], Validator]]:
+    """获取用户组详情及其校验值
+
+    Args:
+        group_id: 用户组ID
+
+    Returns:
+        Optional[Tuple[Dict[str, Any], Validator]]: 用户组字典与校验值，用户组不存在时返回 None
+    """
+    def build():
+        with read_router.primary_reads():
+            group = db.session.get(Group, group_id, populate_existing=True)
+            return pack_entry(group.to_dict(), group.validator()) if group else None
+
+    return unpack_entry(response_cache.get_or_set(group_cache_key(group_id), build))
+
+
+def get_group_member_list(group_id: int) -> Optional[Tuple[Dict[str, Any], Validator]]:
+    """获取用户组成员列表及其校验值
+
+    Args:
+        group_id: 用户组ID
+
+    Returns:
+        Optional[Tuple[Dict[str, Any], Validator]]: 包含用户组名称与成员列表的字典和校验值，
+        用户组不存在时返回 None
+    """
+    def build():
+        with read_router.primary_reads():
+            group = db.session.get(Group, group_id, populate_existing=True)
+            if group is None:
+                return None
+            payload = {
+                'group_name': group.name,
+                'members': fetch_user_dicts(
+                    select_user_records().where(User.group_id == group_id).order_by(User.id)
+                ),
+            }
+            return pack_entry(payload, group.validator(members=True))
+
+    return unpack_entry(response_cache.get_or_set(members_cache_key(group_id), build))
+
+
+def find_group_validator(group_id: int, members: bool = False) -> Optional[Validator]:
+    """获取用户组详情或成员列表的校验值，用于条件请求
+
+    缓存命中时直接取缓存条目中的校验值；未命中或未启用缓存时只查询版本列，
+    不为一次条件请求加载整个成员列表。
+
+    Args:
+        group_id: 用户组ID
+        members: 为 True 时返回成员列表的校验值
+
+    Returns:
+        Optional[Validator]: 校验值，用户组不存在时返回 None
+    """
+    key = members_cache_key(group_id) if members else group_cache_key(group_id)
+    cached = unpack_entry(response_cache.get(key))
+    if cached is not None:
+        return cached[1]
+    return Group.find_validator(group_id, members=members)
+
+
+def list_available_users() -> List[Dict[str, Any]]:
+    """获取未分配用户组的用户
+
+    Returns:
+        List[Dict[str, Any]]: 用户字典列表
+    """
+    def build():
+        with read_router.primary_reads():
+            return fetch_user_dicts(select_user_records().where(User.group_id.is_(None)).order_by(User.id))
+
+    return response_cache.get_or_set(AVAILABLE_USERS_CACHE_KEY, build)
@@ -0,0 +1,316 @@
+import csv
+import json
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from loguru import logger
+from sqlalchemy.exc import IntegrityError
+
+from config import strtobool
+from app.extensions import db, password_hasher
+from app.models.group import Group, membership_cache_keys
+from app.models.user import User
+from app.services.user_search import deferred_search_index
+from app.utils.passwords import is_supported_hash
+from app.utils.response_cache import CACHE_KEYS_OPTION
+
+
+SUPPORTED_FORMATS = ('csv', 'jsonl')
+
+
+@dataclass
+class ImportReport:
+    """批量导入结果
+
+    Attributes:
+        total: 读取的记录数
+        inserted: 成功写入的用户数
+        failed: 失败的记录数
+        errors: (行号, 原因) 列表，最多保留 max_errors 条
+        elapsed: 耗时（秒）
+    """
+    total: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+    max_errors: int = 100
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, line_no: int, reason: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line_no, reason))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'elapsed': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'errors': [{'line': line_no, 'reason': reason} for line_no, reason in self.errors],
+        }
+
+
+def detect_format(filename: Optional[str], default: str = 'csv') -> str:
+    """根据文件扩展名判断导入格式
+
+    Args:
+        filename: 文件名
+        default: 无法判断时使用的格式
+
+    Returns:
+        str: 'csv' 或 'jsonl'
+    """
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return default
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], str]]:
+    """逐行读取导入文件，不一次性载入内存
+
+    Args:
+        stream: 文本流
+        fmt: 'csv' 或 'jsonl'
+
+    Yields:
+        Tuple[int, dict, str]: (行号, 记录, 解析错误)，解析失败时记录为 None
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record, ''
+        return
+
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f'JSON 解析失败: {exc}'
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, '每行必须是 JSON 对象'
+            continue
+        yield line_no, record, ''
+
+
+def _insert_options(values: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """批量 INSERT 的执行选项：只失效新用户所在用户组的成员列表与计数"""
+    return {CACHE_KEYS_OPTION: membership_cache_keys({value['group_id'] for value in values})}
+
+
+class _BatchWriter:
+    """按批次校验、哈希并写入用户"""
+
+    def __init__(self, report: ImportReport, group_map: Dict[str, int],
+                 default_group_id: Optional[int], executor: Optional[Executor]):
+        self.report = report
+        self.group_map = group_map
+        self.default_group_id = default_group_id
+        self.executor = executor
+        self.seen_usernames = set()
+        self.seen_emails = set()
+
+    def _prepare(self, line_no: int, record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        username = str(record.get('username') or '').strip()
+        if not username:
+            self.report.add_error(line_no, '用户名不能为空')
+            return None
+        if len(username) > 64:
+            self.report.add_error(line_no, '用户名过长')
+            return None
+
+        email = str(record.get('email') or '').strip() or None
+        password = record.get('password')
+        password_hash = record.get('password_hash')
+        for field, value in (('password', password), ('password_hash', password_hash)):
+            # JSON Lines 中的数字等非字符串值无法哈希或校验
+            if value is not None and not isinstance(value, str):
+                self.report.add_error(line_no, f'{field} 必须是字符串')
+                return None
+        password = password or None
+        password_hash = password_hash or None
+        if not password and not password_hash:
+            self.report.add_error(line_no, '缺少 password 或 password_hash')
+            return None
+        if password_hash and not is_supported_hash(password_hash):
+            # 没有明文无法重新哈希，不认识的格式直接拒绝，避免写入无法校验或伪造的值
+            self.report.add_error(line_no, 'password_hash 不是支持的哈希格式')
+            return None
+
+        group_name = str(record.get('group') or record.get('group_name') or '').strip()
+        if group_name:
+            group_id = self.group_map.get(group_name)
+            if group_id is None:
+                self.report.add_error(line_no, f'用户组不存在: {group_name}')
+                return None
+        else:
+            group_id = self.default_group_id
+
+        if username in self.seen_usernames:
+            self.report.add_error(line_no, f'用户名重复: {username}')
+            return None
+        if email and email in self.seen_emails:
+            self.report.add_error(line_no, f'邮箱重复: {email}')
+            return None
+        self.seen_usernames.add(username)
+        if email:
+            self.seen_emails.add(email)
+
+        # JSON 中的 false 必须保留，只有缺省或空字符串（CSV 空列）才使用默认值
+        is_active = record.get('is_active')
+        return {
+            'line_no': line_no,
+            'username': username,
+            'email': email,
+            'password': password,
+            'password_hash': password_hash,
+            'is_active': strtobool(None if is_active in (None, '') else is_active, True),
+            'group_id': group_id,
+        }
+
+    def _drop_existing(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        usernames = [row['username'] for row in rows]
+        emails = [row['email'] for row in rows if row['email']]
+        taken_usernames = {
+            name for name, in db.session.query(User.username).filter(User.username.in_(usernames))
+        }
+        taken_emails = {
+            email for email, in db.session.query(User.email).filter(User.email.in_(emails))
+        } if emails else set()
+
+        remaining = []
+        for row in rows:
+            if row['username'] in taken_usernames:
+                self.report.add_error(row['line_no'], f"用户名已存在: {row['username']}")
+            elif row['email'] in taken_emails:
+                self.report.add_error(row['line_no'], f"邮箱已存在: {row['email']}")
+            else:
+                remaining.append(row)
+        return remaining
+
+    def write(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        rows = [row for row in (self._prepare(line_no, record) for line_no, record in batch) if row]
+        if not rows:
+            return
+        rows = self._drop_existing(rows)
+        if not rows:
+            return
+
+        pending = [row for row in rows if not row['password_hash']]
+        hashes = password_hasher.hash_many([row['password'] for row in pending], executor=self.executor)
+        for row, password_hash in zip(pending, hashes):
+            row['password_hash'] = password_hash
+
+        now = datetime.utcnow()
+        values = [{
+            'username': row['username'],
+            'email': row['email'],
+            'password_hash': row['password_hash'],
+            'is_active': row['is_active'],
+            'group_id': row['group_id'],
+            'created_at': now,
+        } for row in rows]
+
+        try:
+            with deferred_search_index():
+                db.session.execute(User.__table__.insert(), values, execution_options=_insert_options(values))
+            self._adjust_member_counts(values)
+            db.session.commit()
+            self.report.inserted += len(values)
+        except IntegrityError:
+            # 与并发写入冲突时逐行重试，定位具体失败的记录
+            db.session.rollback()
+            self._write_rows(rows, values)
+
+    def _write_rows(self, rows: List[Dict[str, Any]], values: List[Dict[str, Any]]) -> None:
+        for row, value in zip(rows, values):
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(User.__table__.insert(), [value], execution_options=_insert_options([value]))
+                    Group.adjust_member_count(value['group_id'], 1)
+                self.report.inserted += 1
+            except IntegrityError as exc:
+                self.report.add_error(row['line_no'], str(exc.orig))
+        db.session.commit()
+
+    @staticmethod
+    def _adjust_member_counts(values: List[Dict[str, Any]]) -> None:
+        deltas: Dict[int, int] = {}
+        for value in values:
+            if value['group_id']:
+                deltas[value['group_id']] = deltas.get(value['group_id'], 0) + 1
+        for group_id, delta in deltas.items():
+            Group.adjust_member_count(group_id, delta)
+
+
+def import_users(stream: TextIO, fmt: str = 'csv', batch_size: int = 1000,
+                 default_group: Optional[str] = None, executor: Optional[Executor] = None,
+                 max_errors: int = 100) -> ImportReport:
+    """流式批量导入用户
+
+    支持的字段: username、email、password 或 password_hash（werkzeug 的 scrypt / pbkdf2 格式，
+    成本参数与当前配置不同的哈希在用户下次登录时重新计算）、
+    group（用户组名称）、is_active。每批次使用一次查询检查重名、
+    进程池并行哈希、一次 executemany 写入并提交。
+
+    Args:
+        stream: CSV 或 JSON Lines 文本流
+        fmt: 'csv' 或 'jsonl'
+        batch_size: 每批写入的记录数
+        default_group: 记录未指定用户组时使用的用户组名称
+        executor: 哈希使用的进程池，默认使用应用的密码哈希进程池
+        max_errors: 报告中保留的错误明细数
+
+    Returns:
+        ImportReport: 导入结果
+
+    Raises:
+        ValueError: 格式不支持或默认用户组不存在
+    """
+    if fmt not in SUPPORTED_FORMATS:
+        raise ValueError(f'不支持的导入格式: {fmt}')
+
+    group_map = {name: group_id for group_id, name in db.session.query(Group.id, Group.name)}
+    default_group_id = None
+    if default_group:
+        default_group_id = group_map.get(default_group)
+        if default_group_id is None:
+            raise ValueError(f'默认用户组不存在: {default_group}')
+
+    report = ImportReport(max_errors=max_errors)
+    writer = _BatchWriter(report, group_map, default_group_id, executor)
+    started = time.perf_counter()
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    for line_no, record, error in iter_records(stream, fmt):
+        report.total += 1
+        if record is None:
+            report.add_error(line_no, error)
+            continue
+        batch.append((line_no, record))
+        if len(batch) >= batch_size:
+            writer.write(batch)
+            batch = []
+            logger.debug('批量导入进度: 已读取 {} 条，已写入 {} 条', report.total, report.inserted)
+
+    if batch:
+        writer.write(batch)
+
+    report.elapsed = time.perf_counter() - started
+    logger.info(
+        '批量导入完成: 共 {} 条，成功 {} 条，失败 {} 条，耗时 {:.2f}s（{:.0f} 条/秒）',
+        report.total, report.inserted, report.failed, report.elapsed, report.rows_per_second,
+    )
+    return report
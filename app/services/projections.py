@@ -0,0 +1,61 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy import Select, select
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+
+
+class UserRecord(NamedTuple):
+    """只读的用户列表记录，字段与 User.to_dict() 一致
+
+    基于元组，不含 password_hash，也不进入会话的标识映射。
+    """
+    id: int
+    username: str
+    email: Optional[str]
+    is_active: Optional[bool]
+    group_name: Optional[str]
+    group_id: Optional[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._fields, self))
+
+
+USER_RECORD_FIELDS = UserRecord._fields
+
+
+def select_user_records(*extra_columns) -> Select:
+    """选择 UserRecord 各列的查询，用户组名称通过一次外连接获得
+
+    Args:
+        *extra_columns: 追加在记录列之后的列（如分页游标需要的 created_at）
+
+    Returns:
+        Select: 可继续追加 where / order_by / limit 的查询
+    """
+    return (
+        select(User.id, User.username, User.email, User.is_active, Group.name, User.group_id, *extra_columns)
+        .outerjoin(Group, User.group_id == Group.id)
+    )
+
+
+def fetch_user_records(statement: Select) -> List[UserRecord]:
+    """执行 select_user_records() 构造的查询并返回 UserRecord 列表"""
+    return [UserRecord._make(row) for row in db.session.execute(statement).tuples()]
+
+
+def fetch_user_dicts(statement: Select) -> List[Dict[str, Any]]:
+    """执行 select_user_records() 构造的查询，直接返回可序列化的字典列表
+
+    Returns:
+        List[Dict[str, Any]]: 与 User.to_dict() 相同结构的字典，追加的列不包含在内
+    """
+    return user_dicts(db.session.execute(statement).tuples())
+
+
+def user_dicts(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """把 select_user_records() 的结果行转换为字典列表（异步会话的查询结果也使用此函数）"""
+    fields = USER_RECORD_FIELDS
+    return [dict(zip(fields, row)) for row in rows]
@@ -1,11 +1,19 @@
-﻿from dataclasses import dataclass
-from typing import Any, Dict, Optional
+﻿import base64
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 
+from flask import current_app
 from loguru import logger
+from sqlalchemy import delete, update
 
-from app.extensions import db
-from app.models.group import Group
+from config import strtobool
+from app.extensions import db, principal_cache
+from app.models.group import Group, membership_cache_keys
 from app.models.user import User
+from app.services.projections import USER_RECORD_FIELDS, select_user_records
+from app.utils.passwords import HashingBusyError
+from app.utils.response_cache import CACHE_KEYS_OPTION
 
 
 @dataclass
@@ -53,21 +61,109 @@ def _normalise_group_id(value: Optional[Any]) -> Optional[int]:
         return None
 
 
-def _to_bool(value: Any, default: bool = True) -> bool:
-    """将值转换为布尔类型
+def _move_member(previous_group_id: Optional[int], group_id: Optional[int]) -> None:
+    """在用户组之间迁移成员时维护两侧的成员计数
     
     Args:
-        value: 待转换的值
-        default: 默认值
+        previous_group_id: 原用户组ID
+        group_id: 新用户组ID
+    """
+    if previous_group_id == group_id:
+        return
+    Group.adjust_member_count(previous_group_id, -1)
+    Group.adjust_member_count(group_id, 1)
+
+
+def encode_cursor(created_at: datetime, user_id: int) -> str:
+    """将分页位置编码为不透明游标
+    
+    Args:
+        created_at: 当前页最后一位用户的创建时间
+        user_id: 当前页最后一位用户的ID
+        
+    Returns:
+        str: URL 安全的游标字符串
+    """
+    raw = f'{created_at.isoformat()}|{user_id}'.encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """解析分页游标
+    
+    Args:
+        cursor: encode_cursor 生成的游标字符串
         
     Returns:
-        bool: 转换后的布尔值
+        Tuple[datetime, int]: (创建时间, 用户ID)
+        
+    Raises:
+        ValueError: 游标格式无效
     """
-    if isinstance(value, bool):
-        return value
-    if value is None:
-        return default
-    return str(value).strip().lower() in {'1', 'true', 'yes', 'on'}
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, user_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|', 1)
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError('无效的分页游标') from exc
+
+
+def _normalise_page_size(value: Optional[Any]) -> int:
+    """规范化分页大小，限制在配置允许的范围内
+    
+    Args:
+        value: 请求中的分页大小
+        
+    Returns:
+        int: 实际使用的分页大小
+    """
+    default = current_app.config.get('USERS_PAGE_SIZE', 50)
+    maximum = current_app.config.get('USERS_PAGE_SIZE_MAX', 200)
+    try:
+        size = int(value) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, maximum))
+
+
+def list_users_page(cursor: Optional[str] = None, limit: Optional[Any] = None) -> ServiceResponse:
+    """按 (created_at, id) 键集分页获取用户列表
+    
+    每次只读取 limit + 1 行，通过复合索引定位游标位置，
+    请求耗时不随用户总数增长。
+    
+    Args:
+        cursor: 上一页返回的 next_cursor，为空表示第一页
+        limit: 分页大小，默认取 USERS_PAGE_SIZE
+        
+    Returns:
+        ServiceResponse: data 包含 users、next_cursor 与 has_more
+    """
+    page_size = _normalise_page_size(limit)
+    # 只读取序列化需要的列，created_at 追加在末尾用于生成游标
+    statement = select_user_records(User.created_at).order_by(User.created_at, User.id)
+
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except ValueError as exc:
+            return ServiceResponse(False, str(exc))
+        statement = statement.where(db.tuple_(User.created_at, User.id) > position)
+
+    rows = db.session.execute(statement.limit(page_size + 1)).tuples().all()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last[-1], last[0])
+
+    return ServiceResponse(True, '', data={
+        'users': [dict(zip(USER_RECORD_FIELDS, row)) for row in rows],
+        'next_cursor': next_cursor,
+        'has_more': has_more,
+    })
 
 
 def create_user(payload: Dict[str, Any]) -> ServiceResponse:
@@ -86,12 +182,15 @@ def create_user(payload: Dict[str, Any]) -> ServiceResponse:
     if User.query.filter_by(username=username).first():
         return ServiceResponse(False, '用户名已存在')
 
-    user = User(
-        username=username,
-        email=(payload.get('email') or '').strip() or None,
-        password=payload.get('password'),
-        is_active=_to_bool(payload.get('is_active'), True)
-    )
+    try:
+        user = User(
+            username=username,
+            email=(payload.get('email') or '').strip() or None,
+            password=payload.get('password'),
+            is_active=strtobool(payload.get('is_active'), True)
+        )
+    except HashingBusyError:
+        return ServiceResponse(False, '服务繁忙，请稍后重试')
 
     group = _load_group(_normalise_group_id(payload.get('group_id')))
     if group:
@@ -99,6 +198,7 @@ def create_user(payload: Dict[str, Any]) -> ServiceResponse:
 
     try:
         db.session.add(user)
+        _move_member(None, group.id if group else None)
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
@@ -129,22 +229,30 @@ def update_user(user: User, payload: Dict[str, Any]) -> ServiceResponse:
         user.email = (payload.get('email') or '').strip() or None
 
     if payload.get('password'):
-        user.password = payload['password']
+        try:
+            user.password = payload['password']
+        except HashingBusyError:
+            db.session.rollback()
+            return ServiceResponse(False, '服务繁忙，请稍后重试')
 
     if 'is_active' in payload:
-        user.is_active = _to_bool(payload.get('is_active'), user.is_active)
+        user.is_active = strtobool(payload.get('is_active'), user.is_active)
 
+    previous_group_id = group_id = user.group_id
     if 'group_id' in payload:
         group = _load_group(_normalise_group_id(payload.get('group_id')))
         user.group = group
+        group_id = group.id if group else None
 
     try:
+        _move_member(previous_group_id, group_id)
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
         logger.exception('更新用户失败: %s', user.username)
         return ServiceResponse(False, str(exc))
 
+    principal_cache.invalidate(user.id)
     logger.info('更新用户成功: %s', user.username)
     return ServiceResponse(True, '用户更新成功', data=user.to_dict())
 
@@ -159,7 +267,9 @@ def delete_user(user: User) -> ServiceResponse:
         ServiceResponse: 服务响应对象
     """
     username = user.username
+    user_id = user.id
     try:
+        _move_member(user.group_id, None)
         db.session.delete(user)
         db.session.commit()
     except Exception as exc:
@@ -167,6 +277,7 @@ def delete_user(user: User) -> ServiceResponse:
         logger.exception('删除用户失败: %s', username)
         return ServiceResponse(False, str(exc))
 
+    principal_cache.invalidate(user_id)
     logger.info('删除用户成功: %s', username)
     return ServiceResponse(True, '用户删除成功')
 
@@ -181,14 +292,18 @@ def change_password(user: User, new_password: str) -> ServiceResponse:
     Returns:
         ServiceResponse: 服务响应对象
     """
-    user.password = new_password
     try:
+        user.password = new_password
         db.session.commit()
+    except HashingBusyError:
+        db.session.rollback()
+        return ServiceResponse(False, '服务繁忙，请稍后重试')
     except Exception as exc:
         db.session.rollback()
         logger.exception('修改密码失败: %s', user.username)
         return ServiceResponse(False, str(exc))
 
+    principal_cache.invalidate(user.id)
     logger.info('修改密码成功: %s', user.username)
     return ServiceResponse(True, '密码修改成功')
 
@@ -203,12 +318,147 @@ def update_user_group(user: User, group_id: Optional[Any]) -> ServiceResponse:
     Returns:
         ServiceResponse: 服务响应对象
     """
+    previous_group_id = user.group_id
     group = _load_group(_normalise_group_id(group_id))
     user.group = group
     try:
+        _move_member(previous_group_id, group.id if group else None)
         db.session.commit()
     except Exception as exc:
         db.session.rollback()
         logger.exception('调整用户组失败: %s', user.username)
         return ServiceResponse(False, str(exc))
+
+    principal_cache.invalidate(user.id)
     return ServiceResponse(True, '操作成功', data=user.to_dict())
+
+
+BATCH_OPERATIONS = ('change_group', 'activate', 'deactivate', 'delete')
+
+
+def _normalise_ids(values: Any) -> List[int]:
+    """规范化批量操作的用户ID列表，去重并保持顺序
+    
+    Args:
+        values: 请求中的ID列表
+        
+    Returns:
+        List[int]: 有效的用户ID列表
+    """
+    if not isinstance(values, (list, tuple)):
+        return []
+    ids: List[int] = []
+    for value in values:
+        # JSON 中的 true/false 不是用户ID，int() 会把它们当作 1/0
+        if isinstance(value, bool):
+            continue
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return list(dict.fromkeys(ids))
+
+
+def batch_update_users(ids: Any, operation: str, group_id: Optional[Any] = None,
+                       acting_user_id: Optional[int] = None) -> ServiceResponse:
+    """批量修改用户组、启用/禁用或删除用户
+    
+    一次查询读取目标用户，一条 UPDATE/DELETE 完成变更，并在同一事务中维护成员计数。
+    
+    Args:
+        ids: 用户ID列表
+        operation: 操作类型，取值见 BATCH_OPERATIONS
+        group_id: change_group 操作的目标用户组ID
+        acting_user_id: 当前操作者ID，删除时会跳过自己
+        
+    Returns:
+        ServiceResponse: data 包含去重后的请求数（requested）、逐个ID的处理结果与受影响用户组的最新信息
+    """
+    if operation not in BATCH_OPERATIONS:
+        return ServiceResponse(False, f'不支持的批量操作: {operation}')
+
+    user_ids = _normalise_ids(ids)
+    if not user_ids:
+        return ServiceResponse(False, '请选择要操作的用户')
+    max_size = current_app.config.get('USER_BATCH_MAX_SIZE', 1000)
+    if len(user_ids) > max_size:
+        return ServiceResponse(False, f'单次最多操作 {max_size} 位用户')
+
+    target_group = None
+    if operation == 'change_group':
+        target_group = _load_group(_normalise_group_id(group_id))
+        if group_id not in (None, '', 'null') and target_group is None:
+            return ServiceResponse(False, '用户组不存在')
+    target_group_id = target_group.id if target_group else None
+
+    rows = db.session.query(User.id, User.group_id, User.is_active).filter(User.id.in_(user_ids)).all()
+    found = {row.id: row for row in rows}
+
+    results: Dict[int, str] = {}
+    affected: List[int] = []
+    for user_id in user_ids:
+        row = found.get(user_id)
+        if row is None:
+            results[user_id] = 'not_found'
+        elif operation == 'delete' and user_id == acting_user_id:
+            results[user_id] = 'skipped_self'
+        elif operation == 'change_group' and row.group_id == target_group_id:
+            results[user_id] = 'unchanged'
+        elif operation in ('activate', 'deactivate') and bool(row.is_active) == (operation == 'activate'):
+            results[user_id] = 'unchanged'
+        else:
+            results[user_id] = 'ok'
+            affected.append(user_id)
+
+    group_deltas: Dict[int, int] = {}
+    if operation in ('change_group', 'delete'):
+        for user_id in affected:
+            previous_group_id = found[user_id].group_id
+            if previous_group_id:
+                group_deltas[previous_group_id] = group_deltas.get(previous_group_id, 0) - 1
+            if target_group_id:
+                group_deltas[target_group_id] = group_deltas.get(target_group_id, 0) + 1
+
+    if affected:
+        if operation == 'delete':
+            statement = delete(User).where(User.id.in_(affected))
+        elif operation == 'change_group':
+            statement = update(User).where(User.id.in_(affected)).values(
+                group_id=target_group_id, version_id=User.version_id + 1)
+        else:
+            statement = update(User).where(User.id.in_(affected)).values(
+                is_active=operation == 'activate', version_id=User.version_id + 1)
+
+        # 批量语句只影响涉及的用户组，缓存按这些用户组失效而不是整体清空
+        touched_group_ids = {found[user_id].group_id for user_id in affected}
+        if operation == 'change_group':
+            touched_group_ids.add(target_group_id)
+        cache_keys = membership_cache_keys(touched_group_ids, counts=operation in ('change_group', 'delete'))
+
+        try:
+            db.session.execute(statement, execution_options={
+                'synchronize_session': False, CACHE_KEYS_OPTION: cache_keys,
+            })
+            for changed_group_id, delta in group_deltas.items():
+                Group.adjust_member_count(changed_group_id, delta)
+            if operation in ('activate', 'deactivate'):
+                Group.touch_members(touched_group_ids)
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            logger.exception('批量操作用户失败: {} {}', operation, affected)
+            return ServiceResponse(False, str(exc))
+
+        for user_id in affected:
+            principal_cache.invalidate(user_id)
+
+    groups = Group.query.filter(Group.id.in_(group_deltas)).all() if group_deltas else []
+    logger.info('批量操作用户完成: {}，成功 {} / 共 {}', operation, len(affected), len(user_ids))
+    return ServiceResponse(True, '批量操作完成', data={
+        'operation': operation,
+        'requested': len(user_ids),
+        'succeeded': len(affected),
+        'failed': sum(1 for outcome in results.values() if outcome not in ('ok', 'unchanged')),
+        'results': {str(user_id): outcome for user_id, outcome in results.items()},
+        'groups': [group.to_dict() for group in groups],
+    })
@@ -0,0 +1,107 @@
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from flask import has_request_context
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.utils.db_routing import REPLICA_BIND, set_query_only
+
+# 同步方言对应的异步驱动
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+    'mysql': 'aiomysql',
+}
+
+
+def async_url(url: URL) -> URL:
+    """把同步引擎的数据库 URL 转换为对应异步驱动的 URL"""
+    backend = url.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise RuntimeError(f'数据库 {backend} 没有可用的异步驱动')
+    return url.set(drivername=f'{backend}+{driver}')
+
+
+class AsyncDatabase:
+    """ASGI 模式下异步视图使用的数据库引擎（可选功能，SQLite 需要安装 aiosqlite）
+
+    引擎由应用同步引擎的 URL 派生，在各工作进程首次使用时创建，fork 之前不会建立连接；
+    SQLite 连接执行与同步引擎相同的 PRAGMA，只读副本连接同样启用 query_only。
+    同步模式下从不创建引擎，未安装异步驱动也不影响启动。
+    """
+
+    def __init__(self):
+        self.pool_size = 20
+        self.max_overflow = 10
+        self.pool_timeout = 10.0
+        self._urls: Dict[Optional[str], URL] = {}
+        self._engines: Dict[Optional[str], AsyncEngine] = {}
+        self._pid = None
+        self._tuning = None
+        self._router = None
+
+    def init_app(self, app, db):
+        self.pool_size = app.config.get('ASYNC_DB_POOL_SIZE', 20)
+        self.max_overflow = app.config.get('ASYNC_DB_MAX_OVERFLOW', 10)
+        self.pool_timeout = app.config.get('ASYNC_DB_POOL_TIMEOUT', 10.0)
+        with app.app_context():
+            self._urls = {bind_key: engine.url for bind_key, engine in db.engines.items()}
+        # 需在 sqlite_tuning 与 read_router 之后初始化
+        self._tuning = app.extensions.get('sqlite_tuning')
+        self._router = app.extensions.get('read_router')
+        app.extensions['async_db'] = self
+
+    def engine(self, replica: bool = False) -> AsyncEngine:
+        """返回当前进程的异步引擎，replica 为 True 且配置了只读副本时返回副本引擎"""
+        if self._pid != os.getpid():
+            # fork 出的工作进程不能复用父进程的连接
+            self._engines = {}
+            self._pid = os.getpid()
+        bind_key = REPLICA_BIND if replica and REPLICA_BIND in self._urls else None
+        engine = self._engines.get(bind_key)
+        if engine is None:
+            engine = self._engines[bind_key] = self._create_engine(bind_key)
+        return engine
+
+    def _create_engine(self, bind_key: Optional[str]) -> AsyncEngine:
+        url = self._urls[bind_key]
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            raise RuntimeError('内存 SQLite 数据库无法在同步与异步引擎之间共享，ASGI 模式需要文件型数据库')
+        engine = create_async_engine(
+            async_url(url),
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow,
+            pool_timeout=self.pool_timeout,
+        )
+        if self._tuning is not None:
+            self._tuning.tune_engine(engine.sync_engine)
+        if bind_key == REPLICA_BIND and engine.dialect.name == 'sqlite':
+            event.listen(engine.sync_engine, 'connect', set_query_only)
+        logger.info('异步数据库引擎已创建: {}', engine.url.render_as_string(hide_password=True))
+        return engine
+
+    @asynccontextmanager
+    async def session(self, primary: bool = False) -> AsyncIterator[AsyncSession]:
+        """打开一个只读用途的异步会话，请求允许时查询发往只读副本
+
+        Args:
+            primary: 为 True 时总是读主库（回填共享缓存时使用）
+        """
+        replica = bool(
+            not primary and self._router and has_request_context() and self._router.prefers_replica()
+        )
+        async with AsyncSession(self.engine(replica), expire_on_commit=False) as session:
+            yield session
+
+    async def dispose(self) -> None:
+        """关闭当前进程的所有异步引擎（ASGI lifespan 关闭时调用）"""
+        engines, self._engines = self._engines, {}
+        for engine in engines.values():
+            await engine.dispose()
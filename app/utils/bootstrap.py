@@ -1,11 +1,27 @@
-﻿from typing import List, Tuple
-
+﻿import hashlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from alembic import command
+from alembic.script import ScriptDirectory
+from flask import current_app
 from loguru import logger
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 from app.extensions import db
 from app.models.group import Group
+from app.models.permission import Permission
+from app.models.schema_state import SchemaState
 from app.models.user import User
+from app.services.user_search import PREFIX_INDEX_DDL, SEARCH_INDEX_DDL, ensure_search_index
+from app.utils.filelock import lock_path
+
 
+# migrations/versions 中描述引入迁移之前数据库结构的修订
+INITIAL_REVISION = '0d83e6563bcd'
 
 DEFAULT_GROUPS = [
     (Group.SUPER_ADMIN, '超级管理员组'),
@@ -13,15 +29,65 @@ DEFAULT_GROUPS = [
     (Group.USER, '普通用户组'),
 ]
 
+DEFAULT_PERMISSIONS = [
+    (Permission.ADD_USER, '新增用户'),
+    (Permission.EDIT_USER, '编辑用户、修改他人密码与调整用户组'),
+    (Permission.DELETE_USER, '删除用户'),
+    (Permission.MANAGE_LOGS, '查看与调整运行时日志配置'),
+]
+
+# 新建权限时授予的默认用户组
+DEFAULT_GROUP_PERMISSIONS = {
+    Group.SUPER_ADMIN: [code for code, _ in DEFAULT_PERMISSIONS],
+    Group.ADMIN: [Permission.ADD_USER, Permission.EDIT_USER],
+    Group.USER: [],
+}
+
 DEFAULT_USERS = [
     ('admin', 'admin@example.com', 'admin123', Group.SUPER_ADMIN),
     ('demo', 'demo@example.com', 'demo1234', Group.SUPER_ADMIN),
 ]
 
 
+def _migration_config():
+    config = current_app.extensions['migrate'].migrate.get_config()
+    config.attributes['configure_logger'] = False
+    return config
+
+
+def migration_head() -> Optional[str]:
+    """migrations/versions 中的最新修订（只读取迁移脚本，不访问数据库）"""
+    return ScriptDirectory.from_config(_migration_config()).get_current_head()
+
+
+def migrate_schema() -> None:
+    """按 migrations/versions 中的 Alembic 修订升级数据库结构
+
+    新数据库直接按模型建表并标记为最新修订；引入迁移之前创建的数据库（有 users 表
+    但没有 alembic_version 表）先标记为初始修订，再依次执行之后的修订。
+    用户搜索的 NOCASE 与 FTS5 索引只存在于 SQLite 且不属于模型元数据，由 ensure_search_index 维护。
+    """
+    # 释放会话持有的读事务，避免迁移连接写入时等待锁
+    db.session.close()
+    config = _migration_config()
+
+    inspector = inspect(db.engine)
+    if inspector.has_table('alembic_version'):
+        command.upgrade(config, 'head')
+    elif inspector.has_table('users'):
+        logger.info('数据库尚无迁移版本记录，标记为初始修订 {} 后升级', INITIAL_REVISION)
+        command.stamp(config, INITIAL_REVISION)
+        command.upgrade(config, 'head')
+    else:
+        # 只读副本由主库同步得到，只在主库建表
+        db.create_all(bind_key=None)
+        command.stamp(config, 'head')
+
+
 def ensure_seed_data(commit: bool = True) -> Tuple[List[str], List[str]]:
     """Ensure default groups and demo accounts exist."""
     created_groups: List[str] = []
+    created_permissions: List[str] = []
     created_users: List[str] = []
     updated_users: List[str] = []
 
@@ -36,6 +102,21 @@ def ensure_seed_data(commit: bool = True) -> Tuple[List[str], List[str]]:
 
     group_lookup = {group.name: group for group in Group.query.all()}
 
+    existing_permissions = {code for code, in db.session.query(Permission.code)}
+    for code, description in DEFAULT_PERMISSIONS:
+        if code in existing_permissions:
+            continue
+        permission = Permission(code=code, description=description)
+        db.session.add(permission)
+        for group_name, codes in DEFAULT_GROUP_PERMISSIONS.items():
+            group = group_lookup.get(group_name)
+            if group and code in codes:
+                group.permissions.append(permission)
+        created_permissions.append(code)
+
+    if created_permissions:
+        logger.info('创建默认权限: {}', ', '.join(created_permissions))
+
     for username, email, password, group_name in DEFAULT_USERS:
         existing = User.query.filter_by(username=username).first()
         target_group = group_lookup.get(group_name)
@@ -60,15 +141,101 @@ def ensure_seed_data(commit: bool = True) -> Tuple[List[str], List[str]]:
         db.session.add(user)
         created_users.append(username)
 
+    if created_users or updated_users:
+        Group.recount_members()
+
     if created_users:
         logger.info('创建默认账号: {}', ', '.join(created_users))
     if updated_users:
         logger.info('更新默认账号: {}', ', '.join(sorted(set(updated_users))))
 
-    if (created_groups or created_users or updated_users) and commit:
+    if (created_groups or created_permissions or created_users or updated_users) and commit:
         db.session.commit()
         logger.success('默认数据已写入数据库')
     elif commit:
         db.session.commit()
 
     return created_groups, created_users
+
+
+def schema_fingerprint() -> str:
+    """按模型元数据生成的建表语句（及用户搜索索引的 DDL）计算结构指纹，模型增删列或索引后指纹随之变化"""
+    dialect = db.engine.dialect
+    digest = hashlib.sha256()
+    for table in db.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode('utf-8'))
+        for index in sorted(table.indexes, key=lambda item: item.name or ''):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode('utf-8'))
+    for statement in PREFIX_INDEX_DDL + SEARCH_INDEX_DDL:
+        digest.update(statement.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def seed_fingerprint() -> str:
+    """按默认用户组、权限与账号定义计算默认数据指纹（不含密码）"""
+    definition = (
+        DEFAULT_GROUPS,
+        DEFAULT_PERMISSIONS,
+        sorted(DEFAULT_GROUP_PERMISSIONS.items()),
+        [(username, email, group_name) for username, email, _, group_name in DEFAULT_USERS],
+    )
+    return hashlib.sha256(repr(definition).encode('utf-8')).hexdigest()
+
+
+def database_is_current() -> bool:
+    """判断数据库的结构、迁移修订与默认数据是否与当前代码一致
+
+    执行版本标记的主键查询与 alembic_version 查询，并在本地编译模型 DDL、读取迁移脚本。只修改数据或 include_object 排除对象的
+    迁移修订不会改变模型结构指纹，因此还需比较数据库记录的修订与迁移脚本的最新修订。
+    """
+    try:
+        state = db.session.get(SchemaState, SchemaState.SINGLETON_ID)
+        revisions = db.session.execute(text('SELECT version_num FROM alembic_version')).scalars().all()
+    except SQLAlchemyError:
+        # 版本标记表或迁移版本表尚不存在（新数据库或旧版本数据库）
+        db.session.rollback()
+        return False
+    return (
+        state is not None
+        and state.schema_fingerprint == schema_fingerprint()
+        and state.seed_fingerprint == seed_fingerprint()
+        and revisions == [migration_head()]
+    )
+
+
+@contextmanager
+def _bootstrap_lock():
+    """同一主机上的多个工作进程同时启动时，只允许一个进程执行初始化"""
+    path = Path(current_app.instance_path) / 'bootstrap.lock'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path(path):
+        yield
+
+
+def prepare_database(force: bool = False) -> Optional[Tuple[List[str], List[str]]]:
+    """执行数据库迁移、写入默认数据并更新版本标记
+
+    Args:
+        force: 为 True 时无论版本标记是否最新都执行（init-db 使用）
+
+    Returns:
+        Optional[Tuple[List[str], List[str]]]: 新建的用户组与账号；数据库已是最新时返回 None
+    """
+    with _bootstrap_lock():
+        # 等待锁期间其他进程可能已完成初始化
+        if not force and database_is_current():
+            return None
+
+        migrate_schema()
+        ensure_search_index()
+        created = ensure_seed_data(commit=False)
+
+        state = db.session.get(SchemaState, SchemaState.SINGLETON_ID)
+        if state is None:
+            state = SchemaState(id=SchemaState.SINGLETON_ID)
+            db.session.add(state)
+        state.schema_fingerprint = schema_fingerprint()
+        state.seed_fingerprint = seed_fingerprint()
+        db.session.commit()
+        logger.info('数据库结构与默认数据已更新至当前版本')
+        return created
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from typing import NamedTuple, Optional
+
+from flask import Response, request
+from sqlalchemy.orm import object_session
+
+
+class Validator(NamedTuple):
+    """条件请求的校验值：强 ETag（不含引号）与最后修改时间（UTC）"""
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def bump_version(mapper, connection, target) -> None:
+    """before_update 监听器：有列变化的 ORM 更新在同一条 UPDATE 中递增 version_id
+
+    只作为 ETag 的校验计数，不启用 SQLAlchemy 的乐观锁，并发修改仍以最后一次写入为准。
+    """
+    session = object_session(target)
+    if session is not None and session.is_modified(target, include_collections=False):
+        target.version_id = mapper.class_.version_id + 1
+
+
+def is_conditional() -> bool:
+    """当前请求是否携带 If-None-Match 或 If-Modified-Since"""
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def is_not_modified(validator: Validator) -> bool:
+    """按 RFC 9110 判断客户端缓存是否仍然有效，If-None-Match 优先于 If-Modified-Since
+
+    If-None-Match 使用弱比较：经压缩等中间层改写为 W/"..." 的 ETag 同样视为匹配。
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(validator.etag)
+    since = request.if_modified_since
+    if since is None or validator.last_modified is None:
+        return False
+    last_modified = validator.last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+    return last_modified <= since
+
+
+def apply_validator(response: Response, validator: Validator) -> Response:
+    """为响应设置 ETag、Last-Modified，并要求客户端每次重新验证"""
+    response.set_etag(validator.etag)
+    if validator.last_modified is not None:
+        response.last_modified = validator.last_modified.replace(tzinfo=timezone.utc)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified_response(validator: Validator) -> Response:
+    """构造不含正文的 304 响应"""
+    return apply_validator(Response(status=304), validator)
+
+
+def latest(*moments: Optional[datetime]) -> Optional[datetime]:
+    """返回多个时间中最晚的一个，忽略空值"""
+    values = [moment for moment in moments if moment is not None]
+    return max(values) if values else None
@@ -0,0 +1,171 @@
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from flask import request, session
+from flask_sqlalchemy.session import Session
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.utils.sqlite_tuning import sqlite_database_path
+
+REPLICA_BIND = 'replica'
+
+# Session.info 中的键：本次请求可用的只读副本、本会话是否已写入
+_REPLICA_KEY = 'read_replica'
+_WROTE_KEY = 'wrote'
+# Flask 会话中记录“在此时间之前读主库”的键
+_PIN_KEY = '_db_primary_until'
+
+
+class RoutingSession(Session):
+    """按语句类型选择引擎的会话
+
+    请求开始时若允许读副本，会在 info 中放入副本引擎；此后主库上的 SELECT
+    发往副本，flush、INSERT/UPDATE/DELETE 以及会话写入之后的所有语句仍走主库，
+    保证同一请求内读到自己的写入。
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or engine is not self._db.engines.get(None):
+            return engine
+        if isinstance(clause, UpdateBase):
+            self.info[_WROTE_KEY] = True
+            return engine
+        replica = self.info.get(_REPLICA_KEY)
+        if replica is None or self._flushing or self.info.get(_WROTE_KEY) or not isinstance(clause, Select):
+            return engine
+        return replica
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info[_WROTE_KEY] = True
+
+
+class ReadRouter:
+    """把安全方法（GET/HEAD）请求的读查询路由到只读副本
+
+    副本通过 SQLALCHEMY_BINDS['replica'] 配置；未配置时所有语句都走主库。
+    请求写入数据库后在用户的 Flask 会话中记录固定期限，期限内该用户的请求
+    只读主库，避免副本同步延迟导致读不到刚写入的数据。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.pin_seconds = 5.0
+        self._db = None
+
+    def init_app(self, app, db):
+        self._db = db
+        self.pin_seconds = app.config.get('READ_REPLICA_PIN_SECONDS', 5.0)
+        self.enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+        app.extensions['read_router'] = self
+        if not self.enabled:
+            return
+
+        with app.app_context():
+            replica = db.engines[REPLICA_BIND]
+        # 副本只读，误写会直接报错而不是悄悄产生分叉
+        if replica.dialect.name == 'sqlite':
+            event.listen(replica, 'connect', set_query_only)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def replica_engine(self) -> Optional[Engine]:
+        """返回只读副本引擎，未配置时返回 None（需要应用上下文）"""
+        if not self.enabled:
+            return None
+        return self._db.engines[REPLICA_BIND]
+
+    def primary_engine(self) -> Engine:
+        """返回主库引擎（需要应用上下文）"""
+        return self._db.engines[None]
+
+    def ensure_replica(self) -> None:
+        """副本中还没有任何表时先从主库同步一次，避免首个读请求找不到表"""
+        replica = self.replica_engine()
+        if replica is None or sqlite_database_path(replica) is None:
+            return
+        with replica.connect() as connection:
+            tables = connection.exec_driver_sql('SELECT COUNT(*) FROM sqlite_master').scalar()
+        if not tables:
+            sync_sqlite_replica(self.primary_engine(), replica)
+
+    def prefers_replica(self) -> bool:
+        """当前请求的读查询能否发往副本：已配置副本、安全方法且用户不在写后固定期内"""
+        return (
+            self.enabled
+            and request.method in ('GET', 'HEAD')
+            and session.get(_PIN_KEY, 0) <= time.time()
+        )
+
+    @contextmanager
+    def primary_reads(self) -> Iterator[None]:
+        """代码块内的读查询走主库，用于回填跨请求共享的缓存，避免把副本上的旧数据写入缓存"""
+        info = self._db.session.info if self.enabled else {}
+        replica = info.pop(_REPLICA_KEY, None)
+        try:
+            yield
+        finally:
+            if replica is not None:
+                info[_REPLICA_KEY] = replica
+
+    def _before_request(self):
+        if self.prefers_replica():
+            self._db.session.info[_REPLICA_KEY] = self._db.engines[REPLICA_BIND]
+
+    def _after_request(self, response):
+        info = self._db.session.info
+        if info.get(_WROTE_KEY):
+            session[_PIN_KEY] = time.time() + self.pin_seconds
+        info.pop(_REPLICA_KEY, None)
+        return response
+
+
+def set_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute('PRAGMA query_only=1')
+    finally:
+        cursor.close()
+
+
+def sync_sqlite_replica(primary: Engine, replica: Engine, pages: int = 1024) -> float:
+    """用 SQLite 在线备份 API 把主库复制到副本文件
+
+    备份分步进行，每步复制 pages 页，期间主库仍可读写；副本的读连接看到的
+    始终是某一次完整同步后的快照。
+
+    Args:
+        primary: 主库引擎
+        replica: 副本引擎
+        pages: 每步复制的页数
+
+    Returns:
+        float: 同步耗时（秒）
+    """
+    primary_path, replica_path = sqlite_database_path(primary), sqlite_database_path(replica)
+    if primary_path is None or replica_path is None:
+        raise ValueError('只支持文件型 SQLite 主库与副本')
+    if os.path.abspath(primary_path) == os.path.abspath(replica_path):
+        raise ValueError('主库与副本不能是同一个文件')
+
+    started = time.perf_counter()
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        target.execute('PRAGMA busy_timeout=5000')
+        source.backup(target, pages=pages)
+    finally:
+        target.close()
+        source.close()
+    elapsed = time.perf_counter() - started
+    logger.info('只读副本已同步: {} -> {}，耗时 {:.1f}ms', primary_path, replica_path, elapsed * 1000)
+    return elapsed
@@ -1,13 +1,25 @@
+import inspect
 from functools import wraps
 from flask import abort
 from flask_login import current_user
 
+from app.utils.permissions import effective_permissions
+
 def permission_required(permission):
     def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            # ASGI 模式的异步视图
+            @wraps(f)
+            async def decorated_coroutine(*args, **kwargs):
+                if permission not in effective_permissions(current_user):
+                    abort(403)
+                return await f(*args, **kwargs)
+            return decorated_coroutine
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            if not current_user.has_permission(permission):
+            if permission not in effective_permissions(current_user):
                 abort(403)
             return f(*args, **kwargs)
         return decorated_function
-    return decorator 
\ No newline at end of file
+    return decorator
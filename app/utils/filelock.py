@@ -0,0 +1,108 @@
+"""跨进程的文件锁
+
+POSIX 系统使用 fcntl.flock；Windows 使用 msvcrt.locking，锁定文件末尾之外的一个字节，
+不影响其他进程读写或映射文件内容。两者都不可用时加锁为空操作，多进程协作退化为
+单进程语义（版本号自增、日志轮转等可能在并发时重复执行）。
+"""
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+else:
+    msvcrt = None
+
+# 当前平台是否支持跨进程文件锁
+LOCKING_SUPPORTED = fcntl is not None or msvcrt is not None
+
+# msvcrt 锁定的字节偏移，位于任何实际文件大小之外
+_WINDOWS_LOCK_OFFSET = 0x7FFFFFFF
+_WINDOWS_RETRY_INTERVAL = 0.05
+
+
+def _windows_locking(fd: int, mode: int) -> None:
+    position = os.lseek(fd, 0, os.SEEK_CUR)
+    os.lseek(fd, _WINDOWS_LOCK_OFFSET, os.SEEK_SET)
+    try:
+        msvcrt.locking(fd, mode, 1)
+    finally:
+        os.lseek(fd, position, os.SEEK_SET)
+
+
+def lock(fd: int, blocking: bool = True) -> bool:
+    """对已打开的文件描述符加排他锁
+
+    Args:
+        fd: 文件描述符
+        blocking: 为 False 时锁已被其他进程持有则立即返回
+
+    Returns:
+        bool: 是否获得了锁；平台不支持文件锁时总是返回 True
+    """
+    if fcntl is not None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+    if msvcrt is not None:
+        while True:
+            try:
+                _windows_locking(fd, msvcrt.LK_NBLCK)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(_WINDOWS_RETRY_INTERVAL)
+    return True
+
+
+def unlock(fd: int) -> None:
+    """释放 lock() 获得的锁"""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        _windows_locking(fd, msvcrt.LK_UNLCK)
+
+
+@contextmanager
+def locked(fd: int) -> Iterator[None]:
+    """在持有 fd 排他锁期间执行代码块"""
+    lock(fd)
+    try:
+        yield
+    finally:
+        unlock(fd)
+
+
+@contextmanager
+def lock_path(path: Union[str, Path], blocking: bool = True) -> Iterator[Optional[int]]:
+    """打开（必要时创建）锁文件并加排他锁
+
+    Args:
+        path: 锁文件路径
+        blocking: 为 False 时锁已被其他进程持有则不等待
+
+    Yields:
+        Optional[int]: 锁文件的描述符，未获得锁时为 None
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if not lock(fd, blocking):
+            yield None
+            return
+        try:
+            yield fd
+        finally:
+            unlock(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,176 @@
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+def parse_sampling(value: Any) -> Dict[str, float]:
+    """解析请求日志采样规则
+
+    支持字典或 'endpoint=比例,endpoint=比例' 形式的字符串，
+    例如 'user.list_users=0.1,group.get_group_members=0.25'。
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        items = value.items()
+    else:
+        items = (item.partition('=')[::2] for item in str(value).split(',') if item.strip())
+    return {endpoint.strip(): min(max(float(rate), 0.0), 1.0) for endpoint, rate in items}
+
+
+def parse_endpoints(value: Any) -> frozenset:
+    """解析以逗号分隔的端点列表"""
+    if not value:
+        return frozenset()
+    if isinstance(value, str):
+        value = value.split(',')
+    return frozenset(item.strip() for item in value if item.strip())
+
+
+class LogControl:
+    """运行时日志级别与请求日志采样
+
+    各模块的日志级别保存在实例目录下的 JSON 文件中，管理接口修改后，
+    所有工作进程在 reload_interval 秒内读取到新配置，无需重启。
+    sink 的过滤函数按记录的模块名匹配最长的模块前缀，未配置的模块使用默认级别。
+    """
+
+    def __init__(self):
+        self.default_level_name = 'INFO'
+        self.default_level = logger.level('INFO').no
+        self.path: Optional[Path] = None
+        self.reload_interval = 2.0
+        self.sample_rate = 1.0
+        self.sampling: Dict[str, float] = {}
+        self.excluded: frozenset = frozenset()
+        self._names: Dict[str, str] = {}
+        self._overrides: Dict[str, int] = {}
+        self._resolved: Dict[str, int] = {}
+        self._mtime = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.default_level_name = str(app.config.get('LOG_LEVEL', 'INFO')).upper()
+        self.default_level = logger.level(self.default_level_name).no
+        path = app.config.get('LOG_LEVELS_PATH')
+        self.path = Path(path) if path else Path(app.instance_path) / 'log_levels.json'
+        self.reload_interval = app.config.get('LOG_LEVELS_RELOAD_INTERVAL', 2.0)
+        self.sample_rate = app.config.get('LOG_REQUEST_SAMPLE_RATE', 1.0)
+        self.sampling = parse_sampling(app.config.get('LOG_REQUEST_SAMPLING'))
+        self.excluded = parse_endpoints(app.config.get('LOG_REQUEST_EXCLUDE'))
+        self._mtime = None
+        self._next_check = 0.0
+        self._reload()
+        app.extensions['log_control'] = self
+
+    def filter(self, record: Dict[str, Any]) -> bool:
+        """loguru sink 的 filter 回调"""
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_interval
+            self._reload()
+
+        name = record['name'] or ''
+        level = self._resolved.get(name)
+        if level is None:
+            level = self._resolve(name)
+        return record['level'].no >= level
+
+    def _resolve(self, name: str) -> int:
+        level = self.default_level
+        module = name
+        while module:
+            if module in self._overrides:
+                level = self._overrides[module]
+                break
+            module = module.rpartition('.')[0]
+        self._resolved[name] = level
+        return level
+
+    def _read_file(self) -> Dict[str, str]:
+        data = json.loads(self.path.read_text(encoding='utf-8'))
+        if not isinstance(data, dict):
+            raise ValueError('日志级别配置必须是 JSON 对象')
+        return {str(module): logger.level(str(level).upper()).name for module, level in data.items()}
+
+    def _reload(self) -> None:
+        if self.path is None:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+
+        self._mtime = mtime
+        names: Dict[str, str] = {}
+        if mtime is not None:
+            try:
+                names = self._read_file()
+            except (OSError, ValueError) as exc:
+                logger.warning('日志级别配置读取失败，保留当前配置: {}', exc)
+                return
+        self._names = names
+        self._overrides = {module: logger.level(level).no for module, level in names.items()}
+        self._resolved = {}
+
+    def levels(self) -> Dict[str, str]:
+        """返回当前的模块级别配置，键为空字符串的一项表示默认级别"""
+        self._reload()
+        return {'': self.default_level_name, **dict(sorted(self._names.items()))}
+
+    def set_level(self, module: str, level: Optional[str]) -> Dict[str, str]:
+        """设置或清除模块的日志级别，写入共享配置文件后各工作进程自动生效
+
+        Args:
+            module: 模块名前缀，例如 'app.services'
+            level: 级别名称，为空时清除该模块的配置
+
+        Returns:
+            Dict[str, str]: 更新后的模块级别配置
+
+        Raises:
+            ValueError: 模块名为空或级别名称无效
+        """
+        module = (module or '').strip()
+        if not module:
+            raise ValueError('模块名不能为空')
+        if level:
+            level = str(level).strip().upper()
+            try:
+                logger.level(level)
+            except ValueError:
+                raise ValueError(f'无效的日志级别: {level}') from None
+
+        with self._lock:
+            try:
+                data = self._read_file()
+            except (OSError, ValueError):
+                data = {}
+            if level:
+                data[module] = level
+            else:
+                data.pop(module, None)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f'{self.path.name}.{os.getpid()}.tmp')
+            tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+
+        self._reload()
+        logger.info('日志级别已调整: {} -> {}', module, level or '默认')
+        return self.levels()
+
+    def should_log_request(self, endpoint: Optional[str]) -> bool:
+        """按端点判断本次请求是否写入请求日志"""
+        if endpoint in self.excluded:
+            return False
+        rate = self.sampling.get(endpoint, self.sample_rate)
+        return rate >= 1.0 or random.random() < rate
@@ -0,0 +1,265 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.filelock import locked
+
+
+# 稀疏索引条目：(事件时间戳, 行起始字节偏移)
+_INDEX_ENTRY = struct.Struct('<dQ')
+
+LEVEL_NUMBERS = {
+    'TRACE': 5, 'DEBUG': 10, 'INFO': 20, 'SUCCESS': 25,
+    'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50,
+}
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(path.name + '.idx')
+
+
+class JsonLinesSink:
+    """JSON Lines 日志 sink，同时维护按时间的稀疏字节偏移索引
+
+    每行以 {"t": 时间戳, ...} 开头，每写入 index_interval 字节向 <文件>.idx
+    追加一条 (时间戳, 偏移) 记录。文件以 O_APPEND 打开、每行一次 write，
+    多个工作进程可以同时写同一文件；超过 rotation_bytes 后由当前进程在文件锁内
+    将文件连同索引重命名为 <名称>.<时间>.jsonl，其它进程在 1 秒内发现并重新打开。
+    """
+
+    def __init__(self, path: Path, rotation_bytes: int = 20 * 1024 * 1024,
+                 index_interval: int = 64 * 1024, retention: int = 14):
+        self.path = Path(path)
+        self.rotation_bytes = rotation_bytes
+        self.index_interval = index_interval
+        self.retention = retention
+        self._fd = None
+        self._index_fd = None
+        self._inode = None
+        self._since_index = 0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    def _open(self) -> None:
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+        self._fd = os.open(self.path, flags, 0o644)
+        self._index_fd = os.open(index_path(self.path), flags, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+        # 新打开的文件立即写一条索引，保证查询可以定位到本进程写入的第一行
+        self._since_index = self.index_interval
+
+    def close(self) -> None:
+        for fd in (self._fd, self._index_fd):
+            if fd is not None:
+                os.close(fd)
+        self._fd = self._index_fd = None
+
+    def __call__(self, message) -> None:
+        record = message.record
+        extra = record['extra']
+        payload = {
+            't': round(record['time'].timestamp(), 6),
+            'time': record['time'].isoformat(timespec='milliseconds'),
+            'level': record['level'].name,
+            'name': record['name'],
+            'function': record['function'],
+            'line': record['line'],
+            'message': record['message'],
+        }
+        for key in ('user', 'ip', 'method', 'path'):
+            if extra.get(key) is not None:
+                payload[key] = extra[key]
+        if record['exception'] is not None:
+            payload['exception'] = repr(record['exception'].value)
+        data = (json.dumps(payload, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+        with self._lock:
+            self._write(data, payload['t'])
+
+    def _write(self, data: bytes, timestamp: float) -> None:
+        now = time.monotonic()
+        if self._fd is None:
+            self._open()
+        elif now >= self._next_check:
+            self._next_check = now + 1.0
+            self._check_rotation()
+
+        os.write(self._fd, data)
+        self._since_index += len(data)
+        if self._since_index >= self.index_interval:
+            # O_APPEND 写入后的文件位置即本行末尾，多进程并发写入时同样准确
+            end = os.lseek(self._fd, 0, os.SEEK_CUR)
+            os.write(self._index_fd, _INDEX_ENTRY.pack(timestamp, end - len(data)))
+            self._since_index = 0
+
+    def _check_rotation(self) -> None:
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            self._open()
+            return
+        if current.st_ino != self._inode:
+            self._open()
+            return
+        if current.st_size < self.rotation_bytes:
+            return
+
+        with locked(self._fd):
+            # 加锁后再次确认，避免多个进程重复轮转
+            current = os.stat(self.path)
+            if current.st_ino == self._inode and current.st_size >= self.rotation_bytes:
+                stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+                target = self.path.with_name(f'{self.path.stem}.{stamp}{self.path.suffix}')
+                os.rename(index_path(self.path), index_path(target))
+                os.rename(self.path, target)
+        self._open()
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        rotated = sorted(self.path.parent.glob(f'{self.path.stem}.*{self.path.suffix}'))
+        for old in rotated[:max(len(rotated) - self.retention, 0)]:
+            for target in (old, index_path(old)):
+                try:
+                    target.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+def _line_timestamp(buffer, start: int, end: int) -> Optional[float]:
+    """不解析整行 JSON，直接读取行首 {"t": 后的时间戳"""
+    if buffer[start:start + 6] != b'{"t": ':
+        return None
+    comma = buffer.find(b',', start + 6, end)
+    if comma < 0:
+        return None
+    try:
+        return float(buffer[start + 6:comma])
+    except ValueError:
+        return None
+
+
+def build_index(path: Path, interval: int = 64 * 1024) -> List[Tuple[float, int]]:
+    """顺序扫描一次文件生成稀疏索引，用于缺少索引的文件"""
+    entries: List[Tuple[float, int]] = []
+    with open(path, 'rb') as handle:
+        offset = 0
+        since_index = interval
+        for line in handle:
+            if since_index >= interval:
+                timestamp = _line_timestamp(line, 0, len(line))
+                if timestamp is not None:
+                    entries.append((timestamp, offset))
+                    since_index = 0
+            offset += len(line)
+            since_index += len(line)
+    return entries
+
+
+def load_index(path: Path) -> List[Tuple[float, int]]:
+    """读取文件的稀疏索引，按时间戳排序；索引不存在时扫描生成并保存"""
+    idx = index_path(path)
+    if not idx.exists():
+        entries = build_index(path)
+        with open(idx, 'wb') as handle:
+            for entry in entries:
+                handle.write(_INDEX_ENTRY.pack(*entry))
+        return entries
+
+    data = idx.read_bytes()
+    usable = len(data) - len(data) % _INDEX_ENTRY.size
+    return sorted(_INDEX_ENTRY.iter_unpack(data[:usable]))
+
+
+def log_files(path: Path) -> List[Path]:
+    """返回日志文件及其轮转文件，按时间从旧到新排列"""
+    rotated = sorted(path.parent.glob(f'{path.stem}.*{path.suffix}'))
+    return rotated + ([path] if path.exists() else [])
+
+
+def iter_window(path: Path, since: Optional[float] = None, until: Optional[float] = None,
+                slack: float = 5.0) -> Iterator[Tuple[float, bytes]]:
+    """内存映射文件并二分定位到时间窗口，只读取窗口附近的数据
+
+    多个工作进程与异步日志管道会使相邻行的时间戳略有交错，
+    定位与停止时各放宽 slack 秒，窗口外的行在返回前按时间戳精确过滤。
+
+    Yields:
+        Tuple[float, bytes]: (时间戳, 原始行)
+    """
+    if os.path.getsize(path) == 0:
+        return
+    entries = load_index(path)
+    start = 0
+    if since is not None and entries:
+        position = bisect.bisect_left(entries, (since - slack, -1)) - 1
+        if position >= 0:
+            start = entries[position][1]
+    if until is not None and entries and entries[0][0] > until + slack:
+        return
+
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        size = len(buffer)
+        offset = start
+        while offset < size:
+            end = buffer.find(b'\n', offset)
+            if end < 0:
+                # 正在写入的最后一行尚不完整
+                break
+            timestamp = _line_timestamp(buffer, offset, end)
+            if timestamp is not None:
+                if until is not None and timestamp > until + slack:
+                    break
+                if (since is None or timestamp >= since) and (until is None or timestamp <= until):
+                    yield timestamp, buffer[offset:end]
+            offset = end + 1
+
+
+def query(path: Path, since: Optional[float] = None, until: Optional[float] = None,
+          level: Optional[str] = None, module: Optional[str] = None,
+          user: Optional[str] = None, ip: Optional[str] = None,
+          slack: float = 5.0) -> Iterator[Dict[str, Any]]:
+    """按时间窗口与条件查询 JSON Lines 日志及其轮转文件
+
+    Args:
+        path: 当前日志文件路径
+        since: 起始时间戳
+        until: 结束时间戳
+        level: 最低日志级别
+        module: 模块名前缀
+        user: 用户名
+        ip: 客户端IP
+        slack: 行间时间戳可能交错的秒数
+
+    Yields:
+        dict: 日志记录
+    """
+    min_level = LEVEL_NUMBERS.get(level.upper(), 0) if level else 0
+    user_token = json.dumps(user, ensure_ascii=False).encode('utf-8') if user else None
+    ip_token = json.dumps(ip).encode('utf-8') if ip else None
+
+    for file_path in log_files(path):
+        for _, raw in iter_window(file_path, since, until, slack):
+            # 先用字节匹配排除大部分不相关的行，再解析 JSON
+            if user_token and user_token not in raw:
+                continue
+            if ip_token and ip_token not in raw:
+                continue
+            record = json.loads(raw)
+            if min_level and LEVEL_NUMBERS.get(record.get('level'), 0) < min_level:
+                continue
+            name = record.get('name') or ''
+            if module and not (name == module or name.startswith(module + '.')):
+                continue
+            if user and record.get('user') != user:
+                continue
+            if ip and record.get('ip') != ip:
+                continue
+            yield record
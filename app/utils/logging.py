@@ -4,6 +4,9 @@ from pathlib import Path
 
 from loguru import logger
 
+from app.extensions import log_control
+from app.utils.log_store import JsonLinesSink
+
 
 class InterceptHandler(logging.Handler):
     """将标准库 logging 输出转发到 Loguru"""
@@ -27,8 +30,12 @@ def configure_logging(app):
     log_level = app.config.get('LOG_LEVEL', 'INFO')
     backtrace = app.config.get('LOG_BACKTRACE', False)
     diagnose = app.config.get('LOG_DIAGNOSE', False)
+    # 请求日志已由 log_pipeline 在后台线程批量输出，默认不再经多进程队列二次转发
+    enqueue = app.config.get('LOG_ENQUEUE', False)
+    # sink 本身不设级别门槛，由 log_control 按模块判断，级别可在运行时调整
+    sink_level = 'TRACE'
 
-    logger.add(sys.stdout, level=log_level, enqueue=True, backtrace=backtrace, diagnose=diagnose)
+    logger.add(sys.stdout, level=sink_level, filter=log_control.filter, enqueue=enqueue, backtrace=backtrace, diagnose=diagnose)
 
     log_path_value = app.config.get('LOG_PATH')
     if log_path_value:
@@ -42,15 +49,44 @@ def configure_logging(app):
 
     logger.add(
         log_path,
-        level=log_level,
+        level=sink_level,
+        filter=log_control.filter,
         rotation=app.config.get('LOG_ROTATION', '20 MB'),
         retention=app.config.get('LOG_RETENTION', '14 days'),
-        enqueue=True,
+        enqueue=enqueue,
         backtrace=backtrace,
         diagnose=diagnose,
         encoding='utf-8'
     )
 
+    if app.config.get('SQL_STATS_ENABLED'):
+        # 慢查询同时单独写入 slow_queries.log，便于集中分析
+        logger.add(
+            log_path.with_name('slow_queries.log'),
+            level='WARNING',
+            filter=lambda record: record['extra'].get('slow_query', False),
+            rotation=app.config.get('LOG_ROTATION', '20 MB'),
+            retention=app.config.get('LOG_RETENTION', '14 days'),
+            enqueue=enqueue,
+            encoding='utf-8'
+        )
+
+    if app.config.get('LOG_JSON_ENABLED'):
+        json_path_value = app.config.get('LOG_JSON_PATH')
+        json_path = Path(json_path_value) if json_path_value else log_path.with_suffix('.jsonl')
+        logger.add(
+            JsonLinesSink(
+                json_path,
+                rotation_bytes=app.config.get('LOG_JSON_ROTATION_BYTES', 20 * 1024 * 1024),
+                index_interval=app.config.get('LOG_JSON_INDEX_INTERVAL', 64 * 1024),
+                retention=app.config.get('LOG_JSON_RETENTION', 14),
+            ),
+            level=sink_level,
+            filter=log_control.filter,
+            enqueue=enqueue,
+            catch=True,
+        )
+
     intercept_handler = InterceptHandler()
     logging.root.handlers = [intercept_handler]
     logging.root.setLevel(logging.NOTSET)
@@ -0,0 +1,380 @@
+import bisect
+import hmac
+import ipaddress
+import mmap
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Response, abort, request
+from loguru import logger
+
+from app.utils.filelock import lock_path
+from app.utils.process_memory import memory_usage
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_MAGIC = 0x4D45545249435331  # 'METRICS1'
+_HEADER_SIZE = 64
+_KEY_SIZE = 128
+# 头部（按 uint64 索引）：魔数、桶数、已用槽位数、进行中请求数、进程号
+_H_MAGIC, _H_BUCKETS, _H_USED, _H_INFLIGHT, _H_PID = range(5)
+_ARCHIVE_NAME = 'metrics_archive.db'
+_OVERFLOW_KEY = ('__overflow__', '-', '-')
+
+
+def parse_buckets(value) -> Tuple[float, ...]:
+    """解析以逗号分隔的直方图桶上界（秒）"""
+    if not value:
+        return DEFAULT_BUCKETS
+    if isinstance(value, str):
+        value = value.split(',')
+    return tuple(sorted(float(item) for item in value))
+
+
+def _is_loopback(address: Optional[str]) -> bool:
+    try:
+        return ipaddress.ip_address(address or '').is_loopback
+    except ValueError:
+        return False
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == 'nt':
+        # Windows 上 os.kill 会直接结束目标进程，无法探测；视为存活，不合并其指标文件
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MetricsFile:
+    """单个进程独占写入的内存映射指标文件
+
+    每个序列（端点、方法、状态码）占用一个固定大小的槽位：128 字节的键，
+    随后是各桶计数（含 +Inf）、耗时总和与请求数。计数按桶单独存放，导出时再累加。
+    """
+
+    def __init__(self, path: Path, buckets: Sequence[float], max_series: int):
+        self.path = path
+        self.buckets = tuple(buckets)
+        self.max_series = max_series
+        self.slot_words = _KEY_SIZE // 8 + len(self.buckets) + 3
+        size = _HEADER_SIZE + max_series * self.slot_words * 8
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._words = memoryview(self._mmap).cast('Q')
+        self._floats = memoryview(self._mmap).cast('d')
+
+        if self._words[_H_MAGIC] != _MAGIC:
+            self._words[_H_BUCKETS] = len(self.buckets)
+            self._words[_H_MAGIC] = _MAGIC
+        self.slots: Dict[Tuple[str, str, str], int] = {
+            key: index for index, key in self._read_keys()
+        }
+
+    @classmethod
+    def open_existing(cls, path: Path, buckets: Sequence[float]) -> Optional['MetricsFile']:
+        """打开其它进程写入的指标文件，格式不一致时返回 None"""
+        size = os.path.getsize(path)
+        slot_words = _KEY_SIZE // 8 + len(buckets) + 3
+        max_series = (size - _HEADER_SIZE) // (slot_words * 8)
+        if max_series <= 0:
+            return None
+        metrics_file = cls(path, buckets, max_series)
+        if metrics_file._words[_H_BUCKETS] != len(buckets):
+            metrics_file.close()
+            return None
+        return metrics_file
+
+    def close(self) -> None:
+        self._words.release()
+        self._floats.release()
+        self._mmap.close()
+
+    @property
+    def pid(self) -> int:
+        return self._words[_H_PID]
+
+    @property
+    def inflight(self) -> int:
+        return self._words[_H_INFLIGHT]
+
+    def set_pid(self, pid: int) -> None:
+        self._words[_H_PID] = pid
+
+    def add_inflight(self, delta: int) -> None:
+        self._words[_H_INFLIGHT] += delta
+
+    def _base(self, index: int) -> int:
+        return _HEADER_SIZE // 8 + index * self.slot_words
+
+    def _read_keys(self) -> Iterator[Tuple[int, Tuple[str, str, str]]]:
+        for index in range(min(self._words[_H_USED], self.max_series)):
+            start = self._base(index) * 8
+            raw = bytes(self._mmap[start:start + _KEY_SIZE]).rstrip(b'\0')
+            parts = raw.decode('utf-8', errors='replace').split('\t')
+            if len(parts) == 3:
+                yield index, tuple(parts)
+
+    def slot(self, key: Tuple[str, str, str]) -> int:
+        index = self.slots.get(key)
+        if index is not None:
+            return index
+        used = self._words[_H_USED]
+        if used >= self.max_series - 1 and key != _OVERFLOW_KEY:
+            # 最后一个槽位保留给超出上限的序列
+            return self.slot(_OVERFLOW_KEY)
+        start = self._base(used) * 8
+        encoded = '\t'.join(key).encode('utf-8')[:_KEY_SIZE]
+        self._mmap[start:start + len(encoded)] = encoded
+        # 键写入完成后再增加已用槽位数，读取方不会看到不完整的键
+        self._words[_H_USED] = used + 1
+        self.slots[key] = used
+        return used
+
+    def observe(self, index: int, bucket: int, duration: float) -> None:
+        base = self._base(index) + _KEY_SIZE // 8
+        self._words[base + bucket] += 1
+        sum_index = base + len(self.buckets) + 1
+        self._floats[sum_index] += duration
+        self._words[sum_index + 1] += 1
+
+    def read(self, index: int) -> Tuple[List[int], float, int]:
+        base = self._base(index) + _KEY_SIZE // 8
+        counts = list(self._words[base:base + len(self.buckets) + 1])
+        sum_index = base + len(self.buckets) + 1
+        return counts, self._floats[sum_index], self._words[sum_index + 1]
+
+    def merge(self, key: Tuple[str, str, str], counts: List[int], total: float, count: int) -> None:
+        index = self.slot(key)
+        base = self._base(index) + _KEY_SIZE // 8
+        for bucket, value in enumerate(counts):
+            self._words[base + bucket] += value
+        sum_index = base + len(self.buckets) + 1
+        self._floats[sum_index] += total
+        self._words[sum_index + 1] += count
+
+    def series(self) -> Iterator[Tuple[Tuple[str, str, str], List[int], float, int]]:
+        for index, key in self._read_keys():
+            yield (key, *self.read(index))
+
+
+class RequestMetrics:
+    """按端点、方法与状态码统计请求耗时直方图、请求数与进行中的请求数
+
+    每个 gunicorn 工作进程只写自己的内存映射文件（metrics_<pid>.db），不需要跨进程加锁；
+    /metrics 读取目录下所有文件汇总为 Prometheus 文本格式。已退出进程的计数在导出时
+    合并到 metrics_archive.db，保证计数器单调递增。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.directory: Optional[Path] = None
+        self.buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+        self.max_series = 1024
+        self.token = None
+        self._file: Optional[MetricsFile] = None
+        self._file_pid = None
+        self._lock = threading.Lock()
+        self._started: ContextVar[Optional[float]] = ContextVar('request_started', default=None)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        directory = app.config.get('METRICS_DIR')
+        self.directory = Path(directory) if directory else Path(app.instance_path) / 'metrics'
+        self.buckets = parse_buckets(app.config.get('METRICS_BUCKETS'))
+        self.max_series = app.config.get('METRICS_MAX_SERIES', 1024)
+        self.token = app.config.get('METRICS_TOKEN')
+        app.extensions['request_metrics'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def _get_file(self) -> MetricsFile:
+        # 文件在各工作进程首次处理请求时创建，fork 出的子进程各自使用独立文件
+        pid = os.getpid()
+        if self._file is None or self._file_pid != pid:
+            with self._lock:
+                if self._file is None or self._file_pid != pid:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    path = self.directory / f'metrics_{pid}.db'
+                    self._file = MetricsFile(path, self.buckets, self.max_series)
+                    self._file.set_pid(pid)
+                    self._file_pid = pid
+        return self._file
+
+    def _before_request(self):
+        metrics_file = self._get_file()
+        with self._lock:
+            metrics_file.add_inflight(1)
+        # 起始时间放在上下文变量中，避免热路径上多次访问 g 代理对象；ASGI 模式下并发协程互不覆盖
+        self._started.set(time.perf_counter())
+
+    def _after_request(self, response):
+        started = self._started.get()
+        if started is not None:
+            self._started.set(None)
+            self._record(started, response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        # 未经 after_request 的请求（处理过程中抛出未捕获的异常）按 500 记录
+        started = self._started.get()
+        if started is not None:
+            self._started.set(None)
+            self._record(started, 500)
+
+    def _record(self, started: float, status: int) -> None:
+        duration = time.perf_counter() - started
+        current = request._get_current_object()
+        key = (current.endpoint or 'unmatched', current.method, str(status))
+        bucket = bisect.bisect_left(self.buckets, duration)
+        metrics_file = self._file
+        with self._lock:
+            index = metrics_file.slots.get(key)
+            if index is None:
+                index = metrics_file.slot(key)
+            metrics_file.observe(index, bucket, duration)
+            metrics_file.add_inflight(-1)
+
+    def _authorised(self) -> bool:
+        if self.token:
+            return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {self.token}')
+        # 未设置令牌时只允许本机直接访问；经反向代理转发的请求即使来自本机也拒绝
+        if request.headers.get('X-Forwarded-For') or request.headers.get('X-Real-IP'):
+            return False
+        return _is_loopback(request.remote_addr)
+
+    def metrics_view(self):
+        """以 Prometheus 文本格式导出所有工作进程汇总后的指标
+
+        设置 METRICS_TOKEN 后需携带 Authorization: Bearer <token>，否则只允许本机访问。
+        """
+        if not self._authorised():
+            abort(403)
+        return Response(self.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+    def _collect(self) -> Tuple[Dict[Tuple[str, str, str], List], int, List[int]]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        totals: Dict[Tuple[str, str, str], List] = {}
+        inflight = 0
+        pids: List[int] = []
+
+        with lock_path(self.directory / '.lock'):
+            archive = MetricsFile(self.directory / _ARCHIVE_NAME, self.buckets, self.max_series)
+            try:
+                for path in sorted(self.directory.glob('metrics_*.db')):
+                    if path.name == _ARCHIVE_NAME:
+                        continue
+                    metrics_file = MetricsFile.open_existing(path, self.buckets)
+                    if metrics_file is None:
+                        continue
+                    try:
+                        pid = metrics_file.pid
+                        if pid and pid != os.getpid() and not _pid_alive(pid):
+                            for key, counts, total, count in metrics_file.series():
+                                archive.merge(key, counts, total, count)
+                            path.unlink()
+                            logger.debug('已合并退出进程 {} 的请求指标', pid)
+                            continue
+                        inflight += metrics_file.inflight
+                        if pid:
+                            pids.append(pid)
+                        self._accumulate(totals, metrics_file.series())
+                    finally:
+                        metrics_file.close()
+                self._accumulate(totals, archive.series())
+            finally:
+                archive.close()
+        return totals, inflight, pids
+
+    @staticmethod
+    def _accumulate(totals, series) -> None:
+        for key, counts, total, count in series:
+            entry = totals.get(key)
+            if entry is None:
+                totals[key] = [counts, total, count]
+            else:
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+
+    def render(self) -> str:
+        totals, inflight, pids = self._collect()
+        lines = [
+            '# HELP http_request_duration_seconds 请求耗时（秒）',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        bounds = [_format_bound(bound) for bound in self.buckets] + ['+Inf']
+        for key in sorted(totals):
+            counts, total, count = totals[key]
+            labels = _labels(key)
+            cumulative = 0
+            for bound, value in zip(bounds, counts):
+                cumulative += value
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {total:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {count}')
+
+        lines.append('# HELP http_requests_total 已完成的请求数')
+        lines.append('# TYPE http_requests_total counter')
+        for key in sorted(totals):
+            lines.append(f'http_requests_total{{{_labels(key)}}} {totals[key][2]}')
+
+        lines.append('# HELP http_requests_in_flight 正在处理的请求数')
+        lines.append('# TYPE http_requests_in_flight gauge')
+        lines.append(f'http_requests_in_flight {inflight}')
+        lines.extend(_memory_lines(pids))
+        return '\n'.join(lines) + '\n'
+
+
+def _memory_lines(pids: Sequence[int]) -> List[str]:
+    """各工作进程的内存占用，用于观察 preload 后与主进程共享的页（仅 Linux）"""
+    usages = {pid: memory_usage(pid) for pid in sorted(set(pids))}
+    usages = {pid: usage for pid, usage in usages.items() if usage}
+    metrics = (
+        ('rss', 'process_resident_memory_bytes', '工作进程常驻内存（字节）'),
+        ('pss', 'process_proportional_memory_bytes', '工作进程按共享进程数分摊后的内存（字节）'),
+        ('shared', 'process_shared_memory_bytes', '工作进程与其他进程共享的内存（字节）'),
+    )
+    lines = []
+    for key, name, description in metrics:
+        values = [(pid, usage[key]) for pid, usage in usages.items() if key in usage]
+        if not values:
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} gauge')
+        lines.extend(f'{name}{{pid="{pid}"}} {value}' for pid, value in values)
+    return lines
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(key: Tuple[str, str, str]) -> str:
+    endpoint, method, status = key
+    return f'endpoint="{_escape(endpoint)}",method="{_escape(method)}",status="{_escape(status)}"'
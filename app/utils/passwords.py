@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import List, Optional, Sequence
+
+from loguru import logger
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+
+class HashingBusyError(RuntimeError):
+    """哈希进程池排队已满，调用方应直接拒绝本次请求"""
+
+
+def normalise_method(method: str) -> str:
+    """将 werkzeug 的哈希方法补全为哈希值中实际记录的参数形式
+
+    例如 'scrypt' -> 'scrypt:32768:8:1'，'pbkdf2' -> 'pbkdf2:sha256:600000'，
+    便于与已存储哈希的前缀比较判断是否需要重新哈希。
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        defaults = ['32768', '8', '1']
+    elif name == 'pbkdf2':
+        defaults = ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    else:
+        return method
+    args = args + defaults[len(args):]
+    return ':'.join([name, *args])
+
+
+def is_supported_hash(pwhash: Optional[str]) -> bool:
+    """是否为 werkzeug 能够校验的 scrypt / pbkdf2 哈希（'方法$盐$十六进制摘要'）"""
+    if not isinstance(pwhash, str) or pwhash.count('$') != 2:
+        return False
+    method, salt, digest = pwhash.split('$')
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        valid_args = len(args) == 3 and all(arg.isdigit() for arg in args)
+    elif name == 'pbkdf2':
+        valid_args = len(args) == 2 and args[1].isdigit()
+    else:
+        valid_args = False
+    try:
+        bytes.fromhex(digest)
+    except ValueError:
+        return False
+    return valid_args and bool(salt) and bool(digest)
+
+
+class PasswordHasher:
+    """把密码哈希与校验放到有界进程池中执行
+
+    同步工作进程在等待结果时不再占用 CPU，突发登录只会占满进程池，
+    不会拖慢其它路由。排队数超过上限、等待超时或进程池损坏时抛出 HashingBusyError。
+    workers 为 0 时在当前进程内同步计算（开发与测试环境）。
+    """
+
+    def __init__(self):
+        self.method = 'scrypt'
+        self.workers = 0
+        self.queue_size = 0
+        self.timeout = None
+        self.mp_context = 'fork'
+        self._prefix = normalise_method(self.method)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', 'scrypt')
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 0)
+        self.queue_size = app.config.get('PASSWORD_HASH_QUEUE_SIZE', 8)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        self.mp_context = app.config.get('PASSWORD_HASH_MP_CONTEXT', 'fork')
+        self._prefix = normalise_method(self.method)
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size) if self.workers > 0 else None
+        app.extensions['password_hasher'] = self
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # 进程池在各工作进程首次使用时创建，避免在 fork 前的主进程中启动
+        if self._executor is None or self._executor_pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._executor_pid != os.getpid():
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context(self.mp_context),
+                    )
+                    self._executor_pid = os.getpid()
+                    logger.debug('密码哈希进程池已启动，进程数: {}', self.workers)
+        return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """子进程异常退出后进程池不再可用，丢弃后由下一次调用重新创建"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.warning('密码哈希进程池已损坏，将在下次使用时重建')
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusyError('密码哈希队列已满')
+        executor = self._get_executor()
+        try:
+            future = executor.submit(func, *args)
+        except BrokenProcessPool:
+            self._slots.release()
+            self._discard_executor(executor)
+            raise HashingBusyError('密码哈希进程池不可用')
+        except BaseException:
+            self._slots.release()
+            raise
+        # 任务结束（完成、失败或取消）时才归还槽位：等待超时后任务仍占用子进程，排队上限应计入它
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise HashingBusyError('密码哈希超时')
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise HashingBusyError('密码哈希进程池不可用')
+
+    def hash(self, password: str) -> str:
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        return self._run(check_password_hash, pwhash, password)
+
+    def hash_many(self, passwords: Sequence[str], executor: Optional[Executor] = None,
+                  chunksize: int = 16) -> List[str]:
+        """批量哈希，供批量导入使用，不受单请求排队上限限制
+
+        Args:
+            passwords: 明文密码列表
+            executor: 指定的进程池，默认使用本实例的进程池（workers 为 0 时同步计算）
+            chunksize: 每次派发给子进程的密码数
+        """
+        own_executor = executor is None and self.workers > 0
+        if own_executor:
+            executor = self._get_executor()
+        if executor is None:
+            return [generate_password_hash(password, self.method) for password in passwords]
+        try:
+            return list(executor.map(generate_password_hash, passwords, repeat(self.method), chunksize=chunksize))
+        except BrokenProcessPool:
+            if own_executor:
+                self._discard_executor(executor)
+            raise
+
+    def needs_rehash(self, pwhash: Optional[str]) -> bool:
+        """已存储哈希的算法或成本参数与当前配置不一致时返回 True"""
+        if not is_supported_hash(pwhash):
+            return True
+        return pwhash.split('$', 1)[0] != self._prefix
+
+    def shutdown(self) -> None:
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
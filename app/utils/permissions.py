@@ -0,0 +1,103 @@
+import threading
+from typing import Dict, Iterator, Optional
+
+from flask import g
+from loguru import logger
+
+
+class EffectivePermissions:
+    """某个用户的权限位图，每次检查只做一次按位与"""
+
+    __slots__ = ('mask', '_bits')
+
+    def __init__(self, mask: int, bits: Dict[str, int]):
+        self.mask = mask
+        self._bits = bits
+
+    def __contains__(self, code) -> bool:
+        return bool(self.mask & self._bits.get(code, 0))
+
+    def __iter__(self) -> Iterator[str]:
+        return (code for code, bit in self._bits.items() if self.mask & bit)
+
+    def __repr__(self):
+        return f'<EffectivePermissions {sorted(self)}>'
+
+
+class PermissionMatrix:
+    """将 permissions / group_permissions 表编译为按用户组索引的整数位图"""
+
+    def __init__(self):
+        self.bits: Dict[str, int] = {}
+        self.group_masks: Dict[int, int] = {}
+        self.compiled = False
+        self._lock = threading.Lock()
+
+    def compile(self) -> None:
+        """从数据库读取权限映射并重新编译位图，启动及权限数据变更后调用"""
+        from app.extensions import db
+        from app.models.permission import Permission, group_permissions
+
+        rows = db.session.execute(
+            db.select(Permission.id, Permission.code, group_permissions.c.group_id)
+            .select_from(Permission)
+            .outerjoin(group_permissions, group_permissions.c.permission_id == Permission.id)
+            .order_by(Permission.id)
+        ).all()
+
+        bits: Dict[str, int] = {}
+        group_masks: Dict[int, int] = {}
+        for _, code, group_id in rows:
+            bit = bits.setdefault(code, 1 << len(bits))
+            if group_id is not None:
+                group_masks[group_id] = group_masks.get(group_id, 0) | bit
+
+        with self._lock:
+            self.bits = bits
+            self.group_masks = group_masks
+            self.compiled = True
+        logger.debug('权限矩阵已编译: {} 项权限, {} 个用户组', len(bits), len(group_masks))
+
+    def _ensure_compiled(self) -> None:
+        if not self.compiled:
+            self.compile()
+
+    def bit(self, code: str) -> int:
+        self._ensure_compiled()
+        return self.bits.get(code, 0)
+
+    def mask_for_group(self, group_id: Optional[int]) -> int:
+        self._ensure_compiled()
+        return self.group_masks.get(group_id, 0) if group_id else 0
+
+    def allows(self, group_id: Optional[int], code: str) -> bool:
+        return bool(self.mask_for_group(group_id) & self.bit(code))
+
+    def for_group(self, group_id: Optional[int]) -> EffectivePermissions:
+        return EffectivePermissions(self.mask_for_group(group_id), self.bits)
+
+
+permission_matrix = PermissionMatrix()
+
+
+def effective_permissions(user) -> EffectivePermissions:
+    """计算用户的有效权限，同一请求内只计算一次
+
+    Args:
+        user: current_user、UserPrincipal 或 User 对象
+
+    Returns:
+        EffectivePermissions: 可用 `code in perms` 判断的权限集合
+    """
+    if user is None or not getattr(user, 'is_authenticated', False):
+        return permission_matrix.for_group(None)
+
+    cached = g.get('_effective_permissions')
+    if cached is not None and cached[0] == user.id:
+        return cached[1]
+
+    permissions = getattr(user, 'permissions', None)
+    if not isinstance(permissions, EffectivePermissions):
+        permissions = permission_matrix.for_group(user.group_id)
+    g._effective_permissions = (user.id, permissions)
+    return permissions
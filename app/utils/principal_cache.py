@@ -0,0 +1,157 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from flask_login import UserMixin
+from loguru import logger
+
+from app.utils.filelock import locked
+from app.utils.permissions import EffectivePermissions
+
+
+_SLOT = struct.Struct('<Q')
+
+
+class UserPrincipal(UserMixin):
+    """缓存在工作进程内的登录用户快照，替代每次请求加载 User ORM 对象"""
+
+    def __init__(self, id: int, username: str, is_active: bool,
+                 group_name: Optional[str], permissions: EffectivePermissions):
+        self.id = id
+        self.username = username
+        self._is_active = bool(is_active)
+        self.group_name = group_name
+        self.permissions = permissions
+
+    @property
+    def is_active(self):
+        return self._is_active
+
+    def has_permission(self, permission):
+        return permission in self.permissions
+
+    def __repr__(self):
+        return f'<UserPrincipal {self.id} {self.username}>'
+
+
+class VersionTable:
+    """基于内存映射文件的用户版本号表，供同一主机上的多个工作进程共享
+
+    用户ID按槽位数取模映射到固定槽位，槽位冲突只会导致多余的缓存失效，不会漏失效。
+    """
+
+    def __init__(self, path: Path, slots: int):
+        self.path = path
+        self.slots = slots
+        self._mmap = None
+        self._fd = None
+        self._pid = None
+
+    def _ensure_open(self):
+        if self._mmap is not None and self._pid == os.getpid():
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.slots * _SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        self._fd = fd
+        self._mmap = mmap.mmap(fd, size)
+        self._pid = os.getpid()
+
+    def _offset(self, user_id: int) -> int:
+        return (user_id % self.slots) * _SLOT.size
+
+    def get(self, user_id: int) -> int:
+        self._ensure_open()
+        return _SLOT.unpack_from(self._mmap, self._offset(user_id))[0]
+
+    def bump(self, user_id: int) -> int:
+        self._ensure_open()
+        offset = self._offset(user_id)
+        # 写入极少发生，用文件锁保证跨进程自增不丢失
+        with locked(self._fd):
+            version = _SLOT.unpack_from(self._mmap, offset)[0] + 1
+            _SLOT.pack_into(self._mmap, offset, version)
+        return version
+
+
+class PrincipalCache:
+    """按用户ID缓存 UserPrincipal 的 LRU + TTL 缓存
+
+    命中时只需比较一次共享版本号，不产生任何 SQL 查询；
+    用户数据变更后调用 invalidate() 提升版本号，所有工作进程的缓存随即失效。
+    """
+
+    def __init__(self):
+        self.max_size = 0
+        self.ttl = 0
+        self.versions: Optional[VersionTable] = None
+        self.loader: Optional[Callable[[int], Optional[UserPrincipal]]] = None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        path = app.config.get('PRINCIPAL_VERSION_PATH')
+        path = Path(path) if path else Path(app.instance_path) / 'principal_versions.bin'
+        self.max_size = app.config.get('PRINCIPAL_CACHE_SIZE', 10000)
+        self.ttl = app.config.get('PRINCIPAL_CACHE_TTL', 300)
+        self.versions = VersionTable(path, app.config.get('PRINCIPAL_CACHE_SLOTS', 65536))
+        app.extensions['principal_cache'] = self
+
+    def principal_loader(self, callback):
+        """注册缓存未命中时加载 UserPrincipal 的回调，用法同 login_manager.user_loader"""
+        self.loader = callback
+        return callback
+
+    def lookup(self, user_id: int) -> Tuple[Optional[UserPrincipal], int]:
+        """返回仍然有效的缓存快照与当前版本号，未命中、过期或版本变化时快照为 None"""
+        version = self.versions.get(user_id)
+        if self.max_size > 0:
+            with self._lock:
+                entry = self._entries.get(user_id)
+                if entry is not None:
+                    principal, cached_version, expires_at = entry
+                    if cached_version == version and expires_at > time.monotonic():
+                        self._entries.move_to_end(user_id)
+                        return principal, version
+                    del self._entries[user_id]
+        return None, version
+
+    def store(self, user_id: int, principal: UserPrincipal, version: int) -> None:
+        """缓存加载得到的快照，version 应为加载前 lookup() 返回的版本号"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (principal, version, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, user_id: int) -> Optional[UserPrincipal]:
+        """获取用户快照，未命中、过期或版本变化时通过 loader 重新加载"""
+        principal, version = self.lookup(user_id)
+        if principal is not None:
+            return principal
+        principal = self.loader(user_id)
+        if principal is not None:
+            self.store(user_id, principal, version)
+        return principal
+
+    def invalidate(self, user_id: int) -> None:
+        """提升用户版本号，使各工作进程中该用户的缓存失效"""
+        if self.versions is None:
+            return
+        with self._lock:
+            self._entries.pop(user_id, None)
+        version = self.versions.bump(user_id)
+        logger.debug('用户 {} 缓存版本提升至 {}', user_id, version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
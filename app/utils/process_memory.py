@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+# /proc/<pid>/smaps_rollup 中需要的字段（kB）
+_ROLLUP_FIELDS = {
+    'Rss': 'rss',
+    'Pss': 'pss',
+    'Shared_Clean': 'shared',
+    'Shared_Dirty': 'shared',
+    'Private_Clean': 'private',
+    'Private_Dirty': 'private',
+}
+
+
+def memory_usage(pid: Optional[int] = None) -> Optional[Dict[str, int]]:
+    """读取进程的内存占用（字节），仅支持 Linux
+
+    rss 为常驻内存；shared 为与其他进程（如 preload 后 fork 出的兄弟进程）共享的页，
+    private 为进程独占的页，pss 按共享进程数分摊共享页，所有工作进程的 pss 之和即实际占用。
+    内核不提供 smaps_rollup（低于 4.14）时只返回 rss。
+
+    Args:
+        pid: 进程号，默认为当前进程
+
+    Returns:
+        Optional[Dict[str, int]]: 包含 rss、pss、shared、private 的字典，无法读取时返回 None
+    """
+    proc = Path('/proc') / (str(pid) if pid else 'self')
+    try:
+        usage = dict.fromkeys(('rss', 'pss', 'shared', 'private'), 0)
+        for line in (proc / 'smaps_rollup').read_text().splitlines():
+            name, _, value = line.partition(':')
+            key = _ROLLUP_FIELDS.get(name)
+            if key is not None:
+                usage[key] += int(value.split()[0]) * 1024
+        return usage
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        for line in (proc / 'status').read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return {'rss': int(line.split()[1]) * 1024}
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def format_usage(usage: Optional[Dict[str, int]]) -> str:
+    """格式化为日志中使用的 MB 文本"""
+    if not usage:
+        return '不可用'
+    labels = (('rss', 'RSS'), ('pss', 'PSS'), ('shared', '共享'), ('private', '私有'))
+    return ', '.join(f'{label} {usage[key] / 1048576:.1f} MB' for key, label in labels if key in usage)
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+
+def parse_limit(value: str) -> Tuple[int, int]:
+    """解析 '次数/秒数' 形式的限流规则，例如 '10/60'"""
+    count, _, seconds = str(value).partition('/')
+    return int(count), int(seconds or 60)
+
+
+class Attempt(NamedTuple):
+    """一次计数的结果
+
+    Attributes:
+        retry_after: 超限时建议的重试等待秒数，未超限为 None
+        slots: 本次计数递增的 (键, 窗口序号)，撤销时原样传给 release()
+    """
+    retry_after: Optional[float] = None
+    slots: Tuple[Tuple[str, int], ...] = ()
+
+
+def _estimate(previous: int, current: int, window: int, now: float) -> float:
+    """滑动窗口计数：上一窗口按剩余比例加权，加上当前窗口计数"""
+    elapsed = (now % window) / window
+    return previous * (1 - elapsed) + current
+
+
+class MemoryBackend:
+    """进程内计数，适用于单进程开发服务器与测试"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, int], List] = {}
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def hit(self, rules: Iterable[Tuple[str, int, int]], now: float) -> Attempt:
+        rules = list(rules)
+        slots = tuple((key, int(now // window)) for key, _, window in rules)
+        with self._lock:
+            for key, limit, window in rules:
+                slot = int(now // window)
+                previous = self._counters.get((key, slot - 1), (0,))[0]
+                current = self._counters.get((key, slot), (0,))[0]
+                if _estimate(previous, current, window, now) >= limit:
+                    return Attempt(window - (now % window))
+            for (key, _, window), (_, slot) in zip(rules, slots):
+                counter = self._counters.setdefault((key, slot), [0, (slot + 2) * window])
+                counter[0] += 1
+            if now - self._last_purge > 60:
+                self._last_purge = now
+                self._counters = {
+                    item: counter for item, counter in self._counters.items() if counter[1] >= now
+                }
+        return Attempt(slots=slots)
+
+    def release(self, slots: Iterable[Tuple[str, int]]) -> None:
+        with self._lock:
+            for item in slots:
+                counter = self._counters.get(item)
+                if counter is not None and counter[0] > 0:
+                    counter[0] -= 1
+
+
+class SQLiteBackend:
+    """基于本地 SQLite 文件的计数，同一主机上的多个 gunicorn 工作进程共享"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limits ('
+                'key TEXT NOT NULL, slot INTEGER NOT NULL, count INTEGER NOT NULL, '
+                'expires_at REAL NOT NULL, PRIMARY KEY (key, slot)) WITHOUT ROWID'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def hit(self, rules: Iterable[Tuple[str, int, int]], now: float) -> Attempt:
+        rules = list(rules)
+        slots = tuple((key, int(now // window)) for key, _, window in rules)
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for key, limit, window in rules:
+                slot = int(now // window)
+                counts = dict(connection.execute(
+                    'SELECT slot, count FROM rate_limits WHERE key = ? AND slot IN (?, ?)',
+                    (key, slot - 1, slot),
+                ).fetchall())
+                if _estimate(counts.get(slot - 1, 0), counts.get(slot, 0), window, now) >= limit:
+                    connection.execute('ROLLBACK')
+                    return Attempt(window - (now % window))
+            for (key, _, window), (_, slot) in zip(rules, slots):
+                connection.execute(
+                    'INSERT INTO rate_limits (key, slot, count, expires_at) VALUES (?, ?, 1, ?) '
+                    'ON CONFLICT (key, slot) DO UPDATE SET count = count + 1',
+                    (key, slot, (slot + 2) * window),
+                )
+            if now - self._last_purge > 60:
+                self._last_purge = now
+                connection.execute('DELETE FROM rate_limits WHERE expires_at < ?', (now,))
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return Attempt(slots=slots)
+
+    def release(self, slots: Iterable[Tuple[str, int]]) -> None:
+        connection = self._connection()
+        for key, slot in slots:
+            connection.execute(
+                'UPDATE rate_limits SET count = count - 1 WHERE key = ? AND slot = ? AND count > 0',
+                (key, slot),
+            )
+
+
+class RateLimiter:
+    """登录限流器，按客户端 IP 与用户名两个维度做滑动窗口计数
+
+    超限时在任何数据库查询与密码哈希之前拒绝请求；登录成功后撤销本次计数，
+    只有失败的尝试消耗额度。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.backend = None
+        self.ip_limit: Tuple[int, int] = (0, 60)
+        self.username_limit: Tuple[int, int] = (0, 60)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LOGIN_RATE_LIMIT_ENABLED', True)
+        self.ip_limit = parse_limit(app.config.get('LOGIN_RATE_LIMIT_IP', '30/60'))
+        self.username_limit = parse_limit(app.config.get('LOGIN_RATE_LIMIT_USERNAME', '10/60'))
+
+        backend = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'sqlite':
+            path = app.config.get('RATE_LIMIT_SQLITE_PATH')
+            self.backend = SQLiteBackend(Path(path) if path else Path(app.instance_path) / 'ratelimit.db')
+        else:
+            self.backend = MemoryBackend()
+        app.extensions['rate_limiter'] = self
+
+    def check_login(self, ip: Optional[str], username: Optional[str]) -> Attempt:
+        """记录一次登录尝试
+
+        Args:
+            ip: 客户端IP
+            username: 尝试登录的用户名
+
+        Returns:
+            Attempt: 超限时 retry_after 为建议的重试等待秒数；登录成功后把它交给 login_succeeded()
+        """
+        if not self.enabled:
+            return Attempt()
+        rules = self._login_rules(ip, username)
+        if not rules:
+            return Attempt()
+
+        try:
+            return self.backend.hit(rules, time.time())
+        except sqlite3.Error:
+            # 限流存储不可用时放行，避免登录整体不可用
+            logger.exception('登录限流计数失败')
+            return Attempt()
+
+    def login_succeeded(self, attempt: Attempt) -> None:
+        """撤销 check_login() 对一次成功登录的计数
+
+        按计数时记录的窗口撤销，跨越窗口边界的登录不会误减下一个窗口。
+        """
+        if not attempt.slots:
+            return
+        try:
+            self.backend.release(attempt.slots)
+        except sqlite3.Error:
+            logger.exception('登录限流计数撤销失败')
+
+    def _login_rules(self, ip: Optional[str], username: Optional[str]) -> List[Tuple[str, int, int]]:
+        rules = []
+        if ip:
+            rules.append((f'login:ip:{ip}', *self.ip_limit))
+        if username:
+            rules.append((f'login:user:{username.strip().lower()[:64]}', *self.username_limit))
+        return rules
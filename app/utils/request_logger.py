@@ -1,5 +1,8 @@
+import time
+
 from flask import request, g
-from loguru import logger
+
+from app.extensions import log_control, log_pipeline, query_tracker
 
 
 def get_real_ip():
@@ -32,14 +35,34 @@ def log_request_info():
     g.user_ip = user_ip
     g.user_agent = user_agent
     
-    # 记录请求信息
-    logger.info(
-        "请求访问 - IP: {ip} | 方法: {method} | 路径: {path} | User-Agent: {user_agent}",
-        ip=user_ip,
-        method=request.method,
-        path=request.path,
-        user_agent=user_agent
+    # 静态资源等排除的端点不记录，高频端点按配置比例采样
+    if not log_control.should_log_request(request.endpoint):
+        return
+    g._request_logged = time.perf_counter()
+
+    # 只采集原始字段，消息格式化与输出由日志管道的后台线程完成
+    log_pipeline.capture(
+        'INFO', _format_request,
+        user_ip, request.method, request.path, user_agent,
+        context={'ip': user_ip, 'method': request.method, 'path': request.path}
+    )
+
+
+def log_request_complete(response):
+    """记录请求结束信息：状态码、耗时与本次请求的 SQL 查询次数和数据库耗时"""
+    started = g.pop('_request_logged', None)
+    if started is None:
+        return response
+
+    stats = query_tracker.current()
+    log_pipeline.capture(
+        'INFO', _format_request_complete,
+        request.method, request.path, response.status_code,
+        (time.perf_counter() - started) * 1000,
+        stats.count if stats else 0, stats.elapsed_ms if stats else 0.0,
+        context={'ip': g.get('user_ip'), 'method': request.method, 'path': request.path}
     )
+    return response
 
 
 def log_user_action(action, user=None, extra_data=None):
@@ -48,14 +71,36 @@ def log_user_action(action, user=None, extra_data=None):
     user_agent = getattr(g, 'user_agent', 'Unknown')
     username = user.username if user else 'Anonymous'
     
+    log_pipeline.capture(
+        'INFO', _format_user_action,
+        action, username, user_ip, user_agent, extra_data,
+        context={'user': username, 'ip': user_ip}
+    )
+
+
+def _format_request(fields):
+    ip, method, path, user_agent = fields
+    return f"请求访问 - IP: {ip} | 方法: {method} | 路径: {path} | User-Agent: {user_agent}"
+
+
+def _format_request_complete(fields):
+    method, path, status, elapsed_ms, queries, db_ms = fields
+    return (
+        f"请求完成 - 方法: {method} | 路径: {path} | 状态: {status} | 耗时: {elapsed_ms:.1f}ms"
+        f" | SQL: {queries} 次 / {db_ms:.1f}ms"
+    )
+
+
+def _format_user_action(fields):
+    action, username, user_ip, user_agent, extra_data = fields
     log_data = {
         "操作": action,
         "用户": username,
         "IP": user_ip,
         "User-Agent": user_agent
     }
-    
+
     if extra_data:
         log_data.update(extra_data)
-    
-    logger.info("用户行为 - {}", log_data)
\ No newline at end of file
+
+    return f"用户行为 - {log_data}"
@@ -0,0 +1,298 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Optional, Set
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Session.info 中记录本事务需要在提交后再次失效的键
+_PENDING_KEY = 'response_cache_pending'
+_CLEAR_ALL = '*'
+# 批量语句的执行选项：语句影响的缓存键，未提供时清空缓存
+CACHE_KEYS_OPTION = 'response_cache_keys'
+
+
+class MemoryBackend:
+    """进程内 LRU + TTL 缓存，适用于单进程开发服务器与测试
+
+    值按引用保存，调用方不应修改取出的对象。
+    """
+
+    # 访问不会阻塞事件循环，异步视图可直接调用
+    blocking = False
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """基于本地 SQLite 文件的缓存，同一主机上的多个 gunicorn 工作进程共享，值以 JSON 保存"""
+
+    blocking = True
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self._local = threading.local()
+        self._last_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or getattr(self._local, 'pid', None) != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID'
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connection().execute(
+            'SELECT value FROM response_cache WHERE key = ? AND expires_at > ?', (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        connection = self._connection()
+        connection.execute(
+            'INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value, ensure_ascii=False, separators=(',', ':')), now + ttl),
+        )
+        if now - self._last_purge > 60:
+            self._last_purge = now
+            connection.execute('DELETE FROM response_cache WHERE expires_at < ?', (now,))
+            # 超出容量时淘汰最早过期的条目
+            connection.execute(
+                'DELETE FROM response_cache WHERE key IN (SELECT key FROM response_cache '
+                'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)', (self.max_size,),
+            )
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            self._connection().execute(
+                f'DELETE FROM response_cache WHERE key IN ({",".join("?" * len(keys))})', keys,
+            )
+
+    def clear(self) -> None:
+        self._connection().execute('DELETE FROM response_cache')
+
+
+class ResponseCache:
+    """读多写少数据（用户组、成员列表等）的响应缓存
+
+    失效由 SQLAlchemy 事件驱动：flush 时调用变更对象的 cache_keys(change) 收集键并立即失效，
+    事务提交后再失效一次，避免并发请求在提交前把旧数据写回缓存；
+    对已登记数据表的批量 INSERT/UPDATE/DELETE 无法得知具体行，除非通过执行选项
+    CACHE_KEYS_OPTION 给出受影响的键，否则直接清空缓存。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.ttl = 60
+        self.backend = None
+        self.tables: Set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        max_size = app.config.get('RESPONSE_CACHE_SIZE', 1024)
+
+        backend = app.config.get('RESPONSE_CACHE_BACKEND', 'memory')
+        if backend == 'sqlite':
+            path = app.config.get('RESPONSE_CACHE_SQLITE_PATH')
+            self.backend = SQLiteBackend(
+                Path(path) if path else Path(app.instance_path) / 'response_cache.db', max_size,
+            )
+        else:
+            self.backend = MemoryBackend(max_size)
+        app.extensions['response_cache'] = self
+
+        if not self._listening:
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_soft_rollback', self._after_rollback)
+            event.listen(Session, 'do_orm_execute', self._do_orm_execute)
+            self._listening = True
+
+    def cached_model(self, model):
+        """类装饰器：登记模型的数据表，flush 时调用其实例的 cache_keys(change)"""
+        self.tables.add(model.__table__.name)
+        return model
+
+    def get(self, key: str) -> Any:
+        """只读取缓存值，未启用、未命中或存储不可用时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            return self.backend.get(key)
+        except sqlite3.Error:
+            logger.exception('读取响应缓存失败: {}', key)
+            return None
+
+    async def get_async(self, key: str) -> Any:
+        """get() 的协程版本"""
+        if not self.enabled:
+            return None
+        try:
+            return await self._call_backend(self.backend.get, key)
+        except sqlite3.Error:
+            logger.exception('读取响应缓存失败: {}', key)
+            return None
+
+    def get_or_set(self, key: str, builder: Callable[[], Any]) -> Any:
+        """返回缓存值，未命中时调用 builder 生成并写入；builder 返回 None 时不缓存
+
+        共享后端的值经过 JSON 序列化，builder 应只返回可序列化的数据。
+        """
+        if not self.enabled:
+            return builder()
+        try:
+            value = self.backend.get(key)
+        except sqlite3.Error:
+            # 缓存存储不可用时直接读库
+            logger.exception('读取响应缓存失败: {}', key)
+            return builder()
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = builder()
+        if value is not None:
+            try:
+                self.backend.set(key, value, self.ttl)
+            except sqlite3.Error:
+                logger.exception('写入响应缓存失败: {}', key)
+        return value
+
+    async def get_or_set_async(self, key: str, builder: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_set() 的协程版本，builder 为返回可等待对象的函数
+
+        会阻塞的后端（SQLite 文件）在线程池中访问，不占用事件循环。
+        """
+        if not self.enabled:
+            return await builder()
+        try:
+            value = await self._call_backend(self.backend.get, key)
+        except sqlite3.Error:
+            logger.exception('读取响应缓存失败: {}', key)
+            return await builder()
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await builder()
+        if value is not None:
+            try:
+                await self._call_backend(self.backend.set, key, value, self.ttl)
+            except sqlite3.Error:
+                logger.exception('写入响应缓存失败: {}', key)
+        return value
+
+    async def _call_backend(self, method: Callable, *args) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        """使指定键失效，传入 '*' 时清空缓存"""
+        if not self.enabled:
+            return
+        keys = set(keys)
+        try:
+            if _CLEAR_ALL in keys:
+                self.backend.clear()
+            elif keys:
+                self.backend.delete(keys)
+        except sqlite3.Error:
+            logger.exception('响应缓存失效失败: {}', keys)
+            return
+        logger.debug('响应缓存失效: {}', keys)
+
+    def _pending(self, session) -> Set[str]:
+        return session.info.setdefault(_PENDING_KEY, set())
+
+    def _after_flush(self, session, flush_context):
+        if not self.enabled:
+            return
+        keys: Set[str] = set()
+        for change, objects in (('new', session.new), ('dirty', session.dirty), ('deleted', session.deleted)):
+            for obj in objects:
+                collect = getattr(obj, 'cache_keys', None)
+                if collect is not None and obj.__table__.name in self.tables:
+                    keys.update(collect(change))
+        if keys:
+            self._pending(session).update(keys)
+            self.invalidate(keys)
+
+    def _do_orm_execute(self, orm_execute_state):
+        if not self.enabled or not (orm_execute_state.is_insert or orm_execute_state.is_update
+                                    or orm_execute_state.is_delete):
+            return
+        table = getattr(orm_execute_state.statement, 'table', None)
+        if table is not None and getattr(table, 'name', None) in self.tables:
+            keys = orm_execute_state.execution_options.get(CACHE_KEYS_OPTION)
+            keys = set(keys) if keys is not None else {_CLEAR_ALL}
+            self._pending(orm_execute_state.session).update(keys)
+            self.invalidate(keys)
+
+    def _after_commit(self, session):
+        keys = session.info.pop(_PENDING_KEY, None)
+        if keys:
+            self.invalidate(keys)
+
+    def _after_rollback(self, session, previous_transaction):
+        # 回滚的写入已在 flush 时失效过，无需再次处理
+        session.info.pop(_PENDING_KEY, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0}
@@ -0,0 +1,142 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from flask import request
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RequestQueryStats:
+    """单个请求内的 SQL 统计"""
+
+    __slots__ = ('count', 'elapsed', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+        self.shapes = Counter()
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.elapsed * 1000
+
+
+class QueryTracker:
+    """通过 SQLAlchemy 引擎事件统计每个请求的查询次数与数据库耗时
+
+    同一请求内相同语句（参数化后的 SQL）执行次数达到阈值时记录 N+1 警告；
+    单条语句超过慢查询阈值时连同 EXPLAIN QUERY PLAN 写入慢查询日志；
+    日志只记录参数类型，不记录绑定值，避免密码哈希等敏感数据落盘。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.headers = False
+        self.n_plus_one_threshold = 5
+        self.slow_query_seconds = 0.2
+        self.explain = True
+        # 上下文变量在同步线程与 ASGI 并发协程中都只对当前请求可见
+        self._stats: ContextVar[Optional[RequestQueryStats]] = ContextVar('request_query_stats', default=None)
+        self._listening = False
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SQL_STATS_ENABLED', True)
+        self.headers = app.config.get('SQL_STATS_HEADERS', False)
+        self.n_plus_one_threshold = app.config.get('SQL_N_PLUS_ONE_THRESHOLD', 5)
+        self.slow_query_seconds = app.config.get('SQL_SLOW_QUERY_MS', 200) / 1000
+        self.explain = app.config.get('SQL_SLOW_QUERY_EXPLAIN', True)
+        app.extensions['query_tracker'] = self
+        if not self.enabled:
+            return
+
+        # 监听 Engine 类，应用创建的所有引擎（包括之后新增的只读副本）都会被统计
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def current(self) -> Optional[RequestQueryStats]:
+        """返回当前请求的 SQL 统计，不在请求中时返回 None"""
+        return self._stats.get()
+
+    def _before_request(self):
+        self._stats.set(RequestQueryStats())
+
+    def _after_request(self, response):
+        stats = self.current()
+        if stats is not None:
+            if self.headers:
+                response.headers['X-DB-Queries'] = str(stats.count)
+                response.headers['X-DB-Time'] = f'{stats.elapsed_ms:.2f}'
+            self._report_repeats(stats)
+        return response
+
+    def _teardown_request(self, exc):
+        self._stats.set(None)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        stats = self._stats.get()
+        if stats is not None:
+            stats.count += 1
+            stats.elapsed += elapsed
+            stats.shapes[statement] += 1
+        if elapsed >= self.slow_query_seconds:
+            self._log_slow_query(conn, statement, parameters, elapsed, executemany)
+
+    def _report_repeats(self, stats: RequestQueryStats) -> None:
+        if not self.n_plus_one_threshold:
+            return
+        for statement, count in stats.shapes.items():
+            if count >= self.n_plus_one_threshold:
+                logger.warning(
+                    '疑似 N+1 查询: {} {} 中相同语句执行 {} 次: {}',
+                    request.method, request.path, count, _shorten(statement),
+                )
+
+    def _log_slow_query(self, conn, statement, parameters, elapsed, executemany) -> None:
+        plan = ''
+        if self.explain and not executemany and conn.dialect.name == 'sqlite' \
+                and statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            try:
+                # 直接使用 DBAPI 游标执行，不会再次触发引擎事件
+                cursor = conn.connection.dbapi_connection.cursor()
+                try:
+                    cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ())
+                    plan = '; '.join(str(row[-1]) for row in cursor.fetchall())
+                finally:
+                    cursor.close()
+            except Exception as exc:
+                plan = f'获取执行计划失败: {exc}'
+
+        logger.bind(slow_query=True).warning(
+            '慢查询 {:.1f}ms: {} | 参数类型: {} | 执行计划: {}',
+            elapsed * 1000, _shorten(statement), _shorten(_parameter_types(parameters)), plan or '-',
+        )
+
+
+def _parameter_types(parameters) -> str:
+    """描述绑定参数的类型，executemany 只记录参数组数"""
+    if not parameters:
+        return '-'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{name}: {type(value).__name__}' for name, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        if isinstance(parameters[0], (list, tuple, dict)):
+            return f'{len(parameters)} 组'
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+def _shorten(text: str, limit: int = 500) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= limit else text[:limit] + '...'
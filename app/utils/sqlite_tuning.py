@@ -0,0 +1,175 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.utils.filelock import lock_path
+
+
+# auto_vacuum 的取值：0 NONE、1 FULL、2 INCREMENTAL
+_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def sqlite_database_path(engine: Engine) -> Optional[str]:
+    """返回文件型 SQLite 引擎的数据库路径，内存数据库或其他方言返回 None"""
+    if engine.dialect.name != 'sqlite':
+        return None
+    database = engine.url.database
+    if not database or database == ':memory:' or database.startswith('file::memory:'):
+        return None
+    return database
+
+
+class SQLiteTuning:
+    """文件型 SQLite 的连接参数与定期维护
+
+    每个新连接建立时设置 WAL、synchronous、mmap_size、cache_size 与 busy_timeout；
+    各工作进程的后台线程按间隔执行 PRAGMA optimize 与增量 VACUUM，
+    通过数据库旁的锁文件保证同一时间只有一个进程执行维护。
+    """
+
+    def __init__(self):
+        self.journal_mode = 'WAL'
+        self.synchronous = 'NORMAL'
+        self.busy_timeout_ms = 5000
+        self.cache_size_kb = 16384
+        self.mmap_size = 256 * 1024 * 1024
+        self.auto_vacuum = 'INCREMENTAL'
+        self.maintenance_interval = 3600
+        self.vacuum_pages = 1000
+        self._engines: List[Engine] = []
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        self.journal_mode = app.config.get('SQLITE_JOURNAL_MODE', 'WAL')
+        self.synchronous = app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+        self.busy_timeout_ms = app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)
+        self.cache_size_kb = app.config.get('SQLITE_CACHE_SIZE_KB', 16384)
+        self.mmap_size = app.config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+        self.auto_vacuum = app.config.get('SQLITE_AUTO_VACUUM', 'INCREMENTAL')
+        self.maintenance_interval = app.config.get('SQLITE_MAINTENANCE_INTERVAL', 3600)
+        self.vacuum_pages = app.config.get('SQLITE_VACUUM_PAGES', 1000)
+        app.extensions['sqlite_tuning'] = self
+
+        # 引擎在 db.init_app 时创建，此时还没有建立任何连接
+        with app.app_context():
+            engines = dict(db.engines)
+        for bind_key, engine in engines.items():
+            if sqlite_database_path(engine) is None or event.contains(engine, 'connect', self._on_connect):
+                continue
+            event.listen(engine, 'connect', self._on_connect)
+            # 只读副本由 sync-replica 整库覆盖，只维护其他数据库
+            if bind_key != 'replica':
+                self._engines.append(engine)
+
+    def tune_engine(self, engine: Engine) -> None:
+        """为应用之外创建的引擎（如 ASGI 模式的异步引擎）设置相同的连接 PRAGMA，不参与定期维护"""
+        if sqlite_database_path(engine) is not None and not event.contains(engine, 'connect', self._on_connect):
+            event.listen(engine, 'connect', self._on_connect)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            # auto_vacuum 只对尚未建表的新数据库生效，已有数据库需执行一次 sqlite-maintenance --full
+            if self.auto_vacuum:
+                cursor.execute(f'PRAGMA auto_vacuum={self.auto_vacuum}')
+            if self.journal_mode:
+                cursor.execute(f'PRAGMA journal_mode={self.journal_mode}')
+            if self.synchronous:
+                cursor.execute(f'PRAGMA synchronous={self.synchronous}')
+            cursor.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            # 负数表示以 KiB 为单位
+            cursor.execute(f'PRAGMA cache_size=-{int(self.cache_size_kb)}')
+            cursor.execute(f'PRAGMA mmap_size={int(self.mmap_size)}')
+        finally:
+            cursor.close()
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        # 线程在各工作进程建立第一个连接时启动，fork 后的子进程会重新启动自己的线程
+        if self.maintenance_interval <= 0 or self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stopped,), name='sqlite-maintenance', daemon=True,
+            )
+            self._thread_pid = os.getpid()
+            self._thread.start()
+
+    def stop_maintenance(self) -> None:
+        """停止当前进程的维护线程；之后再建立连接时会重新启动
+
+        gunicorn 预加载应用时主进程也会建立连接，主进程不处理请求，不需要维护线程。
+        """
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                return
+            self._stopped.set()
+            thread, self._thread, self._thread_pid = self._thread, None, None
+        thread.join()
+
+    def _run(self, stopped: threading.Event) -> None:
+        while not stopped.wait(self.maintenance_interval):
+            for engine in list(self._engines):
+                try:
+                    self._maintain_if_due(engine)
+                except Exception:
+                    logger.exception('SQLite 维护失败: {}', engine.url.database)
+
+    def _maintain_if_due(self, engine: Engine) -> None:
+        path = Path(f'{sqlite_database_path(engine)}.maintenance')
+        with lock_path(path, blocking=False) as fd:
+            if fd is None:
+                return
+            # 锁文件的修改时间记录上次维护时间，其他工作进程在间隔内跳过
+            if time.time() - os.fstat(fd).st_mtime < self.maintenance_interval * 0.9:
+                return
+            self.maintain(engine)
+            os.utime(path)
+
+    def maintain(self, engine: Engine, full: bool = False) -> Dict[str, int]:
+        """执行一次维护：PRAGMA optimize、增量 VACUUM 与 WAL 检查点
+
+        Args:
+            engine: SQLite 引擎
+            full: 为 True 时执行完整 VACUUM，可把已有数据库切换为增量 auto_vacuum
+
+        Returns:
+            Dict[str, int]: 维护前后的空闲页数
+        """
+        started = time.perf_counter()
+        with engine.connect() as connection:
+            connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+            freelist_before = connection.exec_driver_sql('PRAGMA freelist_count').scalar()
+            if full:
+                connection.exec_driver_sql('VACUUM')
+            elif connection.exec_driver_sql('PRAGMA auto_vacuum').scalar() == _AUTO_VACUUM_INCREMENTAL \
+                    and freelist_before:
+                # sqlite3 的 execute 只单步执行一次（每步释放一页），executescript 会执行到结束
+                connection.connection.dbapi_connection.executescript(
+                    f'PRAGMA incremental_vacuum({int(self.vacuum_pages)});')
+            connection.exec_driver_sql('PRAGMA optimize')
+            connection.exec_driver_sql('PRAGMA wal_checkpoint(PASSIVE)').fetchall()
+            freelist_after = connection.exec_driver_sql('PRAGMA freelist_count').scalar()
+
+        result = {'freelist_before': freelist_before, 'freelist_after': freelist_after}
+        logger.info(
+            'SQLite 维护完成: {}，空闲页 {} -> {}，耗时 {:.1f}ms',
+            engine.url.database, freelist_before, freelist_after, (time.perf_counter() - started) * 1000,
+        )
+        return result
+
+    def engines(self) -> List[Engine]:
+        """返回需要维护的文件型 SQLite 引擎"""
+        return list(self._engines)
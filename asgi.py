@@ -0,0 +1,6 @@
+from app.asgi import create_asgi_app
+
+# 可选的 ASGI 入口：读接口以异步视图处理，其余请求仍由同步应用处理
+# 安装依赖: pip install -r requirements-asgi.txt
+# 启动: uvicorn asgi:app --host 0.0.0.0 --port 5000
+app = create_asgi_app('development')
@@ -1,16 +1,44 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
 import re
-from datetime import datetime
+import sys
+import time
+import zipfile
+from pathlib import Path
 from colorama import Fore, Style, init
 
 # 初始化colorama
 init(autoreset=True)
 
+# 预编译的日志行与 ANSI 转义序列匹配规则
+LOG_LINE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) \| (\w+) *\| (\S+:\d+) - (.*)')
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+
+LEVEL_COLORS = {
+    'INFO': Fore.GREEN,
+    'WARNING': Fore.YELLOW,
+    'ERROR': Fore.RED,
+    'DEBUG': Fore.CYAN,
+    'CRITICAL': Fore.MAGENTA,
+    'SUCCESS': Fore.GREEN
+}
+
+# loguru 轮转与压缩后的文件后缀
+_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
 def parse_log_line(line):
     """解析单行日志"""
     # 匹配时间戳、日志级别、模块和消息
-    pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) \| (\w+) *\| ([^:]+:\d+) - (.*)'
-    match = re.match(pattern, line)
-    
+    match = LOG_LINE_PATTERN.match(line)
+
     if match:
         timestamp, level, module, message = match.groups()
         return {
@@ -23,49 +51,138 @@ def parse_log_line(line):
         # 如果不匹配常规格式，返回原始行
         return {'raw': line}
 
+
 def colorize_level(level):
     """根据日志级别返回带颜色的字符串"""
-    colors = {
-        'INFO': Fore.GREEN,
-        'WARNING': Fore.YELLOW,
-        'ERROR': Fore.RED,
-        'DEBUG': Fore.CYAN,
-        'CRITICAL': Fore.MAGENTA,
-        'SUCCESS': Fore.GREEN
-    }
-    return colors.get(level, '') + level + Style.RESET_ALL
+    return LEVEL_COLORS.get(level, '') + level + Style.RESET_ALL
 
-def beautify_logs(input_text):
-    """美化日志文本"""
-    lines = input_text.strip().split('\n')
-    formatted_lines = []
-    
+
+def format_parsed(parsed):
+    """格式化解析后的日志行"""
+    if 'raw' in parsed:
+        return parsed['raw']
+    timestamp = parsed['timestamp']
+    level = colorize_level(parsed['level'])
+    module = Fore.BLUE + parsed['module'] + Style.RESET_ALL
+    message = parsed['message']
+    return f"[{Fore.CYAN}{timestamp}{Style.RESET_ALL}] {level:8} | {module:<30} | {message}"
+
+
+def iter_beautified(lines, level=None, module=None):
+    """逐行美化日志，在同一次遍历中按级别与模块过滤
+
+    无法解析的行（例如异常堆栈）跟随上一条日志的过滤结果输出。
+
+    Args:
+        lines: 日志行的可迭代对象，可以是正在追踪的文件
+        level: 只保留该级别的日志
+        module: 只保留模块中包含该字符串的日志
+    """
+    keep = level is None and module is None
     for line in lines:
-        # 移除ANSI转义序列
-        line = re.sub(r'\x1b\[[0-9;]*m', '', line)
+        line = ANSI_PATTERN.sub('', line.rstrip('\r\n'))
         parsed = parse_log_line(line)
-        
-        if 'raw' in parsed:
-            formatted_lines.append(parsed['raw'])
-        else:
-            # 格式化标准日志行
-            timestamp = parsed['timestamp']
-            level = colorize_level(parsed['level'])
-            module = Fore.BLUE + parsed['module'] + Style.RESET_ALL
-            message = parsed['message']
-            
-            formatted_line = f"[{Fore.CYAN}{timestamp}{Style.RESET_ALL}] {level:8} | {module:<30} | {message}"
-            formatted_lines.append(formatted_line)
-    
-    return '\n'.join(formatted_lines)
+        if 'raw' not in parsed:
+            keep = (level is None or parsed['level'] == level) and (module is None or module in parsed['module'])
+        if keep:
+            yield format_parsed(parsed)
+
+
+def beautify_logs(input_text):
+    """美化日志文本"""
+    return '\n'.join(iter_beautified(input_text.strip().split('\n')))
+
+
+def open_log_file(path):
+    """以文本方式打开日志文件，透明解压 loguru 压缩后的轮转文件"""
+    path = Path(path)
+    if path.suffix == '.zip':
+        archive = zipfile.ZipFile(path)
+        return io.TextIOWrapper(archive.open(archive.namelist()[0]), encoding='utf-8', errors='replace')
+    opener = _OPENERS.get(path.suffix)
+    if opener:
+        return opener(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def rotated_siblings(path):
+    """返回 loguru 轮转出的同名日志文件（含压缩文件），按修改时间从旧到新排列"""
+    path = Path(path)
+    candidates = [
+        item for item in path.parent.glob(f'{path.stem}.*')
+        if item != path and item.is_file() and '.log' in item.name[len(path.stem):]
+    ]
+    return sorted(candidates, key=lambda item: item.stat().st_mtime)
+
+
+def iter_log_files(path, include_rotated=True, include_current=True):
+    """按时间顺序逐行读取轮转文件与当前日志文件，不一次性载入内存
+
+    持续追踪时传入 include_current=False，当前文件交给 follow(from_start=True) 读取。
+    """
+    path = Path(path)
+    files = rotated_siblings(path) if include_rotated else []
+    if include_current and path.exists():
+        files.append(path)
+    for file_path in files:
+        with open_log_file(file_path) as handle:
+            yield from handle
+
+
+def follow(path, interval=0.5, from_start=False):
+    """持续追踪日志文件，文件被 loguru 轮转（重命名或截断）后自动切换到新文件
+
+    Args:
+        path: 日志文件路径
+        interval: 没有新内容时的轮询间隔（秒）
+        from_start: 是否从文件开头输出，默认只输出新增内容；先输出现有内容再追踪时应传 True，
+            由同一个文件句柄读完现有内容后继续等待，避免两次打开之间写入的日志丢失
+    """
+    path = Path(path)
+    handle = None
+    inode = None
+    pending = ''
+    while True:
+        if handle is None:
+            try:
+                handle = open(path, 'r', encoding='utf-8', errors='replace')
+            except FileNotFoundError:
+                time.sleep(interval)
+                continue
+            inode = os.fstat(handle.fileno()).st_ino
+            if not from_start:
+                handle.seek(0, os.SEEK_END)
+            from_start = True
+
+        chunk = handle.readline()
+        if chunk:
+            pending += chunk
+            if pending.endswith('\n'):
+                yield pending
+                pending = ''
+            continue
+
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            current = None
+        # 文件已被重命名或截断：旧文件已读完，切换到新文件
+        if current is None or current.st_ino != inode or current.st_size < handle.tell():
+            # 检查与轮转之间旧文件可能又写入了内容，切换前再读一次
+            if current is None or current.st_ino != inode:
+                for line in (pending + handle.read()).splitlines(keepends=True):
+                    yield line
+                pending = ''
+            handle.close()
+            handle = None
+            continue
+        time.sleep(interval)
+
 
 if __name__ == "__main__":
-    # 读取日志文件
-    with open('instance/logs/app.log', 'r', encoding='utf-8') as f:
-        log_content = f.read()
-    
-    # 美化日志
-    beautified = beautify_logs(log_content)
-    
-    # 打印美化后的日志
-    print(beautified)
\ No newline at end of file
+    # 逐行读取日志文件并立即输出，避免一次性载入整个文件
+    try:
+        for formatted_line in iter_beautified(iter_log_files('instance/logs/app.log', include_rotated=False)):
+            print(formatted_line)
+    except BrokenPipeError:
+        sys.stderr.close()
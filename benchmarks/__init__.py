@@ -0,0 +1,12 @@
+"""热点接口的基准测试
+
+用法::
+
+    python -m benchmarks --sizes 1k,100k --targets client,gunicorn
+    python -m benchmarks --sizes 1k --save-baseline
+
+fixtures 按用户规模生成 SQLite 数据库并缓存在 benchmarks/.fixtures/；
+client 目标在独立子进程中用 Flask 测试客户端逐个运行场景，gunicorn 目标启动本地
+gunicorn 并通过 HTTP 访问。结果包含 p50/p95/p99 延迟、每请求 SQL 次数与峰值 RSS，
+并与 benchmarks/baseline.json 比较。
+"""
@@ -0,0 +1,128 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.common import DEFAULT_BASELINE, ROOT, app_environ, parse_size, size_label
+from benchmarks.fixtures import ensure_fixture
+from benchmarks.scenarios import SCENARIO_NAMES, get_scenario
+from benchmarks import server
+
+
+def run_client(database: Path, size: int, scenario: str, requests: int, seed: int) -> Dict:
+    """在独立子进程中运行测试客户端场景，使峰值 RSS 只反映该场景"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        result_file = Path(log_dir) / 'result.json'
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.client', '--scenario', scenario,
+             '--size', str(size), '--requests', str(requests), '--seed', str(seed),
+             '--result-file', str(result_file)],
+            cwd=ROOT, env=app_environ(database, Path(log_dir)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f'client/{scenario} 失败:\n{completed.stderr[-2000:]}')
+        return json.loads(result_file.read_text(encoding='utf-8'))
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float,
+            min_delta_ms: float = 0.0, latency: bool = True) -> Dict[str, str]:
+    """与基线比较：p95 同时超出比例容差与绝对差值，或每请求 SQL 次数增加视为退化
+
+    latency 为 False 时只比较 SQL 次数（基线来自其他机器时延迟没有可比性）。
+    """
+    regressions = {}
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        reasons = []
+        if latency and previous.get('p95_ms') \
+                and result['p95_ms'] > previous['p95_ms'] * (1 + tolerance) \
+                and result['p95_ms'] - previous['p95_ms'] > min_delta_ms:
+            reasons.append(f"p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+        if previous.get('queries') is not None and result.get('queries') is not None \
+                and result['queries'] > previous['queries']:
+            reasons.append(f"queries {previous['queries']} -> {result['queries']}")
+        if reasons:
+            regressions[key] = '; '.join(reasons)
+    return regressions
+
+
+def print_table(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    header = f"{'场景':<32} {'p50':>9} {'p95':>9} {'p99':>9} {'SQL':>6} {'RSS MB':>8} {'基线 p95':>10}"
+    print(header)
+    print('-' * len(header))
+    for key, result in results.items():
+        previous = baseline.get(key, {}).get('p95_ms')
+        queries = '-' if result.get('queries') is None else result['queries']
+        print(
+            f"{key:<32} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+            f"{queries:>6} {result.get('rss_mb') or '-':>8} {previous if previous is not None else '-':>10}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='热点接口基准测试')
+    parser.add_argument('--sizes', default='1k', help='用户规模，逗号分隔，例如 1k,100k,1m')
+    parser.add_argument('--targets', default='client', help='client、gunicorn 或两者（逗号分隔）')
+    parser.add_argument('--scenarios', default=','.join(SCENARIO_NAMES), help='要运行的场景')
+    parser.add_argument('--requests', type=int, default=200, help='每个场景的请求数')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn 工作进程数')
+    parser.add_argument('--concurrency', type=int, default=4, help='gunicorn 目标的并发会话数')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rebuild-fixtures', action='store_true', help='重新生成基准数据库')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='基线文件')
+    parser.add_argument('--save-baseline', action='store_true', help='将本次结果合并写入基线文件')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='p95 允许超出基线的比例')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='p95 超出基线的绝对值不超过该毫秒数时不视为退化（亚毫秒级场景的抖动）')
+    parser.add_argument('--ignore-latency', action='store_true',
+                        help='只比较每请求 SQL 次数，基线来自其他机器时使用')
+    parser.add_argument('--output', type=Path, help='将本次结果写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(value) for value in args.sizes.split(',') if value.strip()]
+    targets = [value.strip() for value in args.targets.split(',') if value.strip()]
+    scenarios = [get_scenario(name.strip()) for name in args.scenarios.split(',') if name.strip()]
+
+    results: Dict[str, Dict] = {}
+    for size in sizes:
+        database = ensure_fixture(size, rebuild=args.rebuild_fixtures)
+        label = size_label(size)
+        if 'client' in targets:
+            for scenario in scenarios:
+                results[f'client/{label}/{scenario.name}'] = run_client(
+                    database, size, scenario.name, args.requests, args.seed)
+                print(f'完成 client/{label}/{scenario.name}', file=sys.stderr)
+        if 'gunicorn' in targets:
+            with tempfile.TemporaryDirectory() as log_dir, \
+                    server.GunicornServer(database, Path(log_dir), workers=args.workers) as gunicorn:
+                for scenario in scenarios:
+                    results[f'gunicorn/{label}/{scenario.name}'] = server.run_scenario(
+                        gunicorn, scenario, size, args.requests, args.concurrency, args.seed)
+                    print(f'完成 gunicorn/{label}/{scenario.name}', file=sys.stderr)
+
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+    print_table(results, baseline)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    if args.save_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, ensure_ascii=False, indent=2, sort_keys=True) + '\n',
+                                 encoding='utf-8')
+        print(f'基线已更新: {args.baseline}')
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms, latency=not args.ignore_latency)
+    for key, reason in regressions.items():
+        print(f'性能退化 {key}: {reason}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
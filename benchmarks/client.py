@@ -0,0 +1,84 @@
+import argparse
+import json
+import random
+import time
+
+from benchmarks.common import (
+    ADMIN_PASSWORD,
+    ADMIN_USERNAME,
+    extract_csrf,
+    peak_rss_mb,
+    summarise,
+)
+from benchmarks.scenarios import get_scenario, request_count
+
+
+def _login(client):
+    token = extract_csrf(client.get('/auth/login').get_data(as_text=True))
+    return client.post('/auth/login', data={
+        'username': ADMIN_USERNAME,
+        'password': ADMIN_PASSWORD,
+        'csrf_token': token,
+    })
+
+
+def run_scenario(name: str, size: int, requests: int, seed: int = 0, warmup: int = 5):
+    """在当前进程中创建应用并用测试客户端运行一个场景
+
+    由 runner 在独立子进程中调用，峰值 RSS 只反映该场景。
+    """
+    from app import create_app
+
+    app = create_app('production')
+    scenario = get_scenario(name)
+    rng = random.Random(seed)
+    client = app.test_client()
+    if scenario.authenticated:
+        response = _login(client)
+        if response.status_code != 302:
+            raise RuntimeError(f'登录失败: {response.status_code}')
+
+    latencies, queries = [], []
+    total = request_count(scenario, requests, size)
+    for iteration in range(warmup + total):
+        path = scenario.path(rng, size)
+        if scenario.name == 'login':
+            # 每次使用新的会话，只计时提交表单的请求
+            client = app.test_client()
+            token = extract_csrf(client.get(path).get_data(as_text=True))
+            started = time.perf_counter()
+            response = client.post(path, data={
+                'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD, 'csrf_token': token,
+            })
+        else:
+            started = time.perf_counter()
+            response = client.open(path, method=scenario.method)
+        elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise RuntimeError(f'{scenario.name} 请求失败: {path} -> {response.status_code}')
+        if iteration < warmup:
+            continue
+        latencies.append(elapsed)
+        if 'X-DB-Queries' in response.headers:
+            queries.append(int(response.headers['X-DB-Queries']))
+
+    result = summarise(latencies, queries)
+    result['rss_mb'] = peak_rss_mb()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='在测试客户端中运行单个基准场景（由 runner 调用）')
+    parser.add_argument('--scenario', required=True)
+    parser.add_argument('--size', type=int, required=True)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--result-file', required=True, help='结果写入的 JSON 文件（标准输出会混入应用日志）')
+    args = parser.parse_args(argv)
+    result = run_scenario(args.scenario, args.size, args.requests, args.seed)
+    with open(args.result_file, 'w', encoding='utf-8') as handle:
+        json.dump(result, handle)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import os
+import re
+import resource
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE_DIR = Path(__file__).resolve().parent / '.fixtures'
+DEFAULT_BASELINE = Path(__file__).resolve().parent / 'baseline.json'
+
+ADMIN_USERNAME = 'admin'
+ADMIN_PASSWORD = 'admin123'
+
+_CSRF_PATTERN = re.compile(r'name="csrf_token" value="([^"]+)"')
+
+
+def parse_size(value: str) -> int:
+    """解析 1k、100k、1m 形式的用户规模"""
+    value = value.strip().lower()
+    multiplier = 1
+    if value.endswith('k'):
+        multiplier, value = 1000, value[:-1]
+    elif value.endswith('m'):
+        multiplier, value = 1000000, value[:-1]
+    return int(float(value) * multiplier)
+
+
+def size_label(size: int) -> str:
+    if size >= 1000000 and size % 1000000 == 0:
+        return f'{size // 1000000}m'
+    if size >= 1000 and size % 1000 == 0:
+        return f'{size // 1000}k'
+    return str(size)
+
+
+def fixture_path(size: int) -> Path:
+    return FIXTURE_DIR / f'users_{size_label(size)}.db'
+
+
+def app_environ(database: Path, log_dir: Path) -> Dict[str, str]:
+    """基准测试进程的环境变量：使用生产配置，关闭登录限流，开启 SQL 统计响应头"""
+    environ = dict(os.environ)
+    environ.update({
+        'DATABASE_URL': f'sqlite:///{database.resolve()}',
+        'LOG_DIR': str(log_dir),
+        'LOGIN_RATE_LIMIT_ENABLED': '0',
+        'SQL_STATS_HEADERS': '1',
+        'METRICS_DIR': str(log_dir / 'metrics'),
+        'PYTHONPATH': os.pathsep.join(filter(None, [str(ROOT), os.environ.get('PYTHONPATH')])),
+    })
+    return environ
+
+
+def extract_csrf(html: str) -> Optional[str]:
+    match = _CSRF_PATTERN.search(html)
+    return match.group(1) if match else None
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """最近秩法百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(pct / 100 * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarise(latencies: List[float], queries: List[int]) -> Dict[str, float]:
+    """汇总单个场景的延迟（毫秒）与每请求 SQL 次数"""
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'queries': round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值 RSS（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
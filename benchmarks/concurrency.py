@@ -0,0 +1,171 @@
+"""在大量并发连接下比较同步（gunicorn sync）与 ASGI（gunicorn + UvicornWorker）两种部署模式
+
+用法::
+
+    python -m benchmarks.concurrency --size 10k --connections 500 --duration 20
+
+ASGI 模式需要先安装 requirements-asgi.txt 中的可选依赖。
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.common import parse_size, percentile, size_label
+from benchmarks.fixtures import ensure_fixture
+from benchmarks.scenarios import get_scenario
+from benchmarks.server import GunicornServer, HttpSession
+
+MODES = {
+    'sync': {'worker_class': 'sync', 'app': "app:create_app('production')"},
+    'asgi': {'worker_class': 'uvicorn.workers.UvicornWorker', 'app': "app.asgi:create_asgi_app('production')"},
+}
+# 有异步版本的读接口场景
+DEFAULT_SCENARIOS = 'get_user,get_group,group_members'
+
+
+class LoadResult:
+    """一次压测的累计结果"""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+
+    def summary(self, elapsed: float) -> Dict[str, float]:
+        latencies = self.latencies
+        return {
+            'requests': len(latencies),
+            'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'non_2xx': sum(count for status, count in self.statuses.items() if not 200 <= status < 400),
+            'errors': self.errors,
+        }
+
+
+async def _read_response(reader: asyncio.StreamReader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    if length:
+        await reader.readexactly(length)
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+async def _connection(port: int, cookie: str, scenario, size: int, seed: int,
+                      deadline: float, measure_from: float, result: LoadResult, timeout: float):
+    """单个连接：尽可能保持长连接连续发送请求，服务端关闭连接时重新连接（计入延迟）"""
+    rng = random.Random(seed)
+    reader = writer = None
+    while time.monotonic() < deadline:
+        request = (
+            f'GET {scenario.path(rng, size)} HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n'
+            f'Cookie: {cookie}\r\n\r\n'
+        ).encode('latin-1')
+        started = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), timeout)
+            writer.write(request)
+            status, close = await asyncio.wait_for(_read_response(reader), timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            if started >= measure_from:
+                result.errors += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            continue
+        finished = time.monotonic()
+        if started >= measure_from:
+            result.latencies.append(finished - started)
+            result.statuses[status] = result.statuses.get(status, 0) + 1
+        if close:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def _run_load(port: int, cookie: str, scenario, size: int, connections: int,
+                    duration: float, warmup: float, seed: int, timeout: float) -> Dict[str, float]:
+    result = LoadResult()
+    now = time.monotonic()
+    measure_from = now + warmup
+    deadline = measure_from + duration
+    await asyncio.gather(*[
+        _connection(port, cookie, scenario, size, seed * 100000 + index, deadline, measure_from, result, timeout)
+        for index in range(connections)
+    ])
+    return result.summary(duration)
+
+
+def run_mode(mode: str, database: Path, size: int, scenarios, connections: int, duration: float,
+             warmup: float, workers: int, seed: int, timeout: float) -> Dict[str, Dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir, \
+            GunicornServer(database, Path(log_dir), workers=workers, **MODES[mode]) as server:
+        session = HttpSession(server.port)
+        if session.login().status != 302:
+            raise RuntimeError(f'{mode} 登录失败')
+        cookie = '; '.join(f'{key}={value}' for key, value in session.cookies.items())
+        for scenario in scenarios:
+            summary = asyncio.run(_run_load(
+                server.port, cookie, scenario, size, connections, duration, warmup, seed, timeout,
+            ))
+            summary['rss_mb'] = server.peak_rss_mb()
+            results[f'{mode}/{size_label(size)}/{scenario.name}'] = summary
+            print(f'完成 {mode}/{scenario.name}', file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.concurrency', description=__doc__.splitlines()[0])
+    parser.add_argument('--size', default='10k', help='基准数据库的用户规模')
+    parser.add_argument('--modes', default='sync,asgi', help='sync、asgi 或两者（逗号分隔）')
+    parser.add_argument('--scenarios', default=DEFAULT_SCENARIOS, help='要运行的场景')
+    parser.add_argument('--connections', type=int, default=500, help='并发连接数')
+    parser.add_argument('--duration', type=float, default=20, help='每个场景的计时时长（秒）')
+    parser.add_argument('--warmup', type=float, default=3, help='计时前的预热时长（秒）')
+    parser.add_argument('--workers', type=int, default=4, help='两种模式使用相同的工作进程数')
+    parser.add_argument('--timeout', type=float, default=30, help='单个请求的超时（秒），超时计为错误')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rebuild-fixtures', action='store_true')
+    parser.add_argument('--output', type=Path, help='将结果写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    size = parse_size(args.size)
+    database = ensure_fixture(size, rebuild=args.rebuild_fixtures)
+    scenarios = [get_scenario(name.strip()) for name in args.scenarios.split(',') if name.strip()]
+    results: Dict[str, Dict] = {}
+    for mode in [value.strip() for value in args.modes.split(',') if value.strip()]:
+        results.update(run_mode(mode, database, size, scenarios, args.connections, args.duration,
+                                args.warmup, args.workers, args.seed, args.timeout))
+
+    header = (f"{'场景':<28} {'req/s':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'非2xx':>6} {'错误':>6} "
+              f"{'RSS MB':>8}")
+    print(f'{args.connections} 个并发连接，每个场景 {args.duration:g} 秒')
+    print(header)
+    print('-' * len(header))
+    for key, result in results.items():
+        print(f"{key:<28} {result['rps']:>9.1f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['non_2xx']:>6} {result['errors']:>6} {result['rss_mb'] or '-':>8}")
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import ROOT, app_environ, fixture_path, parse_size
+
+
+def ensure_fixture(size: int, rebuild: bool = False, seed: int = 42) -> Path:
+    """返回指定规模的基准数据库，不存在时生成
+
+    数据库结构与默认数据由应用自身创建，用户行由 flask seed-synthetic 生成，
+    相同的 size 与 seed 总是得到相同的数据。
+    """
+    path = fixture_path(size)
+    if path.exists() and not rebuild:
+        return path
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as log_dir:
+        # 在独立进程中运行命令，确保 DATABASE_URL 在读取配置之前生效
+        subprocess.run(
+            [sys.executable, '-m', 'flask', '--app', "app:create_app('production')", 'seed-synthetic',
+             '--users', str(size), '--seed', str(seed), '--password', 'benchmark'],
+            cwd=ROOT, env=app_environ(tmp_path, Path(log_dir)), check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.execute('ANALYZE')
+    finally:
+        connection.close()
+    os.replace(tmp_path, path)
+    print(f'已生成基准数据 {path.name}（{size} 位用户，{time.perf_counter() - started:.1f}s）', file=sys.stderr)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成基准测试数据库')
+    parser.add_argument('sizes', nargs='+', help='用户规模，例如 1k 100k 1m')
+    parser.add_argument('--rebuild', action='store_true', help='重新生成已存在的数据库')
+    args = parser.parse_args(argv)
+    for value in args.sizes:
+        print(ensure_fixture(parse_size(value), rebuild=args.rebuild))
+
+
+if __name__ == '__main__':
+    main()
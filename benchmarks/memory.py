@@ -0,0 +1,92 @@
+"""比较 gunicorn 开启与关闭 preload 时各工作进程的内存占用
+
+用法::
+
+    python -m benchmarks.memory --size 10k --workers 4
+
+每种模式启动 gunicorn（gunicorn.conf.py）后先运行各场景预热，再读取每个工作进程的
+RSS、PSS、共享与私有内存。RSS 会重复计算共享页，主进程与工作进程的 PSS 之和才是实际占用。
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict
+
+from app.utils.process_memory import memory_usage
+from benchmarks.common import parse_size, size_label
+from benchmarks.fixtures import ensure_fixture
+from benchmarks.scenarios import SCENARIO_NAMES, get_scenario
+from benchmarks.server import GunicornServer, run_scenario
+
+_MB = 1048576
+
+
+def measure(database: Path, size: int, preload: bool, workers: int, worker_class: str,
+            threads: int, requests: int, scenarios) -> Dict:
+    with tempfile.TemporaryDirectory() as log_dir, \
+            GunicornServer(database, Path(log_dir), workers=workers, worker_class=worker_class,
+                           threads=threads, preload=preload) as server:
+        for scenario in scenarios:
+            run_scenario(server, scenario, size, requests, concurrency=workers)
+        usages = [memory_usage(pid) for pid in server.worker_pids() or []]
+        master = memory_usage(server.process.pid)
+    usages = [usage for usage in usages if usage]
+    if not usages or master is None:
+        raise RuntimeError('无法读取进程内存（需要 Linux 的 /proc）')
+    result = {
+        'workers': [{key: round(value / _MB, 1) for key, value in usage.items()} for usage in usages],
+        'master_rss_mb': round(master['rss'] / _MB, 1),
+    }
+    # 合计包含主进程：preload 时应用加载在主进程中，工作进程与其共享这部分页
+    for key in ('rss', 'pss', 'shared', 'private'):
+        if all(key in usage for usage in usages + [master]):
+            result[f'{key}_total_mb'] = round(sum(usage[key] for usage in usages + [master]) / _MB, 1)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.memory', description=__doc__.splitlines()[0])
+    parser.add_argument('--size', default='10k', help='基准数据库的用户规模')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--worker-class', default='gthread')
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--scenarios', default='index,get_user,list_users,group_members', help='预热使用的场景')
+    parser.add_argument('--requests', type=int, default=200, help='每个场景的预热请求数')
+    parser.add_argument('--rebuild-fixtures', action='store_true')
+    parser.add_argument('--output', type=Path, help='将结果写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    size = parse_size(args.size)
+    database = ensure_fixture(size, rebuild=args.rebuild_fixtures)
+    names = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(names) - set(SCENARIO_NAMES)
+    if unknown:
+        parser.error(f'未知场景: {", ".join(sorted(unknown))}')
+    scenarios = [get_scenario(name) for name in names]
+
+    results = {}
+    for preload in (False, True):
+        label = 'preload' if preload else 'no-preload'
+        results[label] = measure(database, size, preload, args.workers, args.worker_class,
+                                 args.threads, args.requests, scenarios)
+        print(f'完成 {label}', file=sys.stderr)
+
+    print(f'{size_label(size)} 用户，{args.workers} 个 {args.worker_class} 工作进程')
+    header = f"{'模式':<12} {'RSS 合计':>10} {'PSS 合计':>10} {'共享合计':>10} {'私有合计':>10} {'主进程 RSS':>10}"
+    print(header)
+    print('-' * len(header))
+    for label, result in results.items():
+        columns = [result.get(f'{key}_total_mb', '-') for key in ('rss', 'pss', 'shared', 'private')]
+        print(f'{label:<12} ' + ' '.join(f'{value:>10}' for value in columns) + f" {result['master_rss_mb']:>10}")
+    if 'pss_total_mb' in results['preload']:
+        saved = results['no-preload']['pss_total_mb'] - results['preload']['pss_total_mb']
+        print(f'preload 使 PSS 合计减少 {saved:.1f} MB')
+    if args.output:
+        args.output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
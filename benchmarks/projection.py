@@ -0,0 +1,108 @@
+"""比较用户列表的 ORM to_dict() 路径与列投影路径的单行耗时和内存
+
+用法::
+
+    python -m benchmarks.projection --size 100k --rows 10000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.common import app_environ, parse_size
+from benchmarks.fixtures import ensure_fixture
+
+
+def _measure(build: Callable[[], List], rows: int, repeats: int) -> Dict[str, float]:
+    """取多次运行中的最短耗时，内存按 tracemalloc 峰值计算（单独运行一次）"""
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        started = time.perf_counter()
+        result = build()
+        timings.append(time.perf_counter() - started)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(result)
+    del result
+    best = min(timings)
+    return {
+        'rows': count,
+        'total_ms': round(best * 1000, 2),
+        'us_per_row': round(best * 1e6 / max(count, 1), 2),
+        'bytes_per_row': round(peak / max(count, 1)),
+    }
+
+
+def run(rows: int, repeats: int) -> Dict[str, Dict[str, float]]:
+    from app import create_app
+    from app.extensions import db
+    from app.models.user import User
+    from app.services.projections import fetch_user_dicts, fetch_user_records, select_user_records
+
+    app = create_app('production')
+    results = {}
+    with app.app_context():
+        def orm_to_dict():
+            users = User.query.order_by(User.id).limit(rows).all()
+            data = [user.to_dict() for user in users]
+            # 与请求结束时一致：清空会话，后续路径不复用标识映射
+            db.session.remove()
+            return data
+
+        def projection_records():
+            return fetch_user_records(select_user_records().order_by(User.id).limit(rows))
+
+        def projection_dicts():
+            return fetch_user_dicts(select_user_records().order_by(User.id).limit(rows))
+
+        for name, build in (('orm_to_dict', orm_to_dict), ('records', projection_records),
+                            ('dicts', projection_dicts)):
+            results[name] = _measure(build, rows, repeats)
+            db.session.remove()
+
+        serialise_started = time.perf_counter()
+        payload = json.dumps(fetch_user_dicts(select_user_records().order_by(User.id).limit(rows)))
+        results['dicts']['json_ms'] = round((time.perf_counter() - serialise_started) * 1000, 2)
+        results['dicts']['json_bytes'] = len(payload)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.projection', description=__doc__.splitlines()[0])
+    parser.add_argument('--size', default='10k', help='基准数据库的用户规模')
+    parser.add_argument('--rows', type=int, default=5000, help='每次读取的行数')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--rebuild-fixtures', action='store_true')
+    args = parser.parse_args(argv)
+
+    database = ensure_fixture(parse_size(args.size), rebuild=args.rebuild_fixtures)
+    # 配置在导入时读取环境变量，需在导入 app 之前设置
+    with tempfile.TemporaryDirectory() as log_dir:
+        os.environ.update(app_environ(database, Path(log_dir)))
+        os.environ['LOG_LEVEL'] = 'WARNING'
+        results = run(args.rows, args.repeats)
+
+    header = f"{'路径':<14} {'行数':>8} {'总耗时 ms':>10} {'µs/行':>8} {'字节/行':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        print(f"{name:<14} {result['rows']:>8} {result['total_ms']:>10.2f} {result['us_per_row']:>8.2f} "
+              f"{result['bytes_per_row']:>9}")
+    print(f"dicts 序列化为 JSON: {results['dicts']['json_ms']:.2f} ms，{results['dicts']['json_bytes']} 字节")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
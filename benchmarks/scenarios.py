@@ -0,0 +1,66 @@
+import random
+from dataclasses import dataclass
+from typing import Callable, List
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """一个基准场景
+
+    Attributes:
+        name: 场景名称
+        method: HTTP 方法
+        path: 根据随机数发生器与用户规模生成请求路径的函数
+        authenticated: 是否需要先登录
+        heavy: 响应随数据规模线性增长的场景，大规模数据下减少请求次数
+    """
+    name: str
+    method: str
+    path: Callable[[random.Random, int], str]
+    authenticated: bool = True
+    heavy: bool = False
+
+
+def _user_path(rng: random.Random, size: int) -> str:
+    return f'/users/{rng.randint(1, size)}/'
+
+
+def _group_path(rng: random.Random, size: int) -> str:
+    return f'/groups/{rng.randint(1, 3)}/'
+
+
+def _group_members_path(rng: random.Random, size: int) -> str:
+    return f'/groups/{rng.randint(1, 3)}/members/'
+
+
+def _search_path(rng: random.Random, size: int) -> str:
+    # 合成用户名为 user + 7 位序号，取序号末尾 4 位作为子串关键字
+    digits = f'{rng.randint(0, size - 1):07d}'
+    return f'/users/search?q={digits[-4:]}'
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario('index', 'GET', lambda rng, size: '/'),
+    Scenario('login', 'POST', lambda rng, size: '/auth/login', authenticated=False),
+    Scenario('get_user', 'GET', _user_path),
+    Scenario('list_users', 'GET', lambda rng, size: '/users/?limit=50'),
+    Scenario('get_group', 'GET', _group_path),
+    Scenario('group_members', 'GET', _group_members_path, heavy=True),
+    Scenario('search_users', 'GET', _search_path),
+]
+
+SCENARIO_NAMES = [scenario.name for scenario in SCENARIOS]
+
+
+def get_scenario(name: str) -> Scenario:
+    for scenario in SCENARIOS:
+        if scenario.name == name:
+            return scenario
+    raise KeyError(name)
+
+
+def request_count(scenario: Scenario, requests: int, size: int) -> int:
+    """重型场景在 10 万用户以上时最多执行 10 次"""
+    if scenario.heavy and size >= 100000:
+        return min(requests, 10)
+    return requests
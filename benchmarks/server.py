@@ -0,0 +1,210 @@
+import http.client
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlencode
+
+from benchmarks.common import (
+    ADMIN_PASSWORD,
+    ADMIN_USERNAME,
+    ROOT,
+    app_environ,
+    extract_csrf,
+    summarise,
+)
+from benchmarks.scenarios import Scenario, request_count
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class HttpSession:
+    """带 Cookie 的最小 HTTP 客户端，不跟随重定向"""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.cookies: Dict[str, str] = {}
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, form: Optional[Dict[str, str]] = None):
+        headers = {}
+        body = None
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{key}={value}' for key, value in self.cookies.items())
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=120)
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionError):
+                # 同步工作进程不保持连接，断开后重连一次
+                self._connection.close()
+                self._connection = None
+                if attempt:
+                    raise
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for key, morsel in SimpleCookie(header).items():
+                self.cookies[key] = morsel.value
+        if response.getheader('Connection', '').lower() == 'close':
+            self._connection.close()
+            self._connection = None
+        return response, data
+
+    def login(self):
+        _, html = self.request('GET', '/auth/login')
+        token = extract_csrf(html.decode('utf-8'))
+        response, _ = self.request('POST', '/auth/login', form={
+            'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD, 'csrf_token': token,
+        })
+        return response
+
+
+class GunicornServer:
+    """在本地端口启动使用生产配置的 gunicorn"""
+
+    def __init__(self, database: Path, log_dir: Path, workers: int = 4, worker_class: str = 'sync',
+                 threads: int = 1, app: str = "app:create_app('production')", preload: bool = True):
+        self.database = database
+        self.log_dir = log_dir
+        self.workers = workers
+        self.worker_class = worker_class
+        self.threads = threads
+        self.app = app
+        self.preload = preload
+        self.port = _free_port()
+        self.process: Optional[subprocess.Popen] = None
+
+    def __enter__(self):
+        command = [
+            sys.executable, '-m', 'gunicorn',
+            '--config', str(ROOT / 'gunicorn.conf.py'),
+            '--bind', f'127.0.0.1:{self.port}',
+            '--workers', str(self.workers),
+            '--worker-class', self.worker_class,
+            '--threads', str(self.threads),
+            '--log-level', 'warning',
+            self.app,
+        ]
+        environ = app_environ(self.database, self.log_dir)
+        # 基准测试期间不回收工作进程，避免重启计入延迟
+        environ.update({'GUNICORN_PRELOAD': '1' if self.preload else '0', 'GUNICORN_MAX_REQUESTS': '0'})
+        self.process = subprocess.Popen(
+            command, cwd=ROOT, env=environ,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'gunicorn 启动失败，退出码 {self.process.returncode}')
+            try:
+                response, _ = HttpSession(self.port).request('GET', '/auth/login')
+                if response.status == 200:
+                    return self
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError('gunicorn 启动超时')
+
+    def __exit__(self, *exc):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGTERM)
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def worker_pids(self) -> Optional[List[int]]:
+        """各工作进程的进程号，仅支持 Linux"""
+        children = Path(f'/proc/{self.process.pid}/task/{self.process.pid}/children')
+        try:
+            return [int(pid) for pid in children.read_text().split()]
+        except OSError:
+            return None
+
+    def peak_rss_mb(self) -> Optional[float]:
+        """主进程与各工作进程峰值 RSS（VmHWM）之和，仅支持 Linux"""
+        workers = self.worker_pids()
+        if workers is None:
+            return None
+        total_kb = 0
+        for pid in [self.process.pid] + workers:
+            try:
+                for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+                    if line.startswith('VmHWM:'):
+                        total_kb += int(line.split()[1])
+            except OSError:
+                continue
+        return round(total_kb / 1024, 1)
+
+
+def run_scenario(server: GunicornServer, scenario: Scenario, size: int, requests: int,
+                 concurrency: int = 4, seed: int = 0, warmup: int = 5) -> Dict:
+    """以 concurrency 个并发会话通过 HTTP 运行一个场景"""
+    total = request_count(scenario, requests, size)
+    per_session = [total // concurrency + (1 if index < total % concurrency else 0)
+                   for index in range(concurrency)]
+    latencies: List[float] = []
+    queries: List[int] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def worker(index: int, count: int):
+        rng = random.Random(seed * 1000 + index)
+        session = HttpSession(server.port)
+        if scenario.authenticated and session.login().status != 302:
+            errors.append('登录失败')
+            return
+        for iteration in range(warmup + count):
+            path = scenario.path(rng, size)
+            if scenario.name == 'login':
+                session = HttpSession(server.port)
+                _, html = session.request('GET', path)
+                form = {'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD,
+                        'csrf_token': extract_csrf(html.decode('utf-8'))}
+                started = time.perf_counter()
+                response, _ = session.request('POST', path, form=form)
+            else:
+                started = time.perf_counter()
+                response, _ = session.request(scenario.method, path)
+            elapsed = time.perf_counter() - started
+            if response.status >= 400:
+                errors.append(f'{path} -> {response.status}')
+                return
+            if iteration < warmup:
+                continue
+            with lock:
+                latencies.append(elapsed)
+                header = response.getheader('X-DB-Queries')
+                if header is not None:
+                    queries.append(int(header))
+
+    threads = [threading.Thread(target=worker, args=(index, count))
+               for index, count in enumerate(per_session) if count]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise RuntimeError(f'{scenario.name} 请求失败: {errors[0]}')
+
+    result = summarise(latencies, queries)
+    result['rss_mb'] = server.peak_rss_mb()
+    return result
@@ -18,12 +18,95 @@ class Config:
     # 数据库配置
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # 连接池按工作进程独立；SQLite 内存数据库由 Flask-SQLAlchemy 使用 StaticPool，不能设置池大小
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('SQLALCHEMY_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.environ.get('SQLALCHEMY_POOL_TIMEOUT', 10)),
+    }
+    # 只读副本（可选）：GET/HEAD 请求的查询发往副本，写入后 READ_REPLICA_PIN_SECONDS 秒内该用户只读主库
+    SQLALCHEMY_BINDS = {'replica': os.environ['DATABASE_REPLICA_URL']} if os.environ.get('DATABASE_REPLICA_URL') else {}
+    READ_REPLICA_PIN_SECONDS = float(os.environ.get('READ_REPLICA_PIN_SECONDS', 5))
+    # ASGI 模式（asgi.py）异步视图使用的连接池，引擎由上面的数据库 URL 派生
+    ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 20))
+    ASYNC_DB_MAX_OVERFLOW = int(os.environ.get('ASYNC_DB_MAX_OVERFLOW', 10))
+    ASYNC_DB_POOL_TIMEOUT = float(os.environ.get('ASYNC_DB_POOL_TIMEOUT', 10))
+
+    # SQLite 配置（仅对文件型数据库生效，每个新连接执行对应的 PRAGMA）
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 16384))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_AUTO_VACUUM = os.environ.get('SQLITE_AUTO_VACUUM', 'INCREMENTAL')
+    # 定期执行 PRAGMA optimize 与增量 VACUUM 的间隔（秒），0 表示只通过 sqlite-maintenance 命令手动执行
+    SQLITE_MAINTENANCE_INTERVAL = int(os.environ.get('SQLITE_MAINTENANCE_INTERVAL', 3600))
+    SQLITE_VACUUM_PAGES = int(os.environ.get('SQLITE_VACUUM_PAGES', 1000))
+
+    # 分页配置
+    USERS_PAGE_SIZE = int(os.environ.get('USERS_PAGE_SIZE', 50))
+    USERS_PAGE_SIZE_MAX = int(os.environ.get('USERS_PAGE_SIZE_MAX', 200))
+    # 用户搜索（/users/search）返回条数
+    USER_SEARCH_LIMIT = int(os.environ.get('USER_SEARCH_LIMIT', 20))
+    USER_SEARCH_LIMIT_MAX = int(os.environ.get('USER_SEARCH_LIMIT_MAX', 100))
+
+    # 批量导入与批量操作配置
+    USER_IMPORT_BATCH_SIZE = int(os.environ.get('USER_IMPORT_BATCH_SIZE', 1000))
+    USER_BATCH_MAX_SIZE = int(os.environ.get('USER_BATCH_MAX_SIZE', 1000))
 
     # 会话配置
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
 
+    # 登录用户缓存配置（每个工作进程独立缓存，版本号表跨进程共享）
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get('PRINCIPAL_CACHE_SIZE', 10000))
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 300))
+    PRINCIPAL_CACHE_SLOTS = int(os.environ.get('PRINCIPAL_CACHE_SLOTS', 65536))
+    PRINCIPAL_VERSION_PATH = os.environ.get('PRINCIPAL_VERSION_PATH')
+
     # 安全配置
     WTF_CSRF_ENABLED = True
+    # 应用前的可信反向代理层数：大于 0 时按 X-Forwarded-For 中对应层代理记录的地址确定客户端IP（登录限流使用），
+    # 为 0 时忽略该请求头，客户端无法通过伪造请求头绕过按 IP 的限流
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+
+    # 密码哈希配置（werkzeug 方法字符串，如 scrypt:32768:8:1 或 pbkdf2:sha256:600000）
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    # 每个工作进程的哈希进程数，0 表示在当前进程内同步计算
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 8))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    # spawn / forkserver 会重新导入 __main__，仅在入口脚本有 __main__ 保护时使用
+    PASSWORD_HASH_MP_CONTEXT = os.environ.get('PASSWORD_HASH_MP_CONTEXT', 'fork')
+
+    # 登录限流配置（'次数/秒数'，按 IP 与用户名分别计数，成功的登录不计入；sqlite 后端可跨工作进程共享）
+    LOGIN_RATE_LIMIT_ENABLED = strtobool(os.environ.get('LOGIN_RATE_LIMIT_ENABLED'), True)
+    LOGIN_RATE_LIMIT_IP = os.environ.get('LOGIN_RATE_LIMIT_IP', '30/60')
+    LOGIN_RATE_LIMIT_USERNAME = os.environ.get('LOGIN_RATE_LIMIT_USERNAME', '10/60')
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_SQLITE_PATH = os.environ.get('RATE_LIMIT_SQLITE_PATH')
+
+    # 响应缓存配置（用户组、成员列表与未分配用户；memory 为进程内 LRU，sqlite 后端跨工作进程共享）
+    RESPONSE_CACHE_ENABLED = strtobool(os.environ.get('RESPONSE_CACHE_ENABLED'), True)
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_SQLITE_PATH = os.environ.get('RESPONSE_CACHE_SQLITE_PATH')
+    RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+    # 缓存项的最长存活时间（秒），限制 memory 后端在多进程下以及并发回填时的陈旧时间
+    RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 60))
+
+    # 请求指标配置（各工作进程写入 METRICS_DIR 下的内存映射文件，/metrics 汇总导出）
+    METRICS_ENABLED = strtobool(os.environ.get('METRICS_ENABLED'), True)
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_BUCKETS = os.environ.get('METRICS_BUCKETS')
+    METRICS_MAX_SERIES = int(os.environ.get('METRICS_MAX_SERIES', 1024))
+    # 未设置令牌时 /metrics 只允许本机直接访问（不经反向代理）
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # SQL 统计配置（每个请求的查询次数与数据库耗时、N+1 警告与慢查询日志）
+    SQL_STATS_ENABLED = strtobool(os.environ.get('SQL_STATS_ENABLED'), True)
+    SQL_STATS_HEADERS = strtobool(os.environ.get('SQL_STATS_HEADERS'), True)
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 200))
+    SQL_SLOW_QUERY_EXPLAIN = strtobool(os.environ.get('SQL_SLOW_QUERY_EXPLAIN'), True)
 
     # 日志配置
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -33,21 +116,64 @@ class Config:
     LOG_DIAGNOSE = strtobool(os.environ.get('LOG_DIAGNOSE'), False)
     LOG_PATH = os.environ.get('LOG_PATH')
     LOG_DIR = os.environ.get('LOG_DIR')
+    # 请求与用户行为日志先写入每个工作进程的环形缓冲区，由后台线程批量输出
+    LOG_ENQUEUE = strtobool(os.environ.get('LOG_ENQUEUE'), False)
+    LOG_PIPELINE_ENABLED = strtobool(os.environ.get('LOG_PIPELINE_ENABLED'), True)
+    LOG_BUFFER_SIZE = int(os.environ.get('LOG_BUFFER_SIZE', 10000))
+    LOG_FLUSH_BATCH = int(os.environ.get('LOG_FLUSH_BATCH', 500))
+    LOG_FLUSH_INTERVAL = float(os.environ.get('LOG_FLUSH_INTERVAL', 0.5))
+    LOG_PIPELINE_STATS_INTERVAL = int(os.environ.get('LOG_PIPELINE_STATS_INTERVAL', 60))
+    # 按模块调整的日志级别保存在共享文件中（默认 instance/log_levels.json），运行时修改无需重启
+    LOG_LEVELS_PATH = os.environ.get('LOG_LEVELS_PATH')
+    LOG_LEVELS_RELOAD_INTERVAL = float(os.environ.get('LOG_LEVELS_RELOAD_INTERVAL', 2))
+    # 请求日志采样：默认比例与按端点的比例（'endpoint=比例,...'），以及从不记录的端点
+    LOG_REQUEST_SAMPLE_RATE = float(os.environ.get('LOG_REQUEST_SAMPLE_RATE', 1.0))
+    LOG_REQUEST_SAMPLING = os.environ.get('LOG_REQUEST_SAMPLING', '')
+    LOG_REQUEST_EXCLUDE = os.environ.get('LOG_REQUEST_EXCLUDE', 'static,metrics')
+    # 可选的 JSON Lines 日志（默认 <日志目录>/app.jsonl），附带按时间的稀疏索引，供 query_logs.py 查询
+    LOG_JSON_ENABLED = strtobool(os.environ.get('LOG_JSON_ENABLED'), False)
+    LOG_JSON_PATH = os.environ.get('LOG_JSON_PATH')
+    LOG_JSON_ROTATION_BYTES = int(os.environ.get('LOG_JSON_ROTATION_BYTES', 20 * 1024 * 1024))
+    LOG_JSON_RETENTION = int(os.environ.get('LOG_JSON_RETENTION', 14))
+    LOG_JSON_INDEX_INTERVAL = int(os.environ.get('LOG_JSON_INDEX_INTERVAL', 64 * 1024))
 
 
 class DevelopmentConfig(Config):
     DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('SQLALCHEMY_POOL_SIZE', 2)),
+        'max_overflow': int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW', 2)),
+        'pool_timeout': float(os.environ.get('SQLALCHEMY_POOL_TIMEOUT', 10)),
+    }
 
 
 class ProductionConfig(Config):
     DEBUG = False
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'sqlite')
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'sqlite')
+    # 连接池与 gthread 线程数匹配；溢出连接很快被回收，避免持有过多 SQLite 文件句柄
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('SQLALCHEMY_POOL_SIZE', 8)),
+        'max_overflow': int(os.environ.get('SQLALCHEMY_MAX_OVERFLOW', 8)),
+        'pool_timeout': float(os.environ.get('SQLALCHEMY_POOL_TIMEOUT', 5)),
+    }
+    # 生产环境不在响应头中暴露 SQL 统计
+    SQL_STATS_HEADERS = strtobool(os.environ.get('SQL_STATS_HEADERS'), False)
     # TODO: 添加生产环境特定配置
 
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}
+    SQLITE_MAINTENANCE_INTERVAL = 0
     WTF_CSRF_ENABLED = False
+    # 测试中使用低成本哈希以加快用例
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
+    LOGIN_RATE_LIMIT_ENABLED = False
+    LOG_PIPELINE_ENABLED = False
 
 
 config = {
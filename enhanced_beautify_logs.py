@@ -1,113 +1,70 @@
-import re
-from datetime import datetime
-from colorama import Fore, Style, init
-
-# 初始化colorama
-init(autoreset=True)
-
-def parse_log_line(line):
-    """解析单行日志"""
-    # 匹配时间戳、日志级别、模块和消息
-    pattern = r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3}) \| (\w+) *\| ([^:]+:\d+) - (.*)'
-    match = re.match(pattern, line)
-    
-    if match:
-        timestamp, level, module, message = match.groups()
-        return {
-            'timestamp': timestamp,
-            'level': level,
-            'module': module,
-            'message': message
-        }
-    else:
-        # 如果不匹配常规格式，返回原始行
-        return {'raw': line}
-
-def colorize_level(level):
-    """根据日志级别返回带颜色的字符串"""
-    colors = {
-        'INFO': Fore.GREEN,
-        'WARNING': Fore.YELLOW,
-        'ERROR': Fore.RED,
-        'DEBUG': Fore.CYAN,
-        'CRITICAL': Fore.MAGENTA,
-        'SUCCESS': Fore.GREEN
-    }
-    return colors.get(level, '') + level + Style.RESET_ALL
-
-def beautify_logs(input_text):
-    """美化日志文本"""
-    lines = input_text.strip().split('\n')
-    formatted_lines = []
-    
-    for line in lines:
-        # 移除ANSI转义序列
-        line = re.sub(r'\x1b\[[0-9;]*m', '', line)
-        parsed = parse_log_line(line)
-        
-        if 'raw' in parsed:
-            formatted_lines.append(parsed['raw'])
-        else:
-            # 格式化标准日志行
-            timestamp = parsed['timestamp']
-            level = colorize_level(parsed['level'])
-            module = Fore.BLUE + parsed['module'] + Style.RESET_ALL
-            message = parsed['message']
-            
-            formatted_line = f"[{Fore.CYAN}{timestamp}{Style.RESET_ALL}] {level:8} | {module:<30} | {message}"
-            formatted_lines.append(formatted_line)
-    
-    return '\n'.join(formatted_lines)
+import argparse
+import sys
+
+from beautify_logs import (
+    ANSI_PATTERN,
+    follow,
+    iter_beautified,
+    iter_log_files,
+)
+
+
+def _iter_lines(log_content):
+    """兼容传入整段文本或逐行可迭代对象"""
+    if isinstance(log_content, str):
+        return iter(log_content.strip().split('\n'))
+    return log_content
+
+
+def iter_logs_by_level(log_content, level):
+    """根据日志级别过滤日志，逐行返回匹配的原始行"""
+    marker = f"| {level} "
+    for line in _iter_lines(log_content):
+        # 移除ANSI转义序列后检查日志级别
+        if marker in ANSI_PATTERN.sub('', line):
+            yield line
+
+
+def iter_logs_by_module(log_content, module):
+    """根据模块过滤日志，逐行返回匹配的原始行"""
+    for line in _iter_lines(log_content):
+        # 移除ANSI转义序列后检查模块
+        if module in ANSI_PATTERN.sub('', line):
+            yield line
+
 
 def filter_logs_by_level(log_content, level):
     """根据日志级别过滤日志"""
-    lines = log_content.strip().split('\n')
-    filtered_lines = []
-    
-    for line in lines:
-        # 移除ANSI转义序列后检查日志级别
-        clean_line = re.sub(r'\x1b\[[0-9;]*m', '', line)
-        if f"| {level} " in clean_line:
-            filtered_lines.append(line)
-    
-    return '\n'.join(filtered_lines)
+    return '\n'.join(iter_logs_by_level(log_content, level))
+
 
 def filter_logs_by_module(log_content, module):
     """根据模块过滤日志"""
-    lines = log_content.strip().split('\n')
-    filtered_lines = []
-    
-    for line in lines:
-        # 移除ANSI转义序列后检查模块
-        clean_line = re.sub(r'\x1b\[[0-9;]*m', '', line)
-        if module in clean_line:
-            filtered_lines.append(line)
-    
-    return '\n'.join(filtered_lines)
+    return '\n'.join(iter_logs_by_module(log_content, module))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='流式美化日志，支持轮转文件与持续追踪')
+    parser.add_argument('--file', default='instance/logs/app.log', help='当前日志文件')
+    parser.add_argument('--level', help='只显示该级别的日志，例如 WARNING')
+    parser.add_argument('--module', help='只显示模块名包含该字符串的日志')
+    parser.add_argument('--no-rotated', action='store_true', help='不读取轮转与压缩的历史文件')
+    parser.add_argument('-f', '--follow', action='store_true', help='输出现有内容后持续追踪新日志')
+    args = parser.parse_args(argv)
+
+    # 追踪模式下当前文件由 follow() 从头读取并接着等待新内容，读完现有内容与开始追踪之间不留空隙
+    lines = iter_log_files(args.file, include_rotated=not args.no_rotated, include_current=not args.follow)
+    try:
+        for formatted_line in iter_beautified(lines, level=args.level, module=args.module):
+            print(formatted_line, flush=args.follow)
+        if args.follow:
+            tail = follow(args.file, from_start=True)
+            for formatted_line in iter_beautified(tail, level=args.level, module=args.module):
+                print(formatted_line, flush=True)
+    except (BrokenPipeError, KeyboardInterrupt):
+        sys.stderr.close()
+    return 0
+
 
 if __name__ == "__main__":
-    # 读取日志文件
-    with open('instance/logs/app.log', 'r', encoding='utf-8') as f:
-        log_content = f.read()
-    
-    # 美化日志
-    beautified = beautify_logs(log_content)
-    
-    # 打印美化后的日志
-    print("=== 美化后的日志 ===")
-    print(beautified)
-    
-    # 示例：过滤INFO级别的日志
-    print("\n=== INFO级别日志 ===")
-    info_logs = filter_logs_by_level(log_content, 'INFO')
-    print(beautify_logs(info_logs))
-    
-    # 示例：过滤WARNING级别的日志
-    print("\n=== WARNING级别日志 ===")
-    warning_logs = filter_logs_by_level(log_content, 'WARNING')
-    print(beautify_logs(warning_logs))
-    
-    # 示例：过滤特定模块的日志
-    print("\n=== app.utils.request_logger模块日志 ===")
-    module_logs = filter_logs_by_module(log_content, 'app.utils.request_logger')
-    print(beautify_logs(module_logs))
\ No newline at end of file
+    sys.exit(main())
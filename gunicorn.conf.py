@@ -0,0 +1,139 @@
+"""gunicorn 配置，所有参数都可以通过环境变量覆盖
+
+    gunicorn --config gunicorn.conf.py run:app
+
+WORKERS                         工作进程数，默认按可用 CPU 数计算
+GUNICORN_WORKER_CLASS           sync、gthread（默认）、gevent 或 uvicorn.workers.UvicornWorker
+GUNICORN_THREADS                gthread 每个工作进程的线程数，默认与 SQLALCHEMY_POOL_SIZE 相同
+GUNICORN_WORKER_CONNECTIONS     gevent 每个工作进程的最大并发连接数
+GUNICORN_PRELOAD                在主进程中加载应用后再 fork，工作进程共享只读内存页（默认开启）
+GUNICORN_MAX_REQUESTS           处理这么多请求后回收工作进程，0 表示不回收
+GUNICORN_MAX_REQUESTS_JITTER    回收阈值的随机抖动，避免所有工作进程同时重启
+"""
+import gc
+import os
+import time
+
+from config import strtobool
+
+
+def _cpu_count() -> int:
+    """当前进程可用的 CPU 数，考虑 CPU 亲和性与 cgroup v2 的 CPU 配额（容器限制）"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            count = min(count, max(1, -(-int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+# 服务配置
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+# 异步工作进程单进程即可处理大量连接，按 CPU 数启动；同步与线程模型按 2 * CPU + 1
+if worker_class in ('gevent', 'uvicorn.workers.UvicornWorker'):
+    workers = int(os.environ.get('WORKERS') or _cpu_count())
+else:
+    workers = int(os.environ.get('WORKERS') or 2 * _cpu_count() + 1)
+# 线程数与连接池大小一致，线程不会因等待连接而阻塞
+threads = int(os.environ.get('GUNICORN_THREADS') or os.environ.get('SQLALCHEMY_POOL_SIZE', 8))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# 预加载与工作进程回收配置
+preload_app = strtobool(os.environ.get('GUNICORN_PRELOAD'), True)
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER') or max_requests // 10)
+
+# 日志配置（应用日志由 loguru 接管，见 app/utils/logging.py）
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = os.environ.get('GUNICORN_ERROR_LOG', '-')
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+if worker_class == 'gevent':
+    # 必须在加载应用之前打补丁，否则 preload 时创建的锁与线程不是协作式的
+    from gevent import monkey
+    monkey.patch_all()
+
+if preload_app:
+    # 加载应用期间关闭自动回收，避免回收产生的空洞在 fork 后被写入而复制页；
+    # 加载完成后冻结所有对象再恢复回收，之后的回收不再修改这些对象的引用计数头，内存页保持共享
+    gc.disable()
+
+
+def _flask_app(server):
+    """preload 时主进程中已加载的 Flask 应用（ASGI 入口返回的是包装对象）"""
+    from flask import Flask
+
+    application = server.app.wsgi()
+    if not isinstance(application, Flask):
+        application = getattr(application, 'app', None)
+    return application if isinstance(application, Flask) else None
+
+
+def _dispose_engines(server, close: bool) -> None:
+    from app.extensions import db
+
+    app = _flask_app(server)
+    if app is None:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=close)
+
+
+def _stop_maintenance(server) -> None:
+    from app.extensions import sqlite_tuning
+
+    if _flask_app(server) is not None:
+        sqlite_tuning.stop_maintenance()
+
+
+def when_ready(server):
+    if preload_app:
+        # 主进程加载应用时（初始化检查）打开的连接与启动的维护线程不带入工作进程，
+        # 工作进程建立第一个连接时各自启动维护线程
+        _dispose_engines(server, close=True)
+        _stop_maintenance(server)
+        gc.freeze()
+        gc.enable()
+        server.log.info('应用已预加载，主进程内存: %s', _format_memory(os.getpid()))
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        # 冻结主进程在上次 fork 之后新建的对象（重启工作进程时）
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # 连接池中的连接属于主进程，子进程只丢弃引用，不关闭父进程的连接
+        _dispose_engines(server, close=False)
+    worker.started_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    worker.log.info('工作进程 %s 已就绪，内存: %s', worker.pid, _format_memory(worker.pid))
+
+
+def worker_exit(server, worker):
+    uptime = time.monotonic() - getattr(worker, 'started_at', time.monotonic())
+    server.log.info(
+        '工作进程 %s 退出（已处理 %s 个请求，运行 %.0f 秒），内存: %s',
+        worker.pid, worker.nr, uptime, _format_memory(worker.pid),
+    )
+
+
+def _format_memory(pid: int) -> str:
+    from app.utils.process_memory import format_usage, memory_usage
+
+    return format_usage(memory_usage(pid))
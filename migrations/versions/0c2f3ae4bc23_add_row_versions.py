@@ -0,0 +1,46 @@
+"""add row versions and timestamps for conditional GETs
+
+Revision ID: 0c2f3ae4bc23
+Revises: bb6c37eca1fd
+Create Date: 2026-10-18 14:30:04.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c2f3ae4bc23'
+down_revision = 'bb6c37eca1fd'
+branch_labels = None
+depends_on = None
+
+NEW_COLUMNS = {
+    'users': [
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('version_id', sa.Integer(), server_default='1', nullable=False),
+    ],
+    'groups': [
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('version_id', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('members_version', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('members_updated_at', sa.DateTime(), nullable=True),
+    ],
+}
+
+
+def upgrade():
+    # 引入迁移之前由 db.create_all() 建立并补齐的数据库可能已有部分列
+    inspector = sa.inspect(op.get_bind())
+    for table, columns in NEW_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column in columns:
+            if column.name not in existing:
+                op.add_column(table, column)
+
+
+def downgrade():
+    for table, columns in NEW_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in reversed(columns):
+                batch_op.drop_column(column.name)
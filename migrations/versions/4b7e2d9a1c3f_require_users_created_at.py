@@ -0,0 +1,41 @@
+"""backfill users.created_at and make it NOT NULL
+
+Revision ID: 4b7e2d9a1c3f
+Revises: e5a1c9d24f70
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e2d9a1c3f'
+down_revision = 'e5a1c9d24f70'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 列表分页以 (created_at, id) 为游标，空值无法编码也无法参与比较。
+    # 引入该列之前的旧行排在最前：取已有的最早创建时间，全表为空时使用更新时间或当前时间
+    op.execute(
+        'UPDATE users SET created_at = COALESCE('
+        '(SELECT MIN(created_at) FROM users), updated_at, CURRENT_TIMESTAMP) '
+        'WHERE created_at IS NULL'
+    )
+    if op.get_bind().dialect.name == 'sqlite':
+        # SQLite 按字符串比较时间，SQLAlchemy 写入与绑定的格式为 'YYYY-MM-DD HH:MM:SS.ffffff'；
+        # 旧版本或手工写入的 'YYYY-MM-DD HH:MM:SS' 会与同一秒的游标比较出错，统一为相同格式
+        op.execute(
+            "UPDATE users SET created_at = strftime('%Y-%m-%d %H:%M:%f', created_at) || '000' "
+            "WHERE length(created_at) <> 26"
+        )
+    # SQLite 重建 users 表会删除搜索触发器与 NOCASE 索引，迁移完成后由 ensure_search_index 重新创建
+    with op.batch_alter_table('users', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users', table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,27 @@
+"""add users (created_at, id) index for keyset pagination
+
+Revision ID: 7b688fb0900a
+Revises: 0d83e6563bcd
+Create Date: 2026-10-18 14:30:01.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b688fb0900a'
+down_revision = '0d83e6563bcd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 引入迁移之前由 db.create_all() 建立并补齐的数据库可能已有该索引
+    indexes = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('users')}
+    if 'ix_users_created_at_id' not in indexes:
+        op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,33 @@
+"""add schema_state version marker
+
+Revision ID: 83c651758afa
+Revises: 0c2f3ae4bc23
+Create Date: 2026-10-18 14:30:05.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '83c651758afa'
+down_revision = '0c2f3ae4bc23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('schema_state'):
+        return
+    op.create_table(
+        'schema_state',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('schema_fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('seed_fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade():
+    op.drop_table('schema_state')
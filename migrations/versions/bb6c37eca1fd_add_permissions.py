@@ -0,0 +1,44 @@
+"""add permissions and group_permissions
+
+Revision ID: bb6c37eca1fd
+Revises: ecc67dd4fd31
+Create Date: 2026-10-18 14:30:03.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bb6c37eca1fd'
+down_revision = 'ecc67dd4fd31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 默认权限与授权由应用启动时的 ensure_seed_data 写入（init-db 亦可）
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('permissions'):
+        op.create_table(
+            'permissions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('code', sa.String(length=64), nullable=False),
+            sa.Column('description', sa.String(length=256), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('code'),
+        )
+    if not inspector.has_table('group_permissions'):
+        op.create_table(
+            'group_permissions',
+            sa.Column('group_id', sa.Integer(), nullable=False),
+            sa.Column('permission_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['group_id'], ['groups.id'], ondelete='CASCADE'),
+            sa.ForeignKeyConstraint(['permission_id'], ['permissions.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('group_id', 'permission_id'),
+        )
+
+
+def downgrade():
+    op.drop_table('group_permissions')
+    op.drop_table('permissions')
@@ -0,0 +1,47 @@
+"""never reuse user and group ids on SQLite
+
+Revision ID: e5a1c9d24f70
+Revises: 83c651758afa
+Create Date: 2026-10-18 16:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1c9d24f70'
+down_revision = '83c651758afa'
+branch_labels = None
+depends_on = None
+
+# 删除最大 id 的行后 SQLite 默认会把该 rowid 分配给下一行，新行的版本号从 1 开始，
+# 可能与已删除行的 ETag 相同；AUTOINCREMENT 保证 id 单调递增、永不复用
+TABLES = ('groups', 'users')
+
+
+def _uses_autoincrement(bind, table):
+    sql = bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table},
+    ).scalar()
+    return 'AUTOINCREMENT' in (sql or '').upper()
+
+
+def _recreate(autoincrement):
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        if _uses_autoincrement(bind, table) == autoincrement:
+            continue
+        # 重建表会删除 users 上的搜索触发器与 NOCASE 索引，迁移完成后由 ensure_search_index 重新创建
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+
+
+def upgrade():
+    _recreate(True)
+
+
+def downgrade():
+    _recreate(False)
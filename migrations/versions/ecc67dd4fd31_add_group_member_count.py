@@ -0,0 +1,33 @@
+"""add groups.member_count
+
+Revision ID: ecc67dd4fd31
+Revises: 7b688fb0900a
+Create Date: 2026-10-18 14:30:02.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ecc67dd4fd31'
+down_revision = '7b688fb0900a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # 引入迁移之前由 db.create_all() 建立并补齐的数据库可能已有该列
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('groups')}
+    if 'member_count' in columns:
+        return
+    op.add_column('groups', sa.Column('member_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        'UPDATE groups SET member_count = '
+        '(SELECT COUNT(*) FROM users WHERE users.group_id = groups.id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('groups') as batch_op:
+        batch_op.drop_column('member_count')
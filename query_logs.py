@@ -0,0 +1,76 @@
+import argparse
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+
+from app.utils.log_store import query
+
+
+def parse_time(value):
+    """解析时间参数，支持 'YYYY-MM-DD HH:MM[:SS]'、'HH:MM[:SS]'（当天）与 Unix 时间戳"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    for fmt in ('%H:%M:%S', '%H:%M'):
+        try:
+            parsed = datetime.strptime(value, fmt).time()
+            return datetime.combine(date.today(), parsed).timestamp()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f'无法解析的时间: {value}')
+
+
+def format_record(record):
+    """格式化为与文本日志一致的单行输出"""
+    return (
+        f"{record['time'][:23].replace('T', ' ')} | {record['level']:<8} | "
+        f"{record['name']}:{record['function']}:{record['line']} - {record['message']}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='按时间窗口查询 JSON Lines 日志（需启用 LOG_JSON_ENABLED）')
+    parser.add_argument('--file', default='instance/logs/app.jsonl', help='当前 JSON 日志文件，轮转文件会一并查询')
+    parser.add_argument('--since', type=parse_time, help="起始时间，例如 '14:02' 或 '2024-05-01 14:02'")
+    parser.add_argument('--until', type=parse_time, help='结束时间')
+    parser.add_argument('--level', help='最低日志级别，例如 WARNING')
+    parser.add_argument('--module', help='模块名前缀，例如 app.services')
+    parser.add_argument('--user', help='用户名')
+    parser.add_argument('--ip', help='客户端IP')
+    parser.add_argument('--slack', type=float, default=5.0, help='多进程写入时时间戳可能交错的秒数')
+    parser.add_argument('--limit', type=int, help='最多输出的条数')
+    parser.add_argument('--json', action='store_true', help='输出原始 JSON 行')
+    args = parser.parse_args(argv)
+
+    path = Path(args.file)
+    if not path.exists() and not any(path.parent.glob(f'{path.stem}.*{path.suffix}')):
+        parser.error(f'日志文件不存在: {path}')
+
+    count = 0
+    records = query(path, since=args.since, until=args.until, level=args.level,
+                    module=args.module, user=args.user, ip=args.ip, slack=args.slack)
+    try:
+        for record in records:
+            if args.json:
+                print(json.dumps(record, ensure_ascii=False))
+            else:
+                print(format_record(record))
+            count += 1
+            if args.limit and count >= args.limit:
+                break
+    except BrokenPipeError:
+        sys.stderr.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
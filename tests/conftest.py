@@ -0,0 +1,65 @@
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+from flask import g, request_started
+
+# 配置类在导入时读取环境变量，运行时文件（日志、指标、共享版本号表等）统一写入临时目录
+_RUNTIME_DIR = Path(tempfile.mkdtemp(prefix='demo-flask-tests-'))
+os.environ.update({
+    'LOG_DIR': str(_RUNTIME_DIR / 'logs'),
+    'METRICS_DIR': str(_RUNTIME_DIR / 'metrics'),
+    'PRINCIPAL_VERSION_PATH': str(_RUNTIME_DIR / 'principal_versions.bin'),
+    'LOG_LEVELS_PATH': str(_RUNTIME_DIR / 'log_levels.json'),
+    'RATE_LIMIT_SQLITE_PATH': str(_RUNTIME_DIR / 'ratelimit.db'),
+    'RESPONSE_CACHE_SQLITE_PATH': str(_RUNTIME_DIR / 'response_cache.db'),
+})
+
+from app import create_app  # noqa: E402
+from app.extensions import db, principal_cache  # noqa: E402
+from app.models.group import Group  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def _reset_request_globals(sender, **extra):
+    g.__dict__.clear()
+
+
+@pytest.fixture
+def app():
+    """每个用例使用独立的内存数据库，包含默认用户组、权限与 admin / demo 账号"""
+    app = create_app('testing')
+    principal_cache.clear()
+    # 请求会复用用例持有的应用上下文，每个请求开始时清空 g（如 Flask-Login 缓存的当前用户）
+    request_started.connect(_reset_request_globals, app)
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_client(client):
+    """以超级管理员 admin 登录的测试客户端"""
+    response = client.post('/auth/login', data={'username': 'admin', 'password': 'admin123'})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def make_user(app):
+    """创建用户的工厂，group 为用户组名称"""
+    def factory(username, email=None, group=None, is_active=True, password='secret123'):
+        user = User(username=username, email=email, password=password, is_active=is_active)
+        if group is not None:
+            user.group = Group.query.filter_by(name=group).one()
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return factory
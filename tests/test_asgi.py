@@ -0,0 +1,173 @@
+import asyncio
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode
+
+import pytest
+from flask import request
+
+from app import create_app
+from app.asgi import AsyncReadApp, wsgi_environ
+from app.extensions import async_db, db
+from app.services import async_reads
+from config import TestingConfig
+
+
+@pytest.fixture
+def asgi_app(tmp_path, monkeypatch):
+    """使用文件型数据库的 ASGI 应用，同步与异步引擎读写同一个库"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+    app = create_app('testing')
+    yield AsyncReadApp(app)
+    asyncio.run(async_db.dispose())
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+async def _call(app, scope, messages=()):
+    incoming = list(messages) or [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def _request(app, method, path, headers=(), body=b''):
+    """发送一个 HTTP 请求，返回 (状态码, 小写响应头字典, 响应体)"""
+    if body:
+        headers = [*headers, ('Content-Length', str(len(body)))]
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'root_path': '', 'query_string': b'', 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    sent = asyncio.run(_call(app, scope, messages))
+    start = sent[0]
+    response_headers = {}
+    for name, value in start['headers']:
+        response_headers.setdefault(name.decode('latin-1'), []).append(value.decode('latin-1'))
+    body = b''.join(message.get('body', b'') for message in sent[1:])
+    return start['status'], response_headers, body
+
+
+def _login(app):
+    status, headers, _ = _request(
+        app, 'POST', '/auth/login',
+        headers=[('Content-Type', 'application/x-www-form-urlencoded')],
+        body=urlencode({'username': 'admin', 'password': 'admin123'}).encode(),
+    )
+    assert status == 302
+    cookie = SimpleCookie()
+    for value in headers['set-cookie']:
+        cookie.load(value)
+    return '; '.join(f'{name}={morsel.value}' for name, morsel in cookie.items())
+
+
+def test_get_round_trip_through_async_view(asgi_app, monkeypatch):
+    calls = []
+    get_user_detail = async_reads.get_user_detail
+
+    async def spy(user_id):
+        calls.append(user_id)
+        return await get_user_detail(user_id)
+    monkeypatch.setattr(async_reads, 'get_user_detail', spy)
+    cookie = _login(asgi_app)
+
+    status, headers, body = _request(asgi_app, 'GET', '/users/1/', headers=[('Cookie', cookie)])
+
+    assert status == 200
+    assert calls == [1]
+    assert b'"username":"admin"' in body.replace(b' ', b'')
+    etag = headers['etag'][0]
+
+    status, headers, body = _request(
+        asgi_app, 'GET', '/users/1/', headers=[('Cookie', cookie), ('If-None-Match', etag)],
+    )
+
+    assert status == 304
+    assert body == b''
+    assert headers['etag'] == [etag]
+    # 未修改时只查询校验值，不再加载用户详情
+    assert calls == [1]
+
+
+def test_async_view_requires_login(asgi_app):
+    status, headers, _ = _request(asgi_app, 'GET', '/users/1/')
+
+    assert status == 302
+    assert '/auth/login' in headers['location'][0]
+
+
+@pytest.fixture
+def proxied_asgi_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_COUNT', 1)
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+    app = create_app('testing')
+    yield AsyncReadApp(app)
+    asyncio.run(async_db.dispose())
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_async_path_applies_trusted_proxy_fix(proxied_asgi_app, monkeypatch):
+    addresses = []
+    get_user_detail = async_reads.get_user_detail
+
+    async def spy(user_id):
+        addresses.append(request.remote_addr)
+        return await get_user_detail(user_id)
+    monkeypatch.setattr(async_reads, 'get_user_detail', spy)
+    cookie = _login(proxied_asgi_app)
+
+    status, _, _ = _request(proxied_asgi_app, 'GET', '/users/1/', headers=[
+        ('Cookie', cookie), ('X-Forwarded-For', '198.51.100.1, 203.0.113.7'),
+    ])
+
+    assert status == 200
+    # 与同步模式一致：只采用可信代理追加的最后一项
+    assert addresses == ['203.0.113.7']
+
+
+def test_lifespan_shutdown_disposes_engines(asgi_app):
+    async def run():
+        async_db.engine()
+        scope = {'type': 'lifespan', 'asgi': {'version': '3.0'}}
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        return await _call(asgi_app, scope, messages)
+
+    sent = asyncio.run(run())
+
+    assert [message['type'] for message in sent] == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    assert async_db._engines == {}
+
+
+def test_wsgi_environ_follows_pep_3333():
+    environ = wsgi_environ({
+        'type': 'http', 'method': 'GET', 'path': '/app/users/é/', 'root_path': '/app',
+        'query_string': b'page=2', 'server': ('example.com', 8080), 'client': ('10.0.0.1', 1234),
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'accept', b'text/html'),
+            (b'accept', b'application/json'),
+            (b'x-request-id', b'abc'),
+        ],
+    })
+
+    assert environ['SCRIPT_NAME'] == '/app'
+    assert environ['PATH_INFO'] == '/users/é/'.encode('utf-8').decode('latin-1')
+    assert environ['QUERY_STRING'] == 'page=2'
+    assert (environ['SERVER_NAME'], environ['SERVER_PORT']) == ('example.com', '8080')
+    assert (environ['REMOTE_ADDR'], environ['REMOTE_PORT']) == ('10.0.0.1', '1234')
+    assert environ['CONTENT_TYPE'] == 'application/json'
+    assert environ['HTTP_ACCEPT'] == 'text/html,application/json'
+    assert environ['HTTP_X_REQUEST_ID'] == 'abc'
+    assert environ['wsgi.input'].read() == b''
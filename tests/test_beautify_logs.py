@@ -0,0 +1,87 @@
+import gzip
+import os
+from itertools import islice
+
+import enhanced_beautify_logs
+from beautify_logs import ANSI_PATTERN, follow, iter_beautified, iter_log_files
+from enhanced_beautify_logs import filter_logs_by_level, iter_logs_by_module
+
+LINES = [
+    '2024-05-01 14:02:03.100 | INFO     | app.services.user_service:create_user:42 - 创建用户 kate',
+    '2024-05-01 14:02:04.200 | ERROR    | app.controllers.user:update_user:88 - 更新失败',
+    'Traceback (most recent call last):',
+    '  File "app/controllers/user.py", line 88',
+    '2024-05-01 14:02:05.300 | INFO     | app.controllers.auth:login:30 - 登录成功',
+]
+
+
+def _plain(lines):
+    return [ANSI_PATTERN.sub('', line) for line in lines]
+
+
+def test_filters_keep_tracebacks_with_their_record():
+    output = _plain(iter_beautified(LINES, level='ERROR'))
+
+    assert len(output) == 3
+    assert 'app.controllers.user:update_user:88' in output[0] and '更新失败' in output[0]
+    assert output[1:] == LINES[2:4]
+    assert len(list(iter_beautified(LINES, module='app.services'))) == 1
+
+
+def test_string_filters_return_joined_text():
+    assert filter_logs_by_level('\n'.join(LINES), 'ERROR') == LINES[1]
+    assert list(iter_logs_by_module(iter(LINES), 'controllers.auth')) == [LINES[4]]
+
+
+def test_rotated_and_compressed_files_are_read_in_order(tmp_path):
+    path = tmp_path / 'app.log'
+    oldest = tmp_path / 'app.2024-05-01_14-00-00_000000.log.gz'
+    older = tmp_path / 'app.2024-05-01_14-01-00_000000.log'
+    with gzip.open(oldest, 'wt', encoding='utf-8') as handle:
+        handle.write(LINES[0] + '\n')
+    older.write_text(LINES[1] + '\n', encoding='utf-8')
+    path.write_text(LINES[4] + '\n', encoding='utf-8')
+    for mtime, item in enumerate((oldest, older, path), start=1):
+        os.utime(item, (mtime, mtime))
+
+    assert [line.rstrip('\n') for line in iter_log_files(path)] == [LINES[0], LINES[1], LINES[4]]
+    assert [line.rstrip('\n') for line in iter_log_files(path, include_rotated=False)] == [LINES[4]]
+
+
+def test_follow_switches_to_the_new_file_after_rotation(tmp_path):
+    path = tmp_path / 'app.log'
+    path.write_text('first\n', encoding='utf-8')
+    lines = follow(path, interval=0.01, from_start=True)
+    assert next(lines) == 'first\n'
+
+    rotated = tmp_path / 'app.2024-05-01.log'
+    path.rename(rotated)
+    with open(rotated, 'a', encoding='utf-8') as handle:
+        handle.write('written before rotation\n')
+    path.write_text('after rotation\n', encoding='utf-8')
+
+    assert next(lines) == 'written before rotation\n'
+    assert next(lines) == 'after rotation\n'
+
+    # loguru 以截断方式轮转时同样从新文件开头继续
+    path.write_text('truncated\n', encoding='utf-8')
+    assert next(lines) == 'truncated\n'
+
+
+def test_follow_mode_keeps_lines_written_after_the_initial_read(tmp_path, monkeypatch, capsys):
+    path = tmp_path / 'app.log'
+    path.write_text(LINES[0] + '\n', encoding='utf-8')
+
+    def bounded_follow(log_path, **kwargs):
+        # 模拟读完现有内容、开始追踪之前写入的日志
+        with open(log_path, 'a', encoding='utf-8') as handle:
+            handle.write(LINES[4] + '\n')
+        yield from islice(follow(log_path, interval=0.01, **kwargs), 2)
+
+    monkeypatch.setattr(enhanced_beautify_logs, 'follow', bounded_follow)
+
+    assert enhanced_beautify_logs.main(['--file', str(path), '--no-rotated', '-f']) == 0
+
+    output = ANSI_PATTERN.sub('', capsys.readouterr().out)
+    assert output.count('创建用户 kate') == 1
+    assert output.count('登录成功') == 1
@@ -0,0 +1,145 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import app as app_module
+from app import create_app
+from app.extensions import db
+from app.models.group import Group
+from app.models.schema_state import SchemaState
+from app.models.user import User
+from app.services.user_search import search_users
+from app.services.user_service import list_users_page
+from app.utils import bootstrap
+from app.utils.bootstrap import INITIAL_REVISION, database_is_current, prepare_database, schema_fingerprint
+from config import TestingConfig
+
+
+@pytest.fixture
+def file_database(tmp_path, monkeypatch):
+    path = tmp_path / 'app.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{path}')
+    return path
+
+
+def _create_app():
+    context = create_app('testing').app_context()
+    context.push()
+    return context
+
+
+def _close(context):
+    db.session.remove()
+    db.engine.dispose()
+    context.pop()
+
+
+def test_new_database_is_marked_current(app):
+    state = db.session.get(SchemaState, SchemaState.SINGLETON_ID)
+
+    assert database_is_current()
+    assert state.schema_fingerprint == schema_fingerprint()
+    assert prepare_database() is None
+
+
+def test_outdated_seed_fingerprint_reapplies_seed_data(app):
+    User.query.filter_by(username='demo').delete()
+    db.session.get(SchemaState, SchemaState.SINGLETON_ID).seed_fingerprint = 'outdated'
+    db.session.commit()
+    assert not database_is_current()
+
+    _, created_users = prepare_database()
+
+    assert created_users == ['demo']
+    assert database_is_current()
+
+
+def test_schema_fingerprint_covers_search_index_ddl(app, monkeypatch):
+    before = schema_fingerprint()
+    monkeypatch.setattr(bootstrap, 'SEARCH_INDEX_DDL', bootstrap.SEARCH_INDEX_DDL + ('SELECT 1',))
+
+    assert schema_fingerprint() != before
+    assert not database_is_current()
+
+
+def test_pending_migration_revision_is_not_current(app):
+    # 只修改数据的迁移修订不改变结构指纹，仍需按 alembic_version 判断
+    db.session.execute(db.text('UPDATE alembic_version SET version_num = :revision'),
+                       {'revision': INITIAL_REVISION})
+    db.session.commit()
+
+    assert not database_is_current()
+
+
+def test_missing_marker_table_is_not_current(app):
+    db.session.execute(db.text('DROP TABLE schema_state'))
+    db.session.commit()
+
+    assert not database_is_current()
+
+
+def test_restart_with_current_database_skips_initialisation(file_database, monkeypatch):
+    _close(_create_app())
+
+    def fail(*args, **kwargs):
+        raise AssertionError('prepare_database should not run')
+
+    monkeypatch.setattr(app_module, 'prepare_database', fail)
+    context = _create_app()
+    try:
+        assert User.query.filter_by(username='admin').count() == 1
+    finally:
+        _close(context)
+
+
+def test_legacy_database_is_stamped_and_migrated(file_database):
+    # 引入迁移之前的数据库：只有初始的 groups / users 表
+    connection = sqlite3.connect(file_database)
+    connection.executescript('''
+        CREATE TABLE groups (id INTEGER PRIMARY KEY, name VARCHAR(64) NOT NULL UNIQUE,
+                             description VARCHAR(256));
+        CREATE TABLE users (id INTEGER PRIMARY KEY, username VARCHAR(64) NOT NULL,
+                            email VARCHAR(120), password_hash VARCHAR(128), is_active BOOLEAN,
+                            created_at DATETIME, group_id INTEGER REFERENCES groups (id));
+        CREATE UNIQUE INDEX ix_users_username ON users (username);
+        CREATE UNIQUE INDEX ix_users_email ON users (email);
+        INSERT INTO groups (id, name) VALUES (1, '超级管理员'), (2, '旧用户组');
+        INSERT INTO users (username, is_active, created_at, group_id)
+        VALUES ('old1', 1, '2024-01-01 00:00:00', 2), ('old2', 1, '2024-01-01 00:00:00', 2),
+               ('old3', 1, NULL, 2);
+    ''')
+    connection.close()
+
+    context = _create_app()
+    try:
+        versions = db.session.execute(db.text('SELECT version_num FROM alembic_version')).scalars().all()
+        assert versions and versions != [INITIAL_REVISION]
+        assert Group.query.filter_by(name='旧用户组').one().member_count == 3
+        assert User.query.filter_by(username='old1').one().version_id == 1
+        assert database_is_current()
+        table_sql = dict(db.session.execute(db.text(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN ('users', 'groups')")).all())
+        assert all('AUTOINCREMENT' in sql for sql in table_sql.values())
+        # 重建 users 表后搜索触发器重新创建，旧数据仍可搜索
+        assert User.query.count() == 5
+        # 缺少创建时间的旧行按最早的创建时间补齐，分页游标可以正常编码
+        assert User.query.filter_by(username='old3').one().created_at == datetime(2024, 1, 1)
+        assert all('NOT NULL' in line for line in table_sql['users'].splitlines() if 'created_at' in line)
+        usernames, cursor = [], None
+        while True:
+            page = list_users_page(cursor, limit=2).data
+            usernames += [user['username'] for user in page['users']]
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        assert usernames[:3] == ['old1', 'old2', 'old3']
+        db.session.add(User(username='newcomer', password='secret123'))
+        db.session.commit()
+        triggers = db.session.execute(db.text(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'users'")).scalars().all()
+        assert len(triggers) == 3
+        assert search_users('ewcome').data['users'][0]['username'] == 'newcomer'
+        assert search_users('ld1').data['users'][0]['username'] == 'old1'
+    finally:
+        _close(context)
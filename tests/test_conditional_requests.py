@@ -0,0 +1,154 @@
+from sqlalchemy import update
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+from app.services.user_service import create_user
+
+
+def _user_id(username):
+    result = create_user({'username': username, 'password': 'secret123',
+                          'group_id': Group.query.filter_by(name=Group.USER).one().id})
+    assert result.success
+    return result.data['id']
+
+
+def _group_id(name=Group.USER):
+    return Group.query.filter_by(name=name).one().id
+
+
+def test_user_detail_sets_validators(auth_client):
+    response = auth_client.get(f'/users/{_user_id("lea")}/')
+
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('"')
+    assert 'Last-Modified' in response.headers
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+
+def test_matching_etag_returns_304_without_body(auth_client):
+    url = f'/users/{_user_id("lea")}/'
+    etag = auth_client.get(url).headers['ETag']
+
+    response = auth_client.get(url, headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_weak_and_wildcard_etags_match(auth_client):
+    url = f'/users/{_user_id("lea")}/'
+    etag = auth_client.get(url).headers['ETag']
+
+    assert auth_client.get(url, headers={'If-None-Match': f'W/{etag}'}).status_code == 304
+    assert auth_client.get(url, headers={'If-None-Match': f'"other", {etag}'}).status_code == 304
+    assert auth_client.get(url, headers={'If-None-Match': '*'}).status_code == 304
+    assert auth_client.get(url, headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_update_changes_user_etag(auth_client):
+    user_id = _user_id('lea')
+    url = f'/users/{user_id}/'
+    etag = auth_client.get(url).headers['ETag']
+
+    auth_client.post(f'/users/{user_id}/update/', json={'email': 'lea@example.com'})
+    response = auth_client.get(url, headers={'If-None-Match': etag})
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['email'] == 'lea@example.com'
+
+
+def test_if_modified_since_is_used_without_if_none_match(auth_client):
+    url = f'/users/{_user_id("lea")}/'
+    last_modified = auth_client.get(url).headers['Last-Modified']
+
+    assert auth_client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert auth_client.get(url, headers={'If-Modified-Since': 'Mon, 01 Jan 2001 00:00:00 GMT'}).status_code == 200
+
+
+def test_conditional_request_for_missing_user_is_404(auth_client):
+    assert auth_client.get('/users/99999/', headers={'If-None-Match': '"x"'}).status_code == 404
+
+
+def test_deleted_user_id_is_not_reused(auth_client):
+    user_id = _user_id('lea')
+    url = f'/users/{user_id}/'
+    etag = auth_client.get(url).headers['ETag']
+    auth_client.post(f'/users/{user_id}/delete/')
+
+    new_id = _user_id('max')
+
+    # 删除最大 id 的用户后，新用户不会复用该 id，旧 ETag 不会对应到新用户
+    assert new_id > user_id
+    assert auth_client.get(url, headers={'If-None-Match': etag}).status_code == 404
+
+
+def test_deleted_group_id_is_not_reused(app):
+    group = Group(name='临时组')
+    db.session.add(group)
+    db.session.commit()
+    group_id = group.id
+    db.session.delete(group)
+    db.session.commit()
+
+    replacement = Group(name='新组')
+    db.session.add(replacement)
+    db.session.commit()
+
+    assert replacement.id > group_id
+
+
+def test_group_etag_changes_when_group_is_renamed(auth_client):
+    url = f'/groups/{_group_id()}/'
+    etag = auth_client.get(url).headers['ETag']
+    assert auth_client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    group = Group.query.filter_by(name=Group.USER).one()
+    group.description = '新的描述'
+    db.session.commit()
+
+    response = auth_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['description'] == '新的描述'
+
+
+def test_member_list_etag_tracks_membership_and_member_fields(auth_client):
+    url = f'/groups/{_group_id()}/members/'
+    user_id = _user_id('lea')
+    etag = auth_client.get(url).headers['ETag']
+    assert auth_client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    auth_client.post(f'/users/{user_id}/update/', json={'email': 'lea@example.com'})
+    response = auth_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    auth_client.post(f'/users/{user_id}/change-group/', json={'group_id': _group_id(Group.ADMIN)})
+    response = auth_client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['members'] == []
+
+
+def test_concurrent_updates_bump_version_without_locking(app):
+    user = db.session.get(User, _user_id('lea'))
+    version = user.version_id
+
+    # 另一个工作进程在此期间修改了同一用户
+    db.session.execute(update(User.__table__).where(User.__table__.c.id == user.id)
+                       .values(version_id=User.__table__.c.version_id + 1))
+    user.email = 'lea@example.com'
+    db.session.commit()
+
+    assert user.version_id == version + 2
+
+
+def test_relationship_only_changes_keep_group_version(app):
+    group = Group.query.filter_by(name=Group.USER).one()
+    version = group.version_id
+
+    group.users.append(User(username='lea', password='secret123'))
+    db.session.commit()
+
+    assert group.version_id == version
@@ -0,0 +1,93 @@
+import gc
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from app import create_app
+from app.asgi import AsyncReadApp
+from app.extensions import db, sqlite_tuning
+from config import TestingConfig
+
+CONF_PATH = Path(__file__).resolve().parent.parent / 'gunicorn.conf.py'
+
+
+def load_conf(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    spec = importlib.util.spec_from_file_location('gunicorn_conf', CONF_PATH)
+    conf = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(conf)
+    return conf
+
+
+@pytest.fixture
+def conf(monkeypatch):
+    """开启 preload 的配置模块；加载时会关闭自动回收，用例结束后恢复"""
+    conf = load_conf(monkeypatch, GUNICORN_PRELOAD='1', GUNICORN_WORKER_CLASS='gthread')
+    yield conf
+    gc.unfreeze()
+    gc.enable()
+
+
+@pytest.fixture
+def preloaded_app(tmp_path, monkeypatch):
+    """主进程中预加载的文件型数据库应用，初始化检查会建立连接并启动维护线程"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+    monkeypatch.setattr(TestingConfig, 'SQLITE_MAINTENANCE_INTERVAL', 3600)
+    app = create_app('testing')
+    yield app
+    sqlite_tuning.stop_maintenance()
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _server(application):
+    messages = []
+    log = SimpleNamespace(info=lambda message, *args: messages.append(message % args))
+    return SimpleNamespace(app=SimpleNamespace(wsgi=lambda: application), log=log, messages=messages)
+
+
+def test_preload_disables_gc_until_ready(conf):
+    assert conf.preload_app is True
+    assert not gc.isenabled()
+
+
+@pytest.mark.parametrize('wrap', [lambda app: app, AsyncReadApp], ids=['wsgi', 'asgi'])
+def test_when_ready_releases_master_resources(conf, preloaded_app, wrap):
+    thread = sqlite_tuning._thread
+    assert thread is not None and thread.is_alive()
+    server = _server(wrap(preloaded_app))
+
+    conf.when_ready(server)
+
+    assert not thread.is_alive()
+    assert sqlite_tuning._thread is None
+    with preloaded_app.app_context():
+        assert db.engine.pool.checkedin() == 0
+    assert gc.isenabled()
+    assert gc.get_freeze_count() > 0
+    assert server.messages[0].startswith('应用已预加载')
+
+
+def test_post_fork_records_worker_start(conf, preloaded_app):
+    worker = SimpleNamespace()
+
+    conf.post_fork(_server(preloaded_app), worker)
+
+    assert worker.started_at > 0
+
+
+def test_worker_counts_follow_the_worker_class(monkeypatch):
+    monkeypatch.delenv('WORKERS', raising=False)
+    threaded = load_conf(monkeypatch, GUNICORN_PRELOAD='0', GUNICORN_WORKER_CLASS='gthread')
+    asynchronous = load_conf(monkeypatch, GUNICORN_PRELOAD='0', GUNICORN_WORKER_CLASS='uvicorn.workers.UvicornWorker')
+    fixed = load_conf(monkeypatch, GUNICORN_PRELOAD='0', WORKERS='3')
+
+    cpus = threaded._cpu_count()
+    assert threaded.workers == 2 * cpus + 1
+    assert asynchronous.workers == cpus
+    assert fixed.workers == 3
+    assert gc.isenabled()
@@ -0,0 +1,134 @@
+import io
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+from app.services.import_service import detect_format, import_users, iter_records
+
+pytestmark = pytest.mark.usefixtures('app')
+
+
+def _import(text, fmt='csv', **kwargs):
+    return import_users(io.StringIO(text), fmt, **kwargs)
+
+
+def _user(username):
+    db.session.expire_all()
+    return User.query.filter_by(username=username).one()
+
+
+@pytest.mark.parametrize('filename, fmt', [
+    ('users.csv', 'csv'), ('users.JSONL', 'jsonl'), ('users.ndjson', 'jsonl'), (None, 'csv'),
+])
+def test_detect_format(filename, fmt):
+    assert detect_format(filename) == fmt
+
+
+def test_jsonl_parse_errors_keep_line_numbers():
+    records = list(iter_records(io.StringIO('{"username": "a"}\n\nnot json\n[1, 2]\n'), 'jsonl'))
+
+    assert [(line_no, error != '') for line_no, _, error in records] == [(1, False), (3, True), (4, True)]
+    assert records[2][2] == '每行必须是 JSON 对象'
+
+
+def test_csv_import_creates_users_and_member_counts():
+    report = _import(
+        'username,email,password,group,is_active\n'
+        'amy,amy@example.com,secret123,普通用户,\n'
+        'ben,,secret123,,false\n'
+    )
+
+    assert (report.total, report.inserted, report.failed) == (2, 2, 0)
+    amy, ben = _user('amy'), _user('ben')
+    assert amy.is_active is True and amy.verify_password('secret123')
+    assert amy.group.name == Group.USER
+    assert ben.is_active is False and ben.group is None and ben.email is None
+    assert Group.query.filter_by(name=Group.USER).one().member_count == 1
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('false', False), ('true', True), ('0', False), ('"yes"', True), ('null', True), ('""', True),
+])
+def test_jsonl_is_active_values(value, expected):
+    report = _import(f'{{"username": "cat", "password": "secret123", "is_active": {value}}}\n', 'jsonl')
+
+    assert report.inserted == 1
+    assert _user('cat').is_active is expected
+
+
+def test_jsonl_without_is_active_defaults_to_active():
+    _import('{"username": "dan", "password": "secret123"}\n', 'jsonl')
+
+    assert _user('dan').is_active is True
+
+
+def test_existing_password_hash_is_stored_as_is():
+    pwhash = generate_password_hash('secret123', 'pbkdf2')
+
+    _import(f'{{"username": "eve", "password_hash": "{pwhash}"}}\n', 'jsonl')
+
+    assert _user('eve').password_hash == pwhash
+
+
+def test_unsupported_password_hash_is_rejected():
+    report = _import('{"username": "eve", "password_hash": "plaintext"}\n', 'jsonl')
+
+    assert (report.inserted, report.failed) == (0, 1)
+    assert report.errors[0][1] == 'password_hash 不是支持的哈希格式'
+
+
+def test_non_string_passwords_are_rejected():
+    report = _import(
+        '{"username": "eve", "password": 123456}\n'
+        '{"username": "fay", "password_hash": ["pbkdf2"]}\n'
+        '{"username": "gus", "password": "secret123"}\n',
+        'jsonl',
+    )
+
+    assert (report.inserted, report.failed) == (1, 2)
+    assert report.errors == [(1, 'password 必须是字符串'), (2, 'password_hash 必须是字符串')]
+    assert _user('gus').verify_password('secret123')
+
+
+def test_invalid_rows_are_reported_and_skipped():
+    report = _import(
+        'username,email,password,group\n'
+        ',x@example.com,secret123,\n'
+        'fay,,,\n'
+        'gus,,secret123,不存在的组\n'
+        'hal,hal@example.com,secret123,\n'
+        'hal,,secret123,\n'
+        'ida,hal@example.com,secret123,\n'
+        'admin,,secret123,\n'
+    )
+
+    assert (report.total, report.inserted, report.failed) == (7, 1, 6)
+    assert [line_no for line_no, _ in report.errors] == [2, 3, 4, 6, 7, 8]
+    assert report.errors[2][1] == '用户组不存在: 不存在的组'
+    assert report.errors[-1][1] == '用户名已存在: admin'
+
+
+def test_default_group_applies_to_rows_without_group():
+    _import('username,password,group\njo,secret123,\nkim,secret123,管理员\n', default_group=Group.USER, batch_size=1)
+
+    assert _user('jo').group.name == Group.USER
+    assert _user('kim').group.name == Group.ADMIN
+
+
+def test_unknown_default_group_is_rejected():
+    with pytest.raises(ValueError):
+        _import('username,password\nlee,secret123\n', default_group='不存在的组')
+
+
+def test_import_route(auth_client):
+    data = {'file': (io.BytesIO('{"username": "max", "password": "secret123", "is_active": false}\n'.encode()),
+                     'users.jsonl')}
+
+    payload = auth_client.post('/users/import/', data=data, content_type='multipart/form-data').get_json()
+
+    assert payload['status'] == 'success'
+    assert payload['data']['inserted'] == 1
+    assert _user('max').is_active is False
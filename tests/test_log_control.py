@@ -0,0 +1,65 @@
+import json
+import os
+
+import pytest
+from loguru import logger
+
+from app.extensions import log_control
+from app.utils.log_control import LogControl, parse_sampling
+
+
+@pytest.fixture
+def control(tmp_path):
+    control = LogControl()
+    control.path = tmp_path / 'log_levels.json'
+    control.reload_interval = 0
+    return control
+
+
+def _write_levels(path, levels, mtime_ns):
+    # 显式设置修改时间，避免文件系统时间精度不足时两次写入的 mtime 相同
+    path.write_text(json.dumps(levels), encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _passes(control, name, level):
+    return control.filter({'name': name, 'level': logger.level(level)})
+
+
+def test_levels_are_reloaded_from_the_shared_file(control):
+    assert not _passes(control, 'app.services.user_service', 'DEBUG')
+
+    _write_levels(control.path, {'app.services': 'debug', 'app.services.auth_service': 'ERROR'}, 10**18)
+    assert _passes(control, 'app.services.user_service', 'DEBUG')
+    assert not _passes(control, 'app.services.auth_service', 'WARNING')
+    assert not _passes(control, 'app.controllers.user', 'DEBUG')
+
+    _write_levels(control.path, {}, 10**18 + 10**9)
+    assert not _passes(control, 'app.services.user_service', 'DEBUG')
+    assert _passes(control, 'app.services.auth_service', 'WARNING')
+
+
+def test_invalid_file_keeps_the_current_levels(control):
+    _write_levels(control.path, {'app': 'DEBUG'}, 10**18)
+    assert _passes(control, 'app.models', 'DEBUG')
+
+    _write_levels(control.path, ['app'], 10**18 + 10**9)
+    assert _passes(control, 'app.models', 'DEBUG')
+
+
+def test_set_level_through_admin_api(auth_client, tmp_path, monkeypatch):
+    monkeypatch.setattr(log_control, 'path', tmp_path / 'log_levels.json')
+    monkeypatch.setattr(log_control, '_mtime', None)
+
+    response = auth_client.post('/admin/log-levels/', json={'module': 'app.services', 'level': 'debug'})
+
+    assert response.get_json()['data']['levels'] == {'': 'INFO', 'app.services': 'DEBUG'}
+    assert json.loads(log_control.path.read_text(encoding='utf-8')) == {'app.services': 'DEBUG'}
+    rejected = auth_client.post('/admin/log-levels/', json={'module': 'app', 'level': 'LOUD'})
+    assert rejected.get_json()['status'] == 'error'
+
+
+def test_parse_sampling_clamps_rates():
+    assert parse_sampling('user.list_users=0.1, group.get_group=3,bad=-1') == {
+        'user.list_users': 0.1, 'group.get_group': 1.0, 'bad': 0.0,
+    }
@@ -0,0 +1,58 @@
+import pytest
+from loguru import logger
+
+from app.utils.log_pipeline import LogPipeline
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """不启动后台线程的管道，由用例显式 flush"""
+    pipeline = LogPipeline()
+    pipeline.enabled = True
+    pipeline.capacity = 2
+    monkeypatch.setattr(pipeline, '_ensure_thread', lambda: None)
+    return pipeline
+
+
+@pytest.fixture
+def records():
+    captured = []
+    handler = logger.add(lambda message: captured.append(message.record), level='DEBUG',
+                         filter=lambda record: record['name'] == __name__)
+    yield captured
+    logger.remove(handler)
+
+
+def _format(fields):
+    return 'request {} {}'.format(*fields)
+
+
+def test_full_buffer_drops_new_events(pipeline, records):
+    for index in range(3):
+        pipeline.capture('INFO', _format, 'GET', f'/users/{index}')
+
+    stats = pipeline.stats()
+    assert (stats['captured'], stats['dropped'], stats['pending']) == (2, 1, 2)
+    assert records == []
+
+    assert pipeline.flush() == 2
+    assert [record['message'] for record in records] == ['request GET /users/0', 'request GET /users/1']
+    assert pipeline.stats()['flushed'] == 2
+
+
+def test_flushed_records_keep_the_call_site_and_context(pipeline, records):
+    pipeline.capture('WARNING', _format, 'POST', '/auth/login', context={'user': 'kate', 'ip': '10.0.0.1'})
+    pipeline.flush()
+
+    record = records[0]
+    assert record['function'] == 'test_flushed_records_keep_the_call_site_and_context'
+    assert record['level'].name == 'WARNING'
+    assert record['extra'] == {'user': 'kate', 'ip': '10.0.0.1'}
+
+
+def test_disabled_pipeline_writes_synchronously(pipeline, records):
+    pipeline.enabled = False
+    pipeline.capture('INFO', _format, 'GET', '/')
+
+    assert [record['message'] for record in records] == ['request GET /']
+    assert pipeline.stats()['pending'] == 0
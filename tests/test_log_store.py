@@ -0,0 +1,86 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from loguru import logger
+
+import query_logs
+from app.utils.log_store import JsonLinesSink, index_path, load_index, log_files, query
+
+BASE = 1_700_000_000.0
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / 'app.jsonl'
+
+
+@pytest.fixture
+def write(log_path):
+    """以固定时间戳写入日志的函数，写完后关闭 sink"""
+    sink = JsonLinesSink(log_path, rotation_bytes=4096, index_interval=512)
+    handler = logger.add(sink, level='DEBUG', filter=lambda record: 'timestamp' in record['extra'])
+
+    def factory(timestamp, message, level='INFO', **extra):
+        logger.patch(
+            lambda record: record.update(time=datetime.fromtimestamp(timestamp, timezone.utc)),
+        ).bind(timestamp=timestamp, **extra).log(level, message)
+
+    factory.sink = sink
+    yield factory
+    logger.remove(handler)
+    sink.close()
+
+
+def _messages(records):
+    return [record['message'] for record in records]
+
+
+def test_index_lookup_spans_rotated_files(log_path, write):
+    for second in range(60):
+        write(BASE + second, f'event {second}')
+    # 下一次写入前立即检查文件大小，触发轮转
+    write.sink._next_check = 0.0
+    for second in range(60, 120):
+        write(BASE + second, f'event {second}')
+
+    files = log_files(log_path)
+    assert len(files) == 2
+    assert all(load_index(path) for path in files)
+
+    records = list(query(log_path, since=BASE + 50, until=BASE + 70, slack=0))
+
+    assert _messages(records) == [f'event {second}' for second in range(50, 71)]
+
+
+def test_query_filters_by_level_module_user_and_ip(log_path, write):
+    write(BASE, 'login', user='kate', ip='10.0.0.1')
+    write(BASE + 1, 'denied', level='WARNING', user='kate', ip='10.0.0.2')
+    write(BASE + 2, 'other', level='ERROR', user='bob', ip='10.0.0.1')
+
+    assert _messages(query(log_path, level='warning')) == ['denied', 'other']
+    assert _messages(query(log_path, user='kate')) == ['login', 'denied']
+    assert _messages(query(log_path, ip='10.0.0.1', level='ERROR')) == ['other']
+    assert _messages(query(log_path, module=__name__)) == ['login', 'denied', 'other']
+    assert _messages(query(log_path, module=__name__[:-1])) == []
+
+
+def test_missing_index_is_rebuilt(log_path, write):
+    for second in range(30):
+        write(BASE + second, f'event {second}')
+    write.sink.close()
+    index_path(log_path).unlink()
+
+    assert _messages(query(log_path, since=BASE + 28, slack=0)) == ['event 28', 'event 29']
+    assert index_path(log_path).exists()
+
+
+def test_query_logs_cli_prints_the_window(log_path, write, capsys):
+    for second in range(5):
+        write(BASE + second, f'event {second}')
+
+    assert query_logs.main(['--file', str(log_path), '--since', str(BASE + 1),
+                            '--until', str(BASE + 3), '--slack', '0', '--json']) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['message'] for line in lines] == ['event 1', 'event 2', 'event 3']
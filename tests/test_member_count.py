@@ -0,0 +1,101 @@
+import pytest
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+from app.services.user_service import create_user, delete_user, update_user, update_user_group
+
+
+pytestmark = pytest.mark.usefixtures('app')
+
+
+def _group(name):
+    return Group.query.filter_by(name=name).one()
+
+
+def _counts():
+    """各用户组的成员计数，与按 users 表实际统计的结果一起返回"""
+    db.session.expire_all()
+    stored = {group.name: group.member_count for group in Group.query.all()}
+    actual = {
+        group.name: User.query.filter_by(group_id=group.id).count()
+        for group in Group.query.all()
+    }
+    return stored, actual
+
+
+def test_seed_data_counts_default_accounts():
+    stored, actual = _counts()
+
+    assert stored == actual
+    assert stored[Group.SUPER_ADMIN] == 2
+
+
+def test_create_user_increments_group_count():
+    result = create_user({'username': 'alice', 'password': 'secret123', 'group_id': _group(Group.USER).id})
+    assert result.success
+
+    stored, actual = _counts()
+    assert stored == actual
+    assert stored[Group.USER] == 1
+
+
+def test_moving_a_user_updates_both_groups():
+    create_user({'username': 'bob', 'password': 'secret123', 'group_id': _group(Group.USER).id})
+    user = User.query.filter_by(username='bob').one()
+
+    assert update_user(user, {'group_id': _group(Group.ADMIN).id}).success
+    stored, actual = _counts()
+    assert stored == actual
+    assert (stored[Group.USER], stored[Group.ADMIN]) == (0, 1)
+
+    assert update_user_group(user, None).success
+    stored, actual = _counts()
+    assert stored == actual
+    assert stored[Group.ADMIN] == 0
+
+
+def test_update_without_group_change_keeps_count():
+    create_user({'username': 'carol', 'password': 'secret123', 'group_id': _group(Group.USER).id})
+    user = User.query.filter_by(username='carol').one()
+
+    assert update_user(user, {'email': 'carol@example.com', 'group_id': _group(Group.USER).id}).success
+
+    stored, _ = _counts()
+    assert stored[Group.USER] == 1
+
+
+def test_delete_user_decrements_group_count():
+    create_user({'username': 'dave', 'password': 'secret123', 'group_id': _group(Group.USER).id})
+
+    assert delete_user(User.query.filter_by(username='dave').one()).success
+
+    stored, actual = _counts()
+    assert stored == actual
+    assert stored[Group.USER] == 0
+
+
+def test_change_group_route_reports_new_count(auth_client):
+    create_user({'username': 'erin', 'password': 'secret123'})
+    user = User.query.filter_by(username='erin').one()
+    admin_group = _group(Group.ADMIN)
+
+    response = auth_client.post(f'/users/{user.id}/change-group/', json={'group_id': admin_group.id})
+
+    assert response.get_json()['status'] == 'success'
+    stored, actual = _counts()
+    assert stored == actual
+    assert stored[Group.ADMIN] == 1
+
+
+def test_repair_command_recounts_drifted_groups(app, make_user):
+    make_user('frank', group=Group.USER)  # 直接写入模型，不经过服务层维护计数
+    stored, actual = _counts()
+    assert stored[Group.USER] == 0
+
+    result = app.test_cli_runner().invoke(args=['repair-member-counts'])
+
+    assert result.exit_code == 0
+    assert f'{Group.USER}: 1' in result.output
+    stored, actual = _counts()
+    assert stored == actual
@@ -0,0 +1,34 @@
+import pytest
+
+
+@pytest.fixture
+def metrics_client(client):
+    client.get('/auth/login')
+    return client
+
+
+def test_metrics_are_exported_to_local_clients(metrics_client):
+    response = metrics_client.get('/metrics')
+
+    assert response.status_code == 200
+    assert 'http_requests_total{endpoint="auth.login",method="GET",status="200"}' in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('environ, headers', [
+    ({'REMOTE_ADDR': '10.0.0.5'}, {}),
+    ({}, {'X-Forwarded-For': '203.0.113.7'}),
+    ({}, {'X-Real-IP': '203.0.113.7'}),
+])
+def test_metrics_without_token_reject_remote_clients(metrics_client, environ, headers):
+    assert metrics_client.get('/metrics', environ_base=environ, headers=headers).status_code == 403
+
+
+def test_metrics_token_is_required_when_configured(app, metrics_client):
+    app.extensions['request_metrics'].token = 's3cret'
+
+    assert metrics_client.get('/metrics').status_code == 403
+    assert metrics_client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+    response = metrics_client.get(
+        '/metrics', environ_base={'REMOTE_ADDR': '10.0.0.5'}, headers={'Authorization': 'Bearer s3cret'},
+    )
+    assert response.status_code == 200
@@ -0,0 +1,85 @@
+import os
+import time
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.extensions import password_hasher
+from app.services.auth_service import authenticate_user
+from app.utils.passwords import HashingBusyError, PasswordHasher, is_supported_hash
+
+
+@pytest.fixture
+def hasher(app):
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_QUEUE_SIZE=0, PASSWORD_HASH_TIMEOUT=0.2)
+    hasher = PasswordHasher()
+    hasher.init_app(app)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_hash_and_verify_in_process_pool(hasher):
+    pwhash = hasher.hash('secret123')
+
+    assert hasher.verify(pwhash, 'secret123')
+    assert not hasher.verify(pwhash, 'wrong')
+
+
+def test_full_queue_is_rejected_without_waiting(hasher):
+    pwhash = generate_password_hash('secret123')
+    # 占用唯一的槽位，模拟进程池与队列都已排满
+    hasher._slots.acquire()
+    try:
+        with pytest.raises(HashingBusyError, match='队列已满'):
+            hasher.verify(pwhash, 'secret123')
+    finally:
+        hasher._slots.release()
+
+    assert hasher.verify(pwhash, 'secret123')
+
+
+def test_busy_hasher_rejects_login(app, monkeypatch):
+    def busy(*args):
+        raise HashingBusyError('密码哈希队列已满')
+    monkeypatch.setattr(password_hasher, '_run', busy)
+
+    result = authenticate_user('admin', 'admin123', ip='10.0.0.1')
+
+    assert (result.success, result.status) == (False, 'busy')
+
+
+def test_timeout_is_reported_as_busy_and_keeps_slot_until_task_ends(hasher):
+    with pytest.raises(HashingBusyError):
+        hasher._run(time.sleep, 0.6)
+
+    # 超时的任务仍在子进程中执行，队列在其结束前保持占用
+    with pytest.raises(HashingBusyError):
+        hasher._run(abs, -1)
+
+    time.sleep(0.6)
+    assert hasher._run(abs, -1) == 1
+
+
+def test_broken_pool_is_reported_as_busy_and_recreated(hasher):
+    with pytest.raises(HashingBusyError):
+        hasher._run(os._exit, 1)
+
+    assert hasher._run(abs, -1) == 1
+    assert hasher.verify(hasher.hash('secret123'), 'secret123')
+
+
+@pytest.mark.parametrize('method', ['scrypt', 'scrypt:16384:8:1', 'pbkdf2', 'pbkdf2:sha256:1000'])
+def test_werkzeug_hashes_are_supported(method):
+    assert is_supported_hash(generate_password_hash('secret123', method))
+
+
+@pytest.mark.parametrize('pwhash', [
+    None, '', 'secret123', 'md5$salt$abcdef', 'pbkdf2:sha256:1000$salt$not-hex',
+    'pbkdf2:sha256:1000$$abcdef', 'scrypt:32768$salt$abcdef',
+])
+def test_unknown_hash_formats_need_rehash(app, pwhash):
+    hasher = PasswordHasher()
+    hasher.init_app(app)
+
+    assert not is_supported_hash(pwhash)
+    assert hasher.needs_rehash(pwhash)
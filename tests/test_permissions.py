@@ -0,0 +1,98 @@
+import pytest
+from flask import template_rendered
+from flask_login import current_user
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.permission import Permission
+from app.utils.bootstrap import DEFAULT_GROUP_PERMISSIONS
+from app.utils.permissions import EffectivePermissions, effective_permissions, permission_matrix
+
+
+def _login(client, username, password='secret123'):
+    response = client.post('/auth/login', data={'username': username, 'password': password})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def rendered(app):
+    """记录请求中渲染的模板上下文"""
+    contexts = []
+
+    def record(sender, template, context, **extra):
+        contexts.append(context)
+    template_rendered.connect(record, app)
+    yield contexts
+    template_rendered.disconnect(record, app)
+
+
+def test_default_group_masks_after_seeding(app):
+    for name, codes in DEFAULT_GROUP_PERMISSIONS.items():
+        group = Group.query.filter_by(name=name).one()
+
+        assert set(permission_matrix.for_group(group.id)) == set(codes)
+    assert len(set(permission_matrix.bits.values())) == len(permission_matrix.bits)
+    assert set(permission_matrix.for_group(None)) == set()
+
+
+@pytest.mark.parametrize('method, path, data', [
+    ('post', '/users/create/', {'username': 'mike', 'password': 'secret123'}),
+    ('post', '/users/1/delete/', None),
+    ('post', '/users/1/change-group/', {'group_id': 1}),
+    ('get', '/admin/log-levels/', None),
+])
+def test_group_without_the_bit_gets_403(client, make_user, method, path, data):
+    make_user('kate', group=Group.USER)
+    _login(client, 'kate')
+
+    response = getattr(client, method)(path, json=data)
+
+    assert response.status_code == 403
+
+
+def test_admin_group_lacks_manage_logs(client, make_user):
+    make_user('lena', group=Group.ADMIN)
+    _login(client, 'lena')
+
+    assert client.get('/admin/log-levels/').status_code == 403
+    assert client.post('/users/create/', json={'username': 'mike', 'password': 'secret123'}).status_code != 403
+
+
+def test_matrix_recompiles_after_group_permissions_change(app):
+    group = Group.query.filter_by(name=Group.USER).one()
+    permission = Permission.query.filter_by(code=Permission.MANAGE_LOGS).one()
+    group.permissions.append(permission)
+    db.session.commit()
+
+    assert not permission_matrix.allows(group.id, Permission.MANAGE_LOGS)
+
+    permission_matrix.compile()
+
+    assert permission_matrix.allows(group.id, Permission.MANAGE_LOGS)
+    assert set(permission_matrix.for_group(group.id)) == {Permission.MANAGE_LOGS}
+
+    group.permissions.remove(permission)
+    db.session.commit()
+    permission_matrix.compile()
+    assert not permission_matrix.allows(group.id, Permission.MANAGE_LOGS)
+
+
+@pytest.mark.parametrize('username, group, expected', [
+    ('kate', Group.USER, set()),
+    ('lena', Group.ADMIN, {Permission.ADD_USER, Permission.EDIT_USER}),
+])
+def test_templates_receive_effective_permissions(client, make_user, rendered, username, group, expected):
+    make_user(username, group=group)
+    _login(client, username)
+
+    assert client.get('/').status_code == 200
+
+    perms = rendered[-1]['perms']
+    assert isinstance(perms, EffectivePermissions)
+    assert set(perms) == expected
+
+
+def test_anonymous_users_have_no_permissions(app):
+    with app.test_request_context('/'):
+        assert set(effective_permissions(current_user)) == set()
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+from app import create_app
+from app.extensions import async_db, db, principal_cache, read_router
+from app.models.group import Group
+from app.models.user import User
+from app.services import async_reads
+from app.utils.db_routing import REPLICA_BIND, sync_sqlite_replica
+from app.utils.filelock import lock_path
+from app.utils.principal_cache import VersionTable
+from config import TestingConfig
+
+
+def _login(app, username, password='secret123'):
+    client = app.test_client()
+    response = client.post('/auth/login', data={'username': username, 'password': password})
+    assert response.status_code == 302
+    return client
+
+
+def test_version_bumps_are_shared_through_the_file(tmp_path):
+    writer = VersionTable(tmp_path / 'versions.bin', slots=16)
+    reader = VersionTable(tmp_path / 'versions.bin', slots=16)
+
+    assert reader.get(3) == 0
+    writer.bump(3)
+    writer.bump(3)
+
+    assert reader.get(3) == 2
+    assert reader.get(19) == 2  # 同一槽位的用户一同失效
+    assert reader.get(4) == 0
+
+
+def test_cache_hit_skips_loader_until_invalidated(app, make_user):
+    user = make_user('grace')
+    calls = []
+    loader = principal_cache.loader
+
+    def counting_loader(user_id):
+        calls.append(user_id)
+        return loader(user_id)
+
+    principal_cache.loader = counting_loader
+    try:
+        assert principal_cache.get(user.id).username == 'grace'
+        assert principal_cache.get(user.id).username == 'grace'
+        assert calls == [user.id]
+
+        principal_cache.invalidate(user.id)
+        principal_cache.get(user.id)
+        assert calls == [user.id, user.id]
+    finally:
+        principal_cache.loader = loader
+
+
+def test_other_processes_see_invalidation(app, make_user):
+    user = make_user('heidi')
+    principal_cache.get(user.id)
+    principal, _ = principal_cache.lookup(user.id)
+    assert principal is not None
+
+    # 模拟另一个工作进程通过共享文件提升版本号
+    VersionTable(principal_cache.versions.path, principal_cache.versions.slots).bump(user.id)
+
+    principal, _ = principal_cache.lookup(user.id)
+    assert principal is None
+
+
+def test_update_route_invalidates_cached_principal(app, auth_client, make_user):
+    user = make_user('ivan', group=Group.USER)
+    ivan = _login(app, 'ivan')
+    assert ivan.get('/users/').status_code == 200
+    assert principal_cache.lookup(user.id)[0].is_active is True
+
+    response = auth_client.post(f'/users/{user.id}/update/', json={'is_active': False})
+    assert response.get_json()['status'] == 'success'
+
+    assert principal_cache.lookup(user.id)[0] is None
+    assert principal_cache.get(user.id).is_active is False
+
+
+def test_group_change_applies_new_permissions_immediately(app, auth_client, make_user):
+    user = make_user('judy', group=Group.ADMIN)
+    judy = _login(app, 'judy')
+    assert judy.post('/users/create/', json={'username': 'k1', 'password': 'secret123'}).status_code == 200
+
+    user_group = Group.query.filter_by(name=Group.USER).one()
+    auth_client.post(f'/users/{user.id}/change-group/', json={'group_id': user_group.id})
+
+    assert judy.post('/users/create/', json={'username': 'k2', 'password': 'secret123'}).status_code == 403
+
+
+def test_lock_path_does_not_wait_when_held(tmp_path):
+    path = tmp_path / 'job.lock'
+    with lock_path(path) as fd:
+        assert fd is not None
+        with lock_path(path, blocking=False) as other:
+            assert other is None
+    with lock_path(path, blocking=False) as fd:
+        assert fd is not None
+
+
+def test_lock_path_is_a_no_op_without_platform_locking(tmp_path, monkeypatch):
+    from app.utils import filelock
+
+    monkeypatch.setattr(filelock, 'fcntl', None)
+    monkeypatch.setattr(filelock, 'msvcrt', None)
+    with lock_path(tmp_path / 'job.lock') as fd:
+        with lock_path(tmp_path / 'job.lock', blocking=False) as other:
+            assert fd is not None and other is not None
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """使用文件型主库与只读副本的应用，副本只在显式同步时更新，用于模拟同步延迟"""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path / "app.db"}')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {REPLICA_BIND: f'sqlite:///{tmp_path / "replica.db"}'})
+    app = create_app('testing')
+    principal_cache.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def test_lagging_replica_does_not_refill_principal(replica_app):
+    with replica_app.app_context():
+        user = User(username='kate', password='secret123',
+                    group=Group.query.filter_by(name=Group.ADMIN).one())
+        db.session.add(user)
+        db.session.commit()
+        user_id, user_group_id = user.id, Group.query.filter_by(name=Group.USER).one().id
+        sync_sqlite_replica(read_router.primary_engine(), read_router.replica_engine())
+
+    kate = _login(replica_app, 'kate')
+    assert kate.get('/groups/available-for-group/1').status_code == 200
+
+    admin = _login(replica_app, 'admin', 'admin123')
+    admin.post(f'/users/{user_id}/change-group/', json={'group_id': user_group_id})
+
+    # 副本中 kate 仍属于管理员组，缓存失效后的重新加载必须读主库
+    assert kate.get('/groups/available-for-group/1').status_code == 403
+
+
+def test_async_principal_loader_reads_the_primary(replica_app):
+    with replica_app.app_context():
+        user = User(username='liam', password='secret123')
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+        sync_sqlite_replica(read_router.primary_engine(), read_router.replica_engine())
+        user.is_active = False
+        db.session.commit()
+
+    async def load():
+        try:
+            return await async_reads.load_principal(user_id)
+        finally:
+            await async_db.dispose()
+
+    with replica_app.test_request_context('/users/'):
+        assert read_router.prefers_replica()
+        assert asyncio.run(load()).is_active is False
@@ -0,0 +1,51 @@
+import pytest
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+from app.services.projections import (
+    UserRecord,
+    fetch_user_dicts,
+    fetch_user_records,
+    select_user_records,
+    user_dicts,
+)
+
+
+@pytest.fixture
+def users(make_user):
+    make_user('kate', 'kate@example.com', group=Group.USER)
+    make_user('liam', is_active=False)
+    db.session.expunge_all()
+    return User.query.order_by(User.id).all()
+
+
+def test_dicts_match_the_orm_serialisation(users):
+    expected = [user.to_dict() for user in users]
+    db.session.expunge_all()
+
+    rows = fetch_user_dicts(select_user_records().order_by(User.id))
+
+    assert rows == expected
+    assert rows[-1]['group_name'] is None and rows[-1]['is_active'] is False
+
+
+def test_records_are_plain_tuples_outside_the_session(users):
+    expected = [user.to_dict() for user in users]
+    db.session.expunge_all()
+
+    records = fetch_user_records(select_user_records().order_by(User.id))
+
+    assert all(isinstance(record, UserRecord) for record in records)
+    assert [record.to_dict() for record in records] == expected
+    assert 'password_hash' not in UserRecord._fields
+    assert len(db.session.identity_map) == 0
+
+
+def test_extra_columns_are_left_out_of_dicts(users):
+    statement = select_user_records(User.created_at).where(User.username == 'kate')
+    row = db.session.execute(statement).one()
+
+    assert row[-1] is not None
+    kate = next(user for user in users if user.username == 'kate')
+    assert user_dicts([row]) == [kate.to_dict()]
@@ -0,0 +1,185 @@
+import sqlite3
+
+import pytest
+
+from app import create_app
+from app.extensions import db, rate_limiter
+from app.services.auth_service import authenticate_user
+from app.utils.rate_limit import MemoryBackend, SQLiteBackend, parse_limit
+from config import TestingConfig
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteBackend(tmp_path / 'ratelimit.db')
+    return MemoryBackend()
+
+
+@pytest.fixture
+def limiter(app):
+    app.config.update(LOGIN_RATE_LIMIT_ENABLED=True, LOGIN_RATE_LIMIT_IP='5/60', LOGIN_RATE_LIMIT_USERNAME='2/60')
+    rate_limiter.init_app(app)
+    return rate_limiter
+
+
+def test_parse_limit():
+    assert parse_limit('10/30') == (10, 30)
+    assert parse_limit('5') == (5, 60)
+
+
+def test_limit_is_enforced_within_window(backend):
+    rules = [('k', 3, 60)]
+    now = 6000.0  # 窗口起点
+
+    assert [backend.hit(rules, now + index).retry_after for index in range(3)] == [None, None, None]
+    assert backend.hit(rules, now + 3).retry_after == pytest.approx(57)
+
+
+def test_previous_window_is_weighted_by_remaining_share(backend):
+    rules = [('k', 4, 60)]
+    for _ in range(4):
+        assert backend.hit(rules, 6000.0).retry_after is None
+
+    # 新窗口过去一半：上一窗口计为 4 * 0.5 = 2，可再尝试 2 次
+    assert backend.hit(rules, 6090.0).retry_after is None
+    assert backend.hit(rules, 6090.0).retry_after is None
+    assert backend.hit(rules, 6090.0).retry_after is not None
+    # 两个窗口之后计数清零
+    assert backend.hit(rules, 6180.0).retry_after is None
+
+
+def test_rejected_attempt_counts_against_no_rule(backend):
+    strict, loose = ('strict', 1, 60), ('loose', 2, 60)
+
+    assert backend.hit([strict, loose], 6000.0).retry_after is None
+    assert backend.hit([strict, loose], 6001.0).retry_after is not None
+    # 被拒绝的尝试不计入其他规则
+    assert backend.hit([loose], 6002.0).retry_after is None
+
+
+def test_keys_are_counted_independently(backend):
+    assert backend.hit([('a', 1, 60)], 6000.0).retry_after is None
+    assert backend.hit([('b', 1, 60)], 6000.0).retry_after is None
+    assert backend.hit([('a', 1, 60)], 6000.0).retry_after is not None
+
+
+def test_release_undoes_the_current_hit(backend):
+    rules = [('k', 2, 60)]
+    for _ in range(5):
+        attempt = backend.hit(rules, 6000.0)
+        assert attempt.retry_after is None
+        backend.release(attempt.slots)
+
+    assert backend.hit(rules, 6002.0).retry_after is None
+    assert backend.hit(rules, 6003.0).retry_after is None
+    assert backend.hit(rules, 6004.0).retry_after is not None
+
+
+def test_release_uses_the_window_of_the_hit(backend):
+    rules = [('k', 1, 60)]
+    attempt = backend.hit(rules, 6059.9)
+
+    # 撤销发生在下一个窗口：仍撤销计数时的窗口，不影响新窗口
+    backend.release(attempt.slots)
+
+    assert backend.hit(rules, 6060.1).retry_after is None
+    assert backend.hit(rules, 6060.2).retry_after is not None
+
+
+def test_username_limit_rejects_before_password_check(limiter):
+    assert authenticate_user('admin', 'wrong', ip='10.0.0.1').status == 'invalid'
+    assert authenticate_user('Admin ', 'wrong', ip='10.0.0.2').status == 'invalid'
+
+    result = authenticate_user('admin', 'admin123', ip='10.0.0.3')
+
+    assert result.status == 'throttled'
+    assert not result.success
+
+
+def test_ip_limit_spans_usernames(limiter):
+    for index in range(5):
+        assert authenticate_user(f'nobody{index}', 'x', ip='10.0.0.9').status == 'invalid'
+
+    assert authenticate_user('admin', 'admin123', ip='10.0.0.9').status == 'throttled'
+    assert authenticate_user('admin', 'admin123', ip='10.0.0.10').success
+
+
+def test_successful_logins_do_not_use_up_the_budget(limiter):
+    assert all(authenticate_user('admin', 'admin123', ip='10.0.0.1').success for _ in range(6))
+
+    assert authenticate_user('admin', 'wrong', ip='10.0.0.1').status == 'invalid'
+
+
+def test_login_straddling_a_window_boundary_is_fully_released(limiter, monkeypatch):
+    clock = iter([6059.9, 6060.1, 6060.2])
+    monkeypatch.setattr('app.utils.rate_limit.time.time', lambda: next(clock))
+
+    attempt = limiter.check_login('10.0.0.1', 'admin')
+    limiter.login_succeeded(attempt)
+
+    assert attempt.slots == (('login:ip:10.0.0.1', 100), ('login:user:admin', 100))
+    for _ in range(2):
+        assert limiter.check_login('10.0.0.1', 'admin').retry_after is None
+
+
+def _login(client, username, password, forwarded_for):
+    return client.post('/auth/login', data={'username': username, 'password': password},
+                       headers={'X-Forwarded-For': forwarded_for})
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxy(limiter, client):
+    for index in range(5):
+        _login(client, f'nobody{index}', 'x', f'203.0.113.{index}')
+
+    response = _login(client, 'admin', 'admin123', '203.0.113.99')
+
+    assert '登录尝试过于频繁' in response.get_data(as_text=True)
+
+
+@pytest.fixture
+def proxied_app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, 'TRUSTED_PROXY_COUNT', 1)
+    app = create_app('testing')
+    app.config.update(LOGIN_RATE_LIMIT_ENABLED=True, LOGIN_RATE_LIMIT_IP='5/60', LOGIN_RATE_LIMIT_USERNAME='100/60')
+    rate_limiter.init_app(app)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+def test_trusted_proxy_supplies_the_client_ip(proxied_app):
+    client = proxied_app.test_client()
+    for index in range(5):
+        _login(client, f'nobody{index}', 'x', '198.51.100.1')
+
+    assert '登录尝试过于频繁' in _login(client, 'admin', 'admin123', '198.51.100.1').get_data(as_text=True)
+    # 客户端在请求头前部伪造的地址被忽略，只采用代理追加的最后一项
+    assert _login(client, 'admin', 'admin123', '198.51.100.1, 198.51.100.2').status_code == 302
+
+
+def test_login_form_reports_throttling(limiter, client):
+    for _ in range(2):
+        client.post('/auth/login', data={'username': 'demo', 'password': 'wrong'})
+
+    response = client.post('/auth/login', data={'username': 'demo', 'password': 'demo1234'})
+
+    assert response.status_code == 200
+    assert '登录尝试过于频繁' in response.get_data(as_text=True)
+
+
+def test_storage_errors_do_not_block_login(limiter, monkeypatch):
+    def broken(rules, now):
+        raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(limiter.backend, 'hit', broken)
+
+    assert limiter.check_login('10.0.0.1', 'admin').retry_after is None
+
+
+def test_disabled_limiter_allows_everything(app):
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = False
+    rate_limiter.init_app(app)
+
+    assert all(rate_limiter.check_login('10.0.0.1', 'admin').retry_after is None for _ in range(50))
@@ -0,0 +1,136 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+from app.extensions import db, read_router, response_cache
+from app.models.group import Group, group_cache_key, members_cache_key
+from app.models.user import User
+from app.services.group_service import (
+    find_group_validator,
+    get_group_detail,
+    get_group_member_list,
+    list_available_users,
+    list_group_summaries,
+)
+from app.services.user_service import batch_update_users, create_user, update_user_group
+from app.utils.db_routing import _REPLICA_KEY
+
+pytestmark = pytest.mark.usefixtures('app')
+
+
+def _group(name=Group.USER):
+    return Group.query.filter_by(name=name).one()
+
+
+def _create(username, group=None):
+    result = create_user({'username': username, 'password': 'secret123',
+                          'group_id': _group(group).id if group else None})
+    assert result.success
+    return result.data['id']
+
+
+def _member_names(group_id):
+    return [member['username'] for member in get_group_member_list(group_id)[0]['members']]
+
+
+def test_repeated_reads_are_served_from_cache():
+    group_id = _group().id
+    get_group_detail(group_id)
+    hits = response_cache.hits
+
+    get_group_detail(group_id)
+
+    assert response_cache.hits == hits + 1
+
+
+def test_group_summaries_follow_member_count_changes():
+    before = {group['name']: group['user_count'] for group in list_group_summaries()}
+
+    _create('mia', Group.USER)
+
+    after = {group['name']: group['user_count'] for group in list_group_summaries()}
+    assert after[Group.USER] == before[Group.USER] + 1
+
+
+def test_group_detail_is_invalidated_on_update():
+    group = _group()
+    get_group_detail(group.id)
+
+    group.description = '更新后的描述'
+    db.session.commit()
+
+    assert get_group_detail(group.id)[0]['description'] == '更新后的描述'
+
+
+def test_member_list_follows_orm_and_bulk_changes():
+    group_id = _group().id
+    user_id = _create('ned', Group.USER)
+    assert _member_names(group_id) == ['ned']
+
+    batch_update_users([user_id], 'change_group', group_id=_group(Group.ADMIN).id)
+    assert _member_names(group_id) == []
+    assert _member_names(_group(Group.ADMIN).id) == ['ned']
+
+
+def test_membership_change_keeps_unrelated_groups_cached():
+    user_group, admin_group = _group(), _group(Group.ADMIN)
+    get_group_detail(admin_group.id)
+    get_group_member_list(admin_group.id)
+
+    user_id = _create('pam', Group.USER)
+    update_user_group(db.session.get(User, user_id), None)
+    batch_update_users([user_id], 'change_group', group_id=user_group.id)
+    batch_update_users([user_id], 'deactivate')
+
+    assert response_cache.get(group_cache_key(admin_group.id)) is not None
+    assert response_cache.get(members_cache_key(admin_group.id)) is not None
+    assert _member_names(user_group.id) == ['pam']
+    assert get_group_detail(user_group.id)[0]['user_count'] == 1
+
+
+def test_available_users_follow_group_assignment():
+    user_id = _create('ola')
+    assert 'ola' in [user['username'] for user in list_available_users()]
+
+    update_user_group(db.session.get(User, user_id), _group().id)
+
+    assert 'ola' not in [user['username'] for user in list_available_users()]
+
+
+def test_validator_miss_does_not_fill_the_cache():
+    group_id = _group().id
+    response_cache.invalidate(['*'])
+
+    validator = find_group_validator(group_id, members=True)
+
+    assert validator == Group.find_validator(group_id, members=True)
+    assert response_cache.get(members_cache_key(group_id)) is None
+
+
+def test_validator_hit_uses_cached_entry():
+    group_id = _group().id
+    _, cached = get_group_detail(group_id)
+
+    assert find_group_validator(group_id) == cached
+    assert response_cache.get(group_cache_key(group_id)) is not None
+
+
+def test_cache_is_filled_from_the_primary(tmp_path, monkeypatch):
+    group_id = _group().id
+    # 没有任何表的“副本”：查询一旦发往副本就会失败
+    replica = create_engine(f'sqlite:///{tmp_path / "replica.db"}')
+    monkeypatch.setattr(read_router, 'enabled', True)
+    db.session.info[_REPLICA_KEY] = replica
+    try:
+        with pytest.raises(OperationalError):
+            Group.find_validator(group_id)
+
+        assert get_group_detail(group_id)[0]['name'] == Group.USER
+        assert _member_names(group_id) == []
+        assert list_group_summaries()
+        assert list_available_users() == []
+        assert db.session.info[_REPLICA_KEY] is replica
+    finally:
+        db.session.info.pop(_REPLICA_KEY, None)
+        db.session.rollback()
+        replica.dispose()
@@ -0,0 +1,56 @@
+import pytest
+
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+from app.services.seed_service import generate_synthetic_users
+
+pytestmark = pytest.mark.usefixtures('app')
+
+
+def _usernames(prefix):
+    return [name for name, in db.session.query(User.username)
+            .filter(User.username.startswith(prefix)).order_by(User.username)]
+
+
+def test_same_seed_generates_same_users():
+    generate_synthetic_users(20, groups=5, seed=7, prefix='a')
+    first = [(user.username, user.email, user.is_active, user.group_id)
+             for user in User.query.filter(User.username.startswith('a0')).order_by(User.id)]
+    User.query.filter(User.username.startswith('a0')).delete()
+    db.session.commit()
+
+    generate_synthetic_users(20, groups=5, seed=7, prefix='a')
+    second = [(user.username, user.email, user.is_active, user.group_id)
+              for user in User.query.filter(User.username.startswith('a0')).order_by(User.id)]
+
+    assert first == second
+    assert Group.query.count() == 5
+
+
+def test_numbering_continues_after_highest_existing_index():
+    generate_synthetic_users(5, seed=1, prefix='s')
+    User.query.filter(User.username.in_(['s0000000', 's0000001'])).delete()
+    db.session.commit()
+
+    generate_synthetic_users(2, seed=2, prefix='s')
+
+    assert _usernames('s') == ['s0000002', 's0000003', 's0000004', 's0000005', 's0000006']
+
+
+def test_numbering_ignores_other_names_with_the_prefix(make_user):
+    make_user('sam')
+    make_user('s000000x')
+    make_user('s00000009')
+
+    generate_synthetic_users(1, seed=1, prefix='s')
+
+    assert 's0000000' in _usernames('s')
+
+
+def test_member_counts_match_generated_users():
+    generate_synthetic_users(200, groups=4, seed=3)
+
+    db.session.expire_all()
+    for group in Group.query.all():
+        assert group.member_count == User.query.filter_by(group_id=group.id).count()
@@ -0,0 +1,79 @@
+import pytest
+from loguru import logger
+from sqlalchemy import text
+
+from app.extensions import db, query_tracker
+from app.models.user import User
+from app.utils.sql_stats import RequestQueryStats
+
+
+@pytest.fixture
+def warnings():
+    captured = []
+    handler = logger.add(lambda message: captured.append(message.record), level='WARNING',
+                         filter=lambda record: record['name'] == 'app.utils.sql_stats')
+    yield captured
+    logger.remove(handler)
+
+
+@pytest.fixture
+def slow_queries(monkeypatch, warnings):
+    """把慢查询阈值降为 0，使每条语句都写入慢查询日志"""
+    monkeypatch.setattr(query_tracker, 'slow_query_seconds', 0)
+    return warnings
+
+
+def test_requests_report_query_count_headers(auth_client):
+    response = auth_client.get('/users/1/')
+
+    assert int(response.headers['X-DB-Queries']) >= 1
+    assert float(response.headers['X-DB-Time']) >= 0
+
+
+def test_slow_select_is_logged_with_query_plan(app, slow_queries):
+    db.session.execute(text('SELECT id FROM users WHERE username = :username'), {'username': 'admin'})
+
+    record = slow_queries[-1]
+    assert record['extra']['slow_query'] is True
+    assert 'SELECT id FROM users' in record['message']
+    assert '参数类型: (str)' in record['message']
+    assert "'admin'" not in record['message']
+    plan = record['message'].rpartition('执行计划: ')[2]
+    assert 'users' in plan and 'USING' in plan
+
+
+def test_slow_write_is_logged_without_query_plan(app, slow_queries):
+    db.session.execute(text('UPDATE users SET email = email WHERE id = 0'))
+
+    assert slow_queries[-1]['message'].endswith('执行计划: -')
+
+
+def test_slow_update_does_not_log_bound_values(app, slow_queries):
+    user = User.query.filter_by(username='admin').one()
+    user.password = 'new-secret'
+    db.session.commit()
+
+    message = next(record['message'] for record in slow_queries if 'UPDATE users' in record['message'])
+    assert user.password_hash not in message
+    assert user.password_hash.rpartition('$')[2] not in message
+    assert '参数类型: (str, ' in message
+
+
+def test_explain_can_be_disabled(app, slow_queries, monkeypatch):
+    monkeypatch.setattr(query_tracker, 'explain', False)
+    db.session.execute(text('SELECT 1'))
+
+    assert slow_queries[-1]['message'].endswith('执行计划: -')
+
+
+def test_repeated_statements_are_reported_as_n_plus_one(app, warnings):
+    stats = RequestQueryStats()
+    stats.shapes['SELECT * FROM users WHERE id = ?'] = query_tracker.n_plus_one_threshold
+    stats.shapes['SELECT * FROM groups'] = 1
+
+    with app.test_request_context('/groups/1/members'):
+        query_tracker._report_repeats(stats)
+
+    assert len(warnings) == 1
+    assert 'GET /groups/1/members' in warnings[0]['message']
+    assert 'FROM users' in warnings[0]['message']
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine, text
+
+from app.utils.sqlite_tuning import SQLiteTuning
+
+
+def test_stop_maintenance_restarts_on_next_connection(tmp_path):
+    tuning = SQLiteTuning()
+    engine = create_engine(f'sqlite:///{tmp_path / "app.db"}')
+    tuning.tune_engine(engine)
+
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    thread = tuning._thread
+    assert thread.is_alive()
+
+    tuning.stop_maintenance()
+    assert not thread.is_alive()
+
+    engine.dispose()
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    assert tuning._thread is not thread and tuning._thread.is_alive()
+    tuning.stop_maintenance()
+    engine.dispose()
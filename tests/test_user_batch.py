@@ -0,0 +1,141 @@
+from app.extensions import db
+from app.models.group import Group
+from app.models.user import User
+from app.services.user_service import _normalise_ids, create_user
+
+
+def _group(name):
+    return Group.query.filter_by(name=name).one()
+
+
+def _create(usernames, group=None):
+    group_id = _group(group).id if group else None
+    for username in usernames:
+        assert create_user({'username': username, 'password': 'secret123', 'group_id': group_id}).success
+    return [User.query.filter_by(username=username).one().id for username in usernames]
+
+
+def _member_counts():
+    db.session.expire_all()
+    return {group.name: group.member_count for group in Group.query.all()}
+
+
+def _assert_counts_match_users():
+    for group in Group.query.all():
+        assert group.member_count == User.query.filter_by(group_id=group.id).count(), group.name
+
+
+def test_change_group_moves_members_between_groups(auth_client):
+    ids = _create(['b1', 'b2', 'b3'], group=Group.USER)
+
+    payload = auth_client.post('/users/batch/', json={
+        'ids': ids + [ids[0], 99999],
+        'operation': 'change_group',
+        'group_id': _group(Group.ADMIN).id,
+    }).get_json()
+
+    assert payload['status'] == 'success'
+    assert payload['data']['succeeded'] == 3
+    assert payload['data']['results']['99999'] == 'not_found'
+    counts = _member_counts()
+    assert (counts[Group.USER], counts[Group.ADMIN]) == (0, 3)
+    assert {group['name']: group['user_count'] for group in payload['data']['groups']} == {
+        Group.USER: 0, Group.ADMIN: 3,
+    }
+    _assert_counts_match_users()
+
+
+def test_change_group_skips_users_already_in_target(auth_client):
+    ids = _create(['c1', 'c2'], group=Group.USER)
+
+    payload = auth_client.post('/users/batch/', json={
+        'ids': ids, 'operation': 'change_group', 'group_id': _group(Group.USER).id,
+    }).get_json()
+
+    assert set(payload['data']['results'].values()) == {'unchanged'}
+    assert _member_counts()[Group.USER] == 2
+
+
+def test_delete_decrements_counts_and_skips_self(auth_client):
+    ids = _create(['d1', 'd2'], group=Group.USER)
+    admin_id = User.query.filter_by(username='admin').one().id
+
+    payload = auth_client.post('/users/batch/', json={'ids': ids + [admin_id], 'operation': 'delete'}).get_json()
+
+    assert payload['data']['results'][str(admin_id)] == 'skipped_self'
+    assert User.query.filter(User.id.in_(ids)).count() == 0
+    counts = _member_counts()
+    assert counts[Group.USER] == 0
+    assert counts[Group.SUPER_ADMIN] == 2
+    _assert_counts_match_users()
+
+
+def test_deactivate_keeps_member_counts(auth_client):
+    ids = _create(['e1', 'e2'], group=Group.USER)
+
+    payload = auth_client.post('/users/batch/', json={'ids': ids, 'operation': 'deactivate'}).get_json()
+
+    assert payload['data']['succeeded'] == 2
+    db.session.expire_all()
+    assert User.query.filter(User.id.in_(ids), User.is_active.is_(False)).count() == 2
+    assert _member_counts()[Group.USER] == 2
+
+
+def test_unknown_target_group_is_rejected(auth_client):
+    ids = _create(['f1'])
+
+    payload = auth_client.post('/users/batch/', json={
+        'ids': ids, 'operation': 'change_group', 'group_id': 99999,
+    }).get_json()
+
+    assert payload == {'status': 'error', 'message': '用户组不存在'}
+
+
+def test_batch_size_is_limited(app, auth_client):
+    app.config['USER_BATCH_MAX_SIZE'] = 2
+
+    payload = auth_client.post('/users/batch/', json={'ids': [1, 2, 3], 'operation': 'activate'}).get_json()
+
+    assert payload['status'] == 'error'
+
+
+def test_non_list_ids_are_rejected(auth_client):
+    response = auth_client.post('/users/batch/', json={'ids': 5, 'operation': 'activate'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'status': 'error', 'message': '请选择要操作的用户'}
+
+
+def test_non_object_body_is_a_bad_request(auth_client):
+    response = auth_client.post('/users/batch/', json=[1, 2])
+
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_requested_count_uses_normalised_ids(auth_client):
+    ids = _create(['g1'])
+
+    payload = auth_client.post('/users/batch/', json={
+        'ids': ids + [str(ids[0]), 'x'], 'operation': 'deactivate',
+    }).get_json()
+
+    assert payload['data']['requested'] == 1
+
+
+def test_boolean_ids_are_ignored(auth_client):
+    ids = _create(['h1'])
+
+    payload = auth_client.post('/users/batch/', json={
+        'ids': [True, False] + ids, 'operation': 'deactivate',
+    }).get_json()
+
+    assert payload['data']['requested'] == 1
+    assert list(payload['data']['results']) == [str(ids[0])]
+    assert User.query.filter_by(username='admin').one().is_active is True
+    response = auth_client.post('/users/batch/', json={'ids': [True], 'operation': 'deactivate'})
+    assert response.get_json() == {'status': 'error', 'message': '请选择要操作的用户'}
+
+
+def test_normalised_ids_keep_first_occurrence_order():
+    assert _normalise_ids([3, '1', 3, 2.0, '1', None, 2]) == [3, 1, 2]
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models.user import User
+from app.services.user_service import decode_cursor, encode_cursor
+
+
+def _collect_pages(client, limit):
+    pages = []
+    cursor = None
+    while True:
+        query = {'limit': limit}
+        if cursor:
+            query['cursor'] = cursor
+        payload = client.get('/users/', query_string=query).get_json()
+        pages.append([user['username'] for user in payload['users']])
+        if not payload['has_more']:
+            assert payload['next_cursor'] is None
+            return pages
+        cursor = payload['next_cursor']
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', 'bm9zZXBhcmF0b3I', ''])
+def test_decode_cursor_rejects_invalid_values(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_pages_cover_every_user_once_in_creation_order(auth_client, make_user):
+    for index in range(7):
+        make_user(f'page{index}')
+
+    pages = _collect_pages(auth_client, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 3]
+    usernames = [name for page in pages for name in page]
+    assert usernames == ['admin', 'demo'] + [f'page{index}' for index in range(7)]
+
+
+def test_users_with_equal_created_at_are_ordered_by_id(auth_client, make_user):
+    moment = datetime(2024, 1, 1)
+    users = [make_user(f'tie{index}') for index in range(4)]
+    for user in User.query.all():
+        user.created_at = moment if user in users else moment - timedelta(days=1)
+    db.session.commit()
+
+    usernames = [name for page in _collect_pages(auth_client, limit=2) for name in page]
+
+    assert usernames[2:] == ['tie0', 'tie1', 'tie2', 'tie3']
+
+
+def test_page_size_is_clamped(app, auth_client):
+    app.config['USERS_PAGE_SIZE_MAX'] = 1
+
+    payload = auth_client.get('/users/', query_string={'limit': 50}).get_json()
+
+    assert len(payload['users']) == 1
+    assert payload['has_more'] is True
+
+
+def test_invalid_cursor_returns_error(auth_client):
+    payload = auth_client.get('/users/', query_string={'cursor': '@@@'}).get_json()
+
+    assert payload == {'status': 'error', 'message': '无效的分页游标'}
+
+
+def test_listing_requires_login(client):
+    assert client.get('/users/').status_code == 302
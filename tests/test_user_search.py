@@ -0,0 +1,111 @@
+import pytest
+
+from app.services import user_search
+from app.services.user_search import search_users
+
+
+def _usernames(keyword, **kwargs):
+    result = search_users(keyword, **kwargs)
+    assert result.success
+    return [user['username'] for user in result.data['users']]
+
+
+@pytest.fixture
+def people(make_user):
+    make_user('alice', 'alice@example.com')
+    make_user('Alicia', 'ally@example.com')
+    make_user('malice', 'm@example.com')
+    make_user('bob', 'alice.b@example.com')
+    make_user('carol', 'carol@example.com', group='普通用户')
+
+
+def test_results_are_ranked_by_match_quality(people):
+    # 完全匹配、邮箱前缀、用户名子串
+    assert _usernames('alice') == ['alice', 'bob', 'malice']
+    # 用户名前缀（同档内较短的在前）、邮箱前缀、用户名子串
+    assert _usernames('ALI') == ['alice', 'Alicia', 'bob', 'malice']
+
+
+@pytest.mark.parametrize('keyword', ['Al', 'AL', 'al'])
+def test_prefix_match_ignores_case(people, keyword):
+    assert _usernames(keyword)[:2] == ['alice', 'Alicia']
+
+
+def test_prefix_match_uses_nocase_index(app):
+    from app.extensions import db
+
+    plan = db.session.execute(db.text(
+        "EXPLAIN QUERY PLAN SELECT id FROM users WHERE username COLLATE NOCASE >= 'Ad'"
+    )).all()
+    assert 'ix_users_username_nocase' in plan[0][-1]
+
+
+def test_short_keyword_only_matches_prefix(people):
+    assert _usernames('li') == []
+
+
+def test_substring_match_without_search_index(people, monkeypatch):
+    monkeypatch.setattr(user_search, '_index_available', False)
+    assert _usernames('LIC') == ['alice', 'Alicia', 'malice', 'bob']
+
+
+def test_unassigned_and_limit(people):
+    assert 'carol' not in _usernames('carol', unassigned=True)
+    assert _usernames('carol') == ['carol']
+    assert len(_usernames('ali', limit=2)) == 2
+
+
+def test_blank_keyword_is_rejected(app):
+    assert not search_users('   ').success
+
+
+def test_search_route(auth_client, people):
+    payload = auth_client.get('/users/search', query_string={'q': 'Ad', 'unassigned': '1'}).get_json()
+    assert [user['username'] for user in payload['users']] == []
+
+    payload = auth_client.get('/users/search', query_string={'q': 'Ad'}).get_json()
+    assert [user['username'] for user in payload['users']] == ['admin']
+
+
+def test_unassigned_search_requires_edit_user(app, make_user):
+    make_user('dave', group='普通用户')
+    client = app.test_client()
+    client.post('/auth/login', data={'username': 'dave', 'password': 'secret123'})
+
+    assert client.get('/users/search', query_string={'q': 'Ad', 'unassigned': '1'}).status_code == 403
+    assert client.get('/users/search', query_string={'q': 'Ad'}).status_code == 200
+
+
+def _insert_trigger_exists():
+    from app.extensions import db
+
+    return db.session.execute(db.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'users_fts_ai'"
+    )).first() is not None
+
+
+def test_bulk_loads_index_rows_and_restore_trigger(make_user):
+    import io
+
+    from app.services.import_service import import_users
+    from app.services.seed_service import generate_synthetic_users
+
+    generate_synthetic_users(3, seed=1, prefix='zeta')
+    import_users(io.StringIO('username,password\nzetaimported,secret123\n'))
+    make_user('zetamanual')
+
+    assert _insert_trigger_exists()
+    assert sorted(_usernames('eta', limit=10)) == ['zeta0000000', 'zeta0000001', 'zeta0000002',
+                                                   'zetaimported', 'zetamanual']
+
+
+def test_failed_bulk_insert_keeps_trigger(app):
+    from app.extensions import db
+    from app.models.user import User
+
+    with pytest.raises(Exception):
+        with user_search.deferred_search_index():
+            db.session.execute(User.__table__.insert(), [{'username': 'admin'}])
+    db.session.rollback()
+
+    assert _insert_trigger_exists()